@@ -1,8 +1,15 @@
 from modules.db_connection import create_pg_engine
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
+from modules.inferencia_aproximada import METODOS_INFERENCIA, aproximar, relatorio_precisao
+from modules.backends_amostragem import BACKENDS_NUTS, amostrar_backend, comparar_backends, verificar_backend
+from modules.inicializacao_glm import INICIALIZACOES, inicializacao_glm
 
 # FUNÇÃO PRINCIPAL - DADOS INTEGRADOS COM JOIN INLINE
 def load_complete_ride_data():
@@ -168,13 +175,9 @@ def load_complete_ride_data():
     except Exception as e:
         return None, str(e)
 
-df, error = load_complete_ride_data()
-
-
 # MODELO BAYESIANO
-
-import pymc as pm
-import arviz as az
+# pymc/arviz são importados dentro das funções: importar o módulo (ou sair
+# cedo pela linha de comando) não carrega o PyMC.
 
 
 # Função de preparação
@@ -212,7 +215,8 @@ def preparar_dados(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # Função do Modelo Bayesiano 
-def ajustar_modelo_bayesiano(df_model):
+def matrizes_bayes(df_model):
+    """X (dummies + contínuas, sem intercepto), y, offset e nomes das colunas do modelo bayesiano."""
     y = df_model["qt_ing"].values
     offset = df_model["offset_log_qtmat"].values
     # Criar dummies das variáveis categóricas
@@ -233,24 +237,205 @@ def ajustar_modelo_bayesiano(df_model):
     # Guardar nomes das variáveis
     colnames = X.columns.tolist()
     X = X.fillna(0).astype(float).values
+    return X, y, offset, colnames
+
+
+# Níveis do modelo hierárquico: curso dentro de IES dentro de município
+NIVEIS_HIERARQUICOS = {"ies": ("co_ies", "no_ies"), "municipio": ("co_municipio_ies", "nome_municipio")}
+
+
+def indices_grupos(df_model) -> dict:
+    """
+    Vetores de índices inteiros (0..G-1) de IES e município por curso e os
+    rótulos de cada grupo (nome, com o código quando o nome se repete).
+    Entram no modelo por indexação, sem matrizes de dummies por grupo.
+    """
+    grupos = {}
+    for nivel, (codigo, nome) in NIVEIS_HIERARQUICOS.items():
+        indices, codigos = pd.factorize(df_model[codigo].astype(str), sort=True)
+        if nome in df_model:
+            nomes = df_model.groupby(df_model[codigo].astype(str))[nome].first().reindex(codigos).astype(str)
+            repetidos = nomes.duplicated(keep=False)
+            rotulos = np.where(repetidos, nomes + " (" + nomes.index + ")", nomes).tolist()
+        else:
+            rotulos = list(codigos)
+        grupos[nivel] = {"indices": indices, "rotulos": rotulos}
+    return grupos
+
+
+def ajustar_modelo_bayesiano(df_model, draws=2000, tune=1000, chains=4, cores=None, target_accept=0.95,
+                             random_seed=42, metodo="nuts", backend="pymc", parametrizacao="original",
+                             inicializacao="padrao", hierarquico=False):
+    X, y, offset, colnames = matrizes_bayes(df_model)
+    grupos = indices_grupos(df_model) if hierarquico else None
+
+    model = modelo_nb_pymc(X, y, offset, parametrizacao, grupos)
+    # Amostragem (ou trace do armazém, se dados + especificação + amostrador já foram vistos)
+    trace = amostrar_nb(
+        model, X, y, offset, draws, tune, chains, cores, target_accept, random_seed,
+        metodo=metodo, backend=backend, parametrizacao=parametrizacao, inicializacao=inicializacao, grupos=grupos
+    )
+
+    return model, trace, colnames
+
+
+# Versão da especificação (priors/verossimilhança): mude ao alterar modelo_nb_pymc
+ESPECIFICACAO_MODELO = "nb-offset/beta~N(0,2)/intercept~N(0,5)/alpha~Exp(1)"
+# Acrescentada à especificação no modelo hierárquico (mude ao alterar os efeitos de grupo)
+ESPECIFICACAO_HIERARQUICA = "ies+municipio~N(0,sigma),nao-centrado/sigma~HalfNormal(1)"
+
+
+def amostrar_nb(model, X, y, offset, draws=2000, tune=1000, chains=4, cores=None, target_accept=0.95,
+                random_seed=42, cache=True, metodo="nuts", backend="pymc", parametrizacao="original",
+                inicializacao="padrao", grupos=None, **kwargs):
+    """
+    NUTS no modelo, no backend escolhido (ver modules/backends_amostragem.py),
+    ou uma aproximação (ver modules/inferencia_aproximada.py), reaproveitando o trace do armazém (modules/traces.py) quando X, y,
+    offset, especificação e amostrador coincidem. A chave fica em
+    posterior.attrs["chave_trace"]. A parametrização (ver modelo_nb_pymc)
+    não muda a posterior, mas muda o conteúdo do trace, e entra na chave.
+
+    inicializacao="glm" (só no backend pymc) parte as cadeias do GLM NB
+    com matriz de massa densa (ver modules/inicializacao_glm.py), o que
+    permite um tune bem menor. Com `grupos` (modelo hierárquico) os índices
+    de grupo também entram na chave.
+
+    As aproximações geram draws * chains amostras numa única cadeia;
+    tune e target_accept só valem para o NUTS.
+    """
+    from modules.traces import chave_trace, trace_em_cache
+
+    if metodo == "nuts":
+        opcoes = {"draws": draws, "tune": tune, "chains": chains, "target_accept": target_accept}
+        if backend != "pymc":
+            opcoes["backend"] = backend
+        if inicializacao != "padrao":
+            if backend != "pymc":
+                raise ValueError("A inicialização pelo GLM só está disponível no backend pymc.")
+            opcoes["inicializacao"] = inicializacao
+    else:
+        opcoes = {"metodo": metodo, "draws": draws * chains}
+    especificacao = ESPECIFICACAO_MODELO if parametrizacao == "original" else f"{ESPECIFICACAO_MODELO}/{parametrizacao}"
+    if grupos is not None:
+        especificacao = f"{especificacao}/{ESPECIFICACAO_HIERARQUICA}"
+        opcoes["grupos"] = {
+            nivel: hashlib.sha1(np.ascontiguousarray(g["indices"], dtype=np.int64).tobytes()).hexdigest()
+            for nivel, g in grupos.items()
+        }
+    chave = chave_trace(X, y, offset, especificacao, **opcoes, seed=random_seed)
+
+    def amostrar():
+        if metodo == "nuts" and inicializacao == "glm":
+            initvals, passo = inicializacao_glm(
+                model, X, y, offset, parametrizacao, chains, target_accept, random_seed
+            )
+            trace = amostrar_backend(
+                model, backend, draws, tune, chains, cores, target_accept, random_seed,
+                initvals=initvals, step=passo, **kwargs
+            )
+        elif metodo == "nuts":
+            trace = amostrar_backend(
+                model, backend, draws, tune, chains, cores, target_accept, random_seed, **kwargs
+            )
+        else:
+            trace = aproximar(model, metodo, draws * chains, random_seed)
+        trace.posterior.attrs["chave_trace"] = chave
+        return trace
+
+    return trace_em_cache(chave, amostrar) if cache else amostrar()
+
+
+# Parametrizações do preditor linear (todas com a mesma posterior de beta/intercepto)
+PARAMETRIZACOES = {
+    "original": "Covariáveis na escala original",
+    "padronizada": "Contínuas centradas e escaladas",
+    "qr": "Padronizada + QR de X",
+}
+
+
+def reparametrizacao(X, modo: str = "padronizada") -> dict:
+    """
+    Desenho bem condicionado para o amostrador e o mapa linear de volta:
+      - padronizada: Z = (X - centro) / escala nas colunas contínuas (as
+        dummies 0/1 ficam como estão);
+      - qr: Z = Q* com Z_padronizada = Q* R*, Q* = Q·sqrt(n-1), R* = R/sqrt(n-1)
+        (colunas ortogonais de variância ~1).
+    Com eta = a + Z @ theta: beta = M @ theta e intercepto = a - centro @ beta.
+    """
+    if modo not in ("padronizada", "qr"):
+        raise ValueError(f"Parametrização desconhecida: {modo!r} (opções: {', '.join(PARAMETRIZACOES)})")
+    X = np.asarray(X, dtype=float)
+    continuas = ~np.all(np.isin(X, (0.0, 1.0)), axis=0)
+    centro = np.where(continuas, X.mean(axis=0), 0.0)
+    escala = np.where(continuas, X.std(axis=0), 1.0)
+    escala[escala == 0] = 1.0
+    Z = (X - centro) / escala
+    M = np.diag(1 / escala)
+    if modo == "qr":
+        Q, R = np.linalg.qr(Z, mode="reduced")
+        fator = np.sqrt(len(Z) - 1)
+        Z = Q * fator
+        M = M @ np.linalg.inv(R / fator)
+    return {"Z": Z, "M": M, "centro": centro}
+
+
+def modelo_nb_pymc(X, y, offset, parametrizacao: str = "original", grupos: dict = None):
+    """
+    Modelo NB com intercepto separado, a partir de matrizes já codificadas.
+
+    Nas parametrizações "padronizada" e "qr" o amostrador anda em
+    (theta, a), no espaço bem condicionado de reparametrizacao(); beta e
+    intercept viram Deterministic na escala original e recebem os mesmos
+    priors via Potential. Como o mapa é linear (jacobiano constante), a
+    posterior de beta/intercept/alpha é a mesma do modelo original.
+
+    Com `grupos` (saída de indices_grupos) o modelo ganha interceptos
+    aleatórios de IES e de município, não centrados:
+        efeito_g = sigma_g * z_g,  z_g ~ N(0, 1),  sigma_g ~ HalfNormal(1)
+    somados ao preditor por indexação (efeito_g[indices]), em O(n) por
+    avaliação independentemente do número de grupos.
+    """
+    import pymc as pm
+
     n, k = X.shape
-    
-    with pm.Model() as model:
-        # Priors
-        beta = pm.Normal("beta", mu=0, sigma=2, shape=k)
-        intercept = pm.Normal("intercept", mu=0, sigma=5)
+    coords = {nivel: g["rotulos"] for nivel, g in (grupos or {}).items()}
+
+    with pm.Model(coords=coords) as model:
+        if parametrizacao == "original":
+            # Priors
+            beta = pm.Normal("beta", mu=0, sigma=2, shape=k)
+            intercept = pm.Normal("intercept", mu=0, sigma=5)
+            eta = intercept + pm.math.dot(X, beta)
+        else:
+            r = reparametrizacao(X, parametrizacao)
+            theta = pm.Flat("theta", shape=k)
+            a = pm.Flat("a")
+            beta = pm.Deterministic("beta", pm.math.dot(r["M"], theta))
+            intercept = pm.Deterministic("intercept", a - pm.math.dot(r["centro"], beta))
+            # Priors na escala original
+            pm.Potential("prior_beta", pm.logp(pm.Normal.dist(mu=0, sigma=2), beta).sum())
+            pm.Potential("prior_intercept", pm.logp(pm.Normal.dist(mu=0, sigma=5), intercept))
+            eta = a + pm.math.dot(r["Z"], theta)
+        # Interceptos aleatórios (parametrização não centrada)
+        for nivel, g in (grupos or {}).items():
+            sigma = pm.HalfNormal(f"sigma_{nivel}", sigma=1)
+            z = pm.Normal(f"z_{nivel}", mu=0, sigma=1, dims=nivel)
+            efeito = pm.Deterministic(f"efeito_{nivel}", sigma * z, dims=nivel)
+            eta = eta + efeito[g["indices"]]
         alpha = pm.Exponential("alpha", 1)
         # Previsão linear + offset
-        mu = pm.math.exp(intercept + pm.math.dot(X, beta) + offset)
+        mu = pm.math.exp(eta + offset)
         # Verossimilhança
         y_obs = pm.NegativeBinomial("y_obs", mu=mu, alpha=alpha, observed=y)
-        # Amostragem
-        trace = pm.sample(2000, tune=1000, chains=4, target_accept=0.95, random_seed=42)
 
-    return model, trace, colnames
+    return model
 
 def tabela_resultados(trace, colnames, hdi_prob=0.94):
-    summary = az.summary(trace, hdi_prob=hdi_prob)
+    import arviz as az
+
+    variaveis = [v for v in ["beta", "intercept", "alpha", *[f"sigma_{n}" for n in NIVEIS_HIERARQUICOS]]
+                 if v in trace.posterior]
+    summary = az.summary(trace, var_names=variaveis, hdi_prob=hdi_prob)
     # Extrair apenas os betas
     betas = summary.loc[[f"beta[{i}]" for i in range(len(colnames))]].copy()
     betas["variável"] = colnames
@@ -261,13 +446,227 @@ def tabela_resultados(trace, colnames, hdi_prob=0.94):
     alpha = summary.loc["alpha"].to_frame().T
     alpha.index = ["Alpha (dispersão)"]
     resultados = pd.concat([betas, intercept, alpha], axis=0)
+    # Desvios-padrão dos interceptos aleatórios (modelo hierárquico)
+    for nivel in NIVEIS_HIERARQUICOS:
+        if f"sigma_{nivel}" in summary.index:
+            sigma = summary.loc[f"sigma_{nivel}"].to_frame().T
+            sigma.index = [f"Sigma ({'IES' if nivel == 'ies' else 'município'})"]
+            resultados = pd.concat([resultados, sigma], axis=0)
     return resultados
 
 
+def efeitos_grupo(trace, nivel: str = "ies", hdi_prob=0.94) -> pd.DataFrame:
+    """
+    Interceptos aleatórios a posteriori de um nível (já encolhidos em
+    direção a zero pelo sigma do nível): média, HDI, razão de taxas
+    exp(média) e probabilidade de o efeito ser positivo.
+    """
+    import arviz as az
+
+    efeito = trace.posterior[f"efeito_{nivel}"]
+    hdi = az.hdi(trace, var_names=[f"efeito_{nivel}"], hdi_prob=hdi_prob)[f"efeito_{nivel}"]
+    media = efeito.mean(("chain", "draw"))
+    limite = int(round(100 * (1 - hdi_prob) / 2))
+    tabela = pd.DataFrame({
+        "Grupo": efeito[nivel].to_numpy(),
+        "Média": media.to_numpy(),
+        f"HDI {limite}%": hdi.sel(hdi="lower").to_numpy(),
+        f"HDI {100 - limite}%": hdi.sel(hdi="higher").to_numpy(),
+        "Razão de taxas": np.exp(media.to_numpy()),
+        "P(efeito > 0)": (efeito > 0).mean(("chain", "draw")).to_numpy(),
+    })
+    return tabela.sort_values("Média", ascending=False).reset_index(drop=True)
+
+
+# Linha de comando
+ARQUIVO_TRACE = "modelo_bayesiano_trace.nc"
+ARQUIVO_RESULTADOS = "resultados_bayes.csv"
+ARQUIVO_MANIFESTO = "modelo_bayesiano.json"
+ARQUIVO_RELATORIO = "relatorio_inferencia.csv"
+ARQUIVO_RELATORIO_PARAMETROS = "relatorio_inferencia_parametros.csv"
+ARQUIVO_BENCHMARK = "benchmark_backends.csv"
+
+
+def carregar_dados(fonte: str) -> pd.DataFrame:
+    """Dados brutos do banco ("banco") ou de um arquivo .csv/.parquet exportado."""
+    if fonte == "banco":
+        df, error = load_complete_ride_data()
+        if error:
+            raise RuntimeError(f"Erro ao carregar dados integrados: {error}")
+        return df
+    caminho = Path(fonte)
+    if caminho.suffix == ".parquet":
+        return pd.read_parquet(caminho)
+    return pd.read_csv(caminho)
+
+
+def chave_execucao(df_model: pd.DataFrame, opcoes: dict) -> str:
+    """
+    Impressão digital dos dados do modelo + especificação + opções do
+    amostrador. No modelo hierárquico entram também os códigos e nomes de
+    IES e município, que definem os grupos.
+    """
+    from modules.artefatos import impressao_digital, chave_artefato
+    from modules.modelo_frequentista import COLUNAS_MODELO
+
+    colunas = list(COLUNAS_MODELO)
+    if opcoes.get("hierarquico"):
+        colunas += [c for nivel in NIVEIS_HIERARQUICOS.values() for c in nivel if c not in colunas]
+    return chave_artefato(impressao_digital(df_model, colunas), ESPECIFICACAO_MODELO, **opcoes)
+
+
+def carregar_trace_publicado(saida: Path = Path(__file__).parent):
+    """
+    Trace publicado pela linha de comando: lido do armazém de traces pela
+    chave do manifesto ou, na falta dele, do arquivo em `saida`.
+    """
+    from modules.traces import carregar_trace
+    import arviz as az
+
+    manifesto = Path(saida) / ARQUIVO_MANIFESTO
+    if manifesto.exists():
+        chave = json.loads(manifesto.read_text()).get("chave_trace")
+        trace = carregar_trace(chave) if chave else None
+        if trace is not None:
+            return trace
+    return az.from_netcdf(Path(saida) / ARQUIVO_TRACE)
+
+
+def comparar_inferencia(df_model, draws=2000, tune=1000, chains=4, cores=None, target_accept=0.95,
+                       random_seed=42, metodos=None, parametrizacao="original", hierarquico=False):
+    """
+    Ajusta o modelo com o NUTS (referência) e com cada método aproximado,
+    todos pelo armazém de traces e na mesma parametrização, e devolve
+    relatorio_precisao das aproximações.
+    """
+    metodos = metodos or [m for m in METODOS_INFERENCIA if m != "nuts"]
+    _, referencia, colnames = ajustar_modelo_bayesiano(
+        df_model, draws, tune, chains, cores, target_accept, random_seed,
+        parametrizacao=parametrizacao, hierarquico=hierarquico
+    )
+    aproximacoes = {
+        metodo: ajustar_modelo_bayesiano(
+            df_model, draws, tune, chains, cores, target_accept, random_seed, metodo,
+            parametrizacao=parametrizacao, hierarquico=hierarquico
+        )[1]
+        for metodo in metodos
+    }
+    detalhes, resumo = relatorio_precisao(aproximacoes, referencia)
+    # beta[i] -> nome da variável, como em tabela_resultados
+    nomes = {f"beta[{i}]": nome for i, nome in enumerate(colnames)}
+    detalhes["parâmetro"] = detalhes["parâmetro"].map(lambda p: nomes.get(p, p))
+    return detalhes, resumo
+
+
+def argumentos(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.Modelo_Bayes",
+        description="Ajusta o modelo Binomial Negativo bayesiano (PyMC) e grava o trace e a tabela de resultados."
+    )
+    parser.add_argument("--draws", type=int, default=2000, help="amostras por cadeia (padrão: 2000)")
+    parser.add_argument("--tune", type=int, default=1000, help="iterações de aquecimento por cadeia (padrão: 1000)")
+    parser.add_argument("--chains", type=int, default=4, help="número de cadeias (padrão: 4)")
+    parser.add_argument("--cores", type=int, default=None, help="processos em paralelo (padrão: automático do PyMC)")
+    parser.add_argument("--seed", type=int, default=42, help="semente aleatória (padrão: 42)")
+    parser.add_argument("--target-accept", type=float, default=0.95, help="taxa de aceitação alvo do NUTS (padrão: 0.95)")
+    parser.add_argument("--saida", type=Path, default=Path(__file__).parent,
+                        help="diretório do trace, do CSV e do manifesto (padrão: modules/)")
+    parser.add_argument("--fonte", default="banco",
+                        help='"banco" (PostgreSQL) ou caminho de um .csv/.parquet com os dados integrados')
+    parser.add_argument("--forcar", action="store_true", help="reamostra mesmo que já exista trace para estes dados")
+    parser.add_argument("--metodo", choices=list(METODOS_INFERENCIA), default="nuts",
+                        help="motor de inferência: NUTS ou uma aproximação (padrão: nuts)")
+    parser.add_argument("--relatorio", action="store_true",
+                        help="compara as aproximações com o NUTS e grava o relatório em --saida (não publica trace)")
+    parser.add_argument("--backend", choices=list(BACKENDS_NUTS), default="pymc",
+                        help="implementação do NUTS (padrão: pymc)")
+    parser.add_argument("--parametrizacao", choices=list(PARAMETRIZACOES), default="original",
+                        help="preditor linear amostrado: original, padronizada ou qr (padrão: original)")
+    parser.add_argument("--inicializacao", choices=list(INICIALIZACOES), default="padrao",
+                        help="glm: cadeias e matriz de massa densa a partir do GLM NB; "
+                             "combine com um --tune menor, ex. 300 (padrão: padrao)")
+    parser.add_argument("--hierarquico", action="store_true",
+                        help="acrescenta interceptos aleatórios de IES e município (não centrados)")
+    parser.add_argument("--benchmark", nargs="*", choices=list(BACKENDS_NUTS), metavar="BACKEND",
+                        help="mede tempo, gradientes/s, ESS/s e divergências de cada backend (padrão: todos) "
+                             "e grava a tabela em --saida (não publica trace)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = argumentos(argv)
+    opcoes = {
+        "draws": args.draws, "tune": args.tune, "chains": args.chains,
+        "seed": args.seed, "target_accept": args.target_accept,
+    }
+    if args.metodo != "nuts":
+        opcoes["metodo"] = args.metodo
+    elif args.backend != "pymc":
+        opcoes["backend"] = args.backend
+    if args.parametrizacao != "original":
+        opcoes["parametrizacao"] = args.parametrizacao
+    if args.inicializacao != "padrao":
+        opcoes["inicializacao"] = args.inicializacao
+    if args.hierarquico:
+        opcoes["hierarquico"] = True
+
+    try:
+        verificar_backend(args.backend)
+    except ImportError as erro:
+        print(erro, file=sys.stderr)
+        return 1
+
+    df_model = preparar_dados(carregar_dados(args.fonte))
+    saida = args.saida
+
+    if args.relatorio:
+        detalhes, resumo = comparar_inferencia(
+            df_model, args.draws, args.tune, args.chains, args.cores, args.target_accept, args.seed,
+            parametrizacao=args.parametrizacao, hierarquico=args.hierarquico
+        )
+        saida.mkdir(parents=True, exist_ok=True)
+        resumo.to_csv(saida / ARQUIVO_RELATORIO)
+        detalhes.to_csv(saida / ARQUIVO_RELATORIO_PARAMETROS, index=False)
+        print(resumo.to_string())
+        return 0
+
+    if args.benchmark is not None:
+        X, y, offset, _ = matrizes_bayes(df_model)
+        tabela = comparar_backends(
+            modelo_nb_pymc(X, y, offset, args.parametrizacao, indices_grupos(df_model) if args.hierarquico else None),
+            args.benchmark or None, args.draws, args.tune, args.chains,
+            args.cores, args.target_accept, args.seed
+        )
+        saida.mkdir(parents=True, exist_ok=True)
+        tabela.to_csv(saida / ARQUIVO_BENCHMARK)
+        print(tabela.to_string())
+        return 0
+
+    chave = chave_execucao(df_model, opcoes)
+    manifesto = saida / ARQUIVO_MANIFESTO
+    if not args.forcar and manifesto.exists() and (saida / ARQUIVO_TRACE).exists():
+        if json.loads(manifesto.read_text()).get("chave") == chave:
+            print(f"Trace já existe para estes dados e especificação ({chave}); nada a fazer.")
+            return 0
+
+    model, trace, colnames = ajustar_modelo_bayesiano(
+        df_model, args.draws, args.tune, args.chains, args.cores, args.target_accept, args.seed,
+        args.metodo, args.backend, args.parametrizacao, args.inicializacao, args.hierarquico
+    )
+    saida.mkdir(parents=True, exist_ok=True)
+    trace.to_netcdf(saida / ARQUIVO_TRACE)
+    tabela_resultados(trace, colnames).to_csv(saida / ARQUIVO_RESULTADOS)
+    manifesto.write_text(json.dumps({
+        "chave": chave,
+        "especificacao": ESPECIFICACAO_MODELO,
+        "chave_trace": trace.posterior.attrs.get("chave_trace"),
+        "opcoes": opcoes,
+        "nobs": len(df_model),
+        "criado_em": datetime.now(timezone.utc).isoformat(),
+    }, indent=2))
+    print(f"Trace e resultados gravados em {saida} ({chave}).")
+    return 0
 
 
-df_model = preparar_dados(df)
-model, trace, colnames = ajustar_modelo_bayesiano(df_model)
-az.to_netcdf(trace, "modelo_bayesiano_trace.nc")
-resultados = tabela_resultados(trace, colnames)
-resultados.to_csv("resultados_bayes.csv")
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from modules.modelo_frequentista import FORMULA, COLUNAS_MODELO
+from modules.matriz_desenho import matriz_modelo, colunas_identificaveis
+
+
+# Chaves de partição disponíveis (coluna -> rótulo)
+PARTICOES = {
+    "sigla_uf": "UF",
+    "nu_ano_censo": "Ano do Censo",
+    "no_cine_area_geral": "Área geral (CINE)",
+    "tp_modalidade_ensino": "Modalidade",
+}
+
+
+# Estado de cada processo trabalhador (definido uma vez por processo)
+_dados = {}
+
+
+def _iniciar_trabalhador(X, y, offset, colunas, alpha, min_obs):
+    _dados.update(X=X, y=y, offset=offset, colunas=colunas, alpha=alpha, min_obs=min_obs)
+
+
+def _ajustar_particao(tarefa):
+    """
+    Ajusta o GLM NB nas linhas de uma partição. Colunas constantes na
+    partição (nível ausente ou a própria variável de partição) são
+    removidas; partições pequenas, com posto incompleto, que falham ou não
+    convergem são devolvidas com o motivo em vez de interromper o lote.
+    """
+    grupo, linhas = tarefa
+    d = _dados
+    X, y, offset = d["X"][linhas], d["y"][linhas], d["offset"][linhas]
+    colunas = np.array(d["colunas"])
+    variaveis = colunas_identificaveis(X, colunas)
+    X, colunas = X[:, variaveis], colunas[variaveis]
+    registro = {"grupo": grupo, "n": len(y), "colunas": list(colunas)}
+
+    if len(y) < max(d["min_obs"], 2 * X.shape[1]):
+        return {**registro, "status": "poucas observações"}
+    if np.linalg.matrix_rank(X) < X.shape[1]:
+        return {**registro, "status": "posto incompleto"}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            modelo = sm.GLM(y, X, family=sm.families.NegativeBinomial(alpha=d["alpha"]), offset=offset).fit()
+    except Exception as erro:
+        return {**registro, "status": f"erro: {erro}"}
+    if not modelo.converged:
+        return {**registro, "status": "não convergiu"}
+    return {**registro, "status": "ok", "params": modelo.params, "ep": modelo.bse, "aic": modelo.aic}
+
+
+def ajustar_subgrupos(df_model: pd.DataFrame, particao: str, formula: str = FORMULA, alpha: float = 1.0,
+                      min_obs: int = 30, n_jobs=None) -> dict:
+    """
+    Ajusta a mesma especificação separadamente em cada valor de `particao`.
+    A fórmula é codificada uma vez sobre todos os dados (mesmos níveis e
+    colunas em todas as partições), a matriz é enviada uma vez a cada
+    processo e as partições são distribuídas como índices de linhas.
+    """
+    matriz = matriz_modelo(df_model, formula, COLUNAS_MODELO)
+    grupos = df_model[particao].to_numpy()[matriz["posicoes"]]
+    codigos, rotulos = pd.factorize(grupos, sort=True)
+    tarefas = [(str(r), np.flatnonzero(codigos == i)) for i, r in enumerate(rotulos)]
+
+    n_jobs = n_jobs or min(len(tarefas), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=max(n_jobs, 1),
+        initializer=_iniciar_trabalhador,
+        initargs=(matriz["X"], matriz["y"], matriz["offset"], list(matriz["colunas"]), alpha, min_obs)
+    ) as executor:
+        ajustes = list(executor.map(_ajustar_particao, tarefas))
+
+    return {
+        "particao": particao,
+        "coeficientes": tabela_coeficientes(ajustes),
+        "status": pd.DataFrame([
+            {"Grupo": a["grupo"], "Cursos": a["n"], "Status": a["status"], "AIC": a.get("aic")}
+            for a in ajustes
+        ]),
+    }
+
+
+def tabela_coeficientes(ajustes, nivel: float = 0.95) -> pd.DataFrame:
+    """Tabela longa (grupo x variável) com coeficiente, EP, IRR, IC de Wald e p-valor."""
+    z = stats.norm.ppf(0.5 + nivel / 2)
+    linhas = []
+    for a in ajustes:
+        if a["status"] != "ok":
+            continue
+        coef, ep = np.asarray(a["params"]), np.asarray(a["ep"])
+        linhas.append(pd.DataFrame({
+            "grupo": a["grupo"],
+            "variavel": a["colunas"],
+            "n": a["n"],
+            "coef": coef,
+            "ep": ep,
+            "irr": np.exp(coef),
+            "ic_low": np.exp(coef - z * ep),
+            "ic_high": np.exp(coef + z * ep),
+            "p_valor": 2 * stats.norm.sf(np.abs(coef / ep)),
+        }))
+    if not linhas:
+        return pd.DataFrame(columns=["grupo", "variavel", "n", "coef", "ep", "irr", "ic_low", "ic_high", "p_valor"])
+    return pd.concat(linhas, ignore_index=True)
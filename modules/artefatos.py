@@ -0,0 +1,55 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+
+DIRETORIO_ARTEFATOS = Path(__file__).parent / "artefatos"
+
+
+# Impressão digital dos dados
+def impressao_digital(df: pd.DataFrame, colunas=None) -> str:
+    """Hash do conteúdo (colunas e valores) usado para identificar os dados."""
+    dados = df if colunas is None else df[list(colunas)]
+    h = hashlib.sha256()
+    h.update(json.dumps([list(map(str, dados.columns)), len(dados)]).encode())
+    h.update(pd.util.hash_pandas_object(dados, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def chave_artefato(impressao: str, formula: str, **opcoes) -> str:
+    """Chave do artefato: impressão digital dos dados + fórmula + opções de ajuste."""
+    formula = " ".join(formula.split())
+    conteudo = json.dumps({"dados": impressao, "formula": formula, **opcoes}, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()[:16]
+
+
+# Persistência
+def _para_json(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, (np.floating, np.integer, np.bool_)):
+        return valor.item()
+    raise TypeError(f"Tipo não serializável: {type(valor)}")
+
+
+def salvar_artefato(chave: str, artefato: dict, diretorio: Path = DIRETORIO_ARTEFATOS) -> Path:
+    """Grava o artefato em <diretorio>/<chave>.json (escrita atômica)."""
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    artefato = {**artefato, "chave": chave, "criado_em": datetime.now(timezone.utc).isoformat()}
+    caminho = diretorio / f"{chave}.json"
+    temporario = caminho.with_suffix(".tmp")
+    temporario.write_text(json.dumps(artefato, default=_para_json, ensure_ascii=False))
+    temporario.replace(caminho)
+    return caminho
+
+
+def carregar_artefato(chave: str, diretorio: Path = DIRETORIO_ARTEFATOS):
+    """Lê o artefato da chave, ou None se ainda não existir."""
+    caminho = Path(diretorio) / f"{chave}.json"
+    if not caminho.exists():
+        return None
+    return json.loads(caminho.read_text())
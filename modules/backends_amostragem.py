@@ -0,0 +1,124 @@
+import importlib.util
+import time
+import numpy as np
+import pandas as pd
+
+
+# Implementações de NUTS aceitas por pm.sample(nuts_sampler=...) (backend -> rótulo)
+BACKENDS_NUTS = {
+    "pymc": "PyMC (padrão, Python)",
+    "numpyro": "NumPyro (JAX, CPU)",
+    "blackjax": "BlackJAX (JAX, CPU)",
+    "nutpie": "nutpie (Rust, compilado)",
+}
+
+# Pacotes que cada backend exige além do PyMC
+_DEPENDENCIAS = {"pymc": [], "numpyro": ["jax", "numpyro"], "blackjax": ["jax", "blackjax"], "nutpie": ["nutpie"]}
+
+
+def backend_disponivel(backend: str) -> bool:
+    """Se os pacotes do backend estão instalados (sem importá-los)."""
+    if backend not in BACKENDS_NUTS:
+        raise ValueError(f"Backend desconhecido: {backend!r} (opções: {', '.join(BACKENDS_NUTS)})")
+    return all(importlib.util.find_spec(p) is not None for p in _DEPENDENCIAS[backend])
+
+
+def verificar_backend(backend: str):
+    """Falha cedo, com o pacote a instalar, se o backend não estiver disponível."""
+    if not backend_disponivel(backend):
+        raise ImportError(
+            f"O backend {backend!r} requer {' e '.join(_DEPENDENCIAS[backend])} "
+            f"(pip install {' '.join(_DEPENDENCIAS[backend])})."
+        )
+
+
+def amostrar_backend(model, backend: str = "pymc", draws=2000, tune=1000, chains=4, cores=None,
+                     target_accept=0.95, random_seed=42, **kwargs):
+    """
+    pm.sample com o backend escolhido. O tempo de parede da chamada inteira
+    (compilação + aquecimento + amostragem) fica em posterior.attrs["tempo_parede"].
+    """
+    import pymc as pm
+
+    verificar_backend(backend)
+    if "step" not in kwargs:
+        # Com um passo já construído (ex.: inicialização pelo GLM), target_accept vai nele
+        kwargs["target_accept"] = target_accept
+    inicio = time.perf_counter()
+    with model:
+        trace = pm.sample(
+            draws, tune=tune, chains=chains, cores=cores, random_seed=random_seed, nuts_sampler=backend, **kwargs
+        )
+    trace.posterior.attrs["tempo_parede"] = time.perf_counter() - inicio
+    trace.posterior.attrs["backend"] = backend
+    return trace
+
+
+# Relatório de desempenho
+def _passos(stats) -> np.ndarray:
+    """Passos leapfrog por iteração (NaN se o backend não os registra)."""
+    return stats["n_steps"].to_numpy() if "n_steps" in stats else np.full(stats["diverging"].shape, np.nan)
+
+
+def desempenho_amostrador(trace, segundos: float = None) -> dict:
+    """
+    Métricas padronizadas de um trace de NUTS:
+      - tempo de parede (compilação + aquecimento + amostragem);
+      - passos leapfrog (= avaliações de gradiente) por amostra e por segundo.
+        O aquecimento entra na contagem quando o trace guarda as estatísticas
+        dele (warmup_sample_stats, com discard_tuned_samples=False); caso
+        contrário só a fase de amostragem é contada, o que fica indicado em
+        "Gradientes contados";
+      - ESS bulk e tail por segundo do pior parâmetro;
+      - número de divergências.
+    """
+    import arviz as az
+
+    segundos = segundos or trace.posterior.attrs.get("tempo_parede") or trace.posterior.attrs.get("sampling_time")
+    stats = trace.sample_stats
+    passos = _passos(stats)
+    total_passos = np.nansum(passos)
+    aquecimento = "warmup_sample_stats" in trace.groups() and "n_steps" in trace.warmup_sample_stats
+    if aquecimento:
+        total_passos += np.nansum(_passos(trace.warmup_sample_stats))
+
+    ess = az.ess(trace, method="bulk")
+    ess_tail = az.ess(trace, method="tail")
+    ess_min = min(float(ess[v].min()) for v in ess.data_vars)
+    ess_tail_min = min(float(ess_tail[v].min()) for v in ess_tail.data_vars)
+
+    return {
+        "Segundos": segundos,
+        "Passos por amostra": float(np.nanmean(passos)),
+        "Gradientes/s": total_passos / segundos if np.isfinite(passos).any() else np.nan,
+        "Gradientes contados": "aquecimento + amostragem" if aquecimento else "só amostragem",
+        "ESS bulk (mín)": ess_min,
+        "ESS tail (mín)": ess_tail_min,
+        "ESS bulk/s": ess_min / segundos,
+        "ESS tail/s": ess_tail_min / segundos,
+        "Divergências": int(stats["diverging"].sum()),
+    }
+
+
+def comparar_backends(model, backends=None, draws=1000, tune=1000, chains=4, cores=None,
+                      target_accept=0.95, random_seed=42) -> pd.DataFrame:
+    """
+    Roda o mesmo modelo em cada backend com as mesmas opções e devolve uma
+    linha de desempenho_amostrador por backend. No PyMC as iterações de
+    aquecimento são mantidas para contar os gradientes delas; os backends
+    externos não as devolvem. Backends não instalados ou que falham entram
+    na tabela com o motivo, sem interromper os demais.
+    """
+    linhas = []
+    for backend in backends or list(BACKENDS_NUTS):
+        linha = {"Backend": BACKENDS_NUTS.get(backend, backend)}
+        opcoes = {"discard_tuned_samples": False} if backend == "pymc" else {}
+        try:
+            trace = amostrar_backend(
+                model, backend, draws, tune, chains, cores, target_accept, random_seed, progressbar=False, **opcoes
+            )
+        except Exception as erro:
+            linhas.append({**linha, "Status": f"erro: {erro}"})
+            continue
+        linhas.append({**linha, "Status": "ok", **desempenho_amostrador(trace)})
+    return pd.DataFrame(linhas).set_index("Backend")
@@ -0,0 +1,137 @@
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+from modules.artefatos import chave_artefato, salvar_artefato, carregar_artefato, DIRETORIO_ARTEFATOS
+from modules.irls import irls_nb
+
+
+# Estado de cada processo trabalhador (definido uma vez por processo)
+_dados = {}
+
+
+def _iniciar_trabalhador(X, y, offset, alpha, beta0, codigos, n_grupos):
+    _dados.update(X=X, y=y, offset=offset, alpha=alpha, beta0=beta0, codigos=codigos, n_grupos=n_grupos)
+
+
+def pesos_bootstrap(rng, n_rep: int, n: int, codigos=None, n_grupos=None) -> np.ndarray:
+    """
+    Pesos de frequência de n_rep réplicas, gerados de uma vez.
+    Reamostrar n casos com reposição equivale a sortear as contagens de uma
+    multinomial; no bootstrap por cluster sorteiam-se os grupos e cada linha
+    herda a contagem do seu grupo.
+    """
+    if codigos is None:
+        return rng.multinomial(n, np.full(n, 1 / n), size=n_rep).astype(float)
+    contagens = rng.multinomial(n_grupos, np.full(n_grupos, 1 / n_grupos), size=n_rep)
+    return contagens[:, codigos].astype(float)
+
+
+def _ajustar_lote(args):
+    """Ajusta um lote de réplicas no processo trabalhador."""
+    semente, n_rep = args
+    d = _dados
+    rng = np.random.default_rng(semente)
+    pesos = pesos_bootstrap(rng, n_rep, len(d["y"]), d["codigos"], d["n_grupos"])
+    k = d["X"].shape[1]
+    betas = np.empty((n_rep, k))
+    convergiu = np.empty(n_rep, dtype=bool)
+    posto_completo = np.empty(n_rep, dtype=bool)
+    for r in range(n_rep):
+        ajuste = irls_nb(d["X"], d["y"], d["offset"], d["alpha"], d["beta0"], pesos[r], tol=1e-6)
+        betas[r] = ajuste["beta"]
+        convergiu[r] = ajuste["convergiu"]
+        # Réplica sem nenhuma linha de algum nível (comum no bootstrap por
+        # cluster): o desenho fica singular e o IRLS cai no mínimos quadrados
+        # de norma mínima, com coeficientes arbitrários
+        posto_completo[r] = np.linalg.matrix_rank(d["X"].T @ (d["X"] * pesos[r][:, None])) == k
+    return betas, convergiu, posto_completo
+
+
+def bootstrap_glm(X, y, offset, beta_hat, alpha: float, n_rep: int = 2000, grupos=None,
+                  semente: int = 42, n_jobs=None, tamanho_lote: int = 50) -> dict:
+    """
+    Bootstrap dos coeficientes do GLM NB: por casos (grupos=None) ou por
+    cluster (grupos = rótulo do cluster de cada linha, ex. co_ies). As
+    réplicas são divididas em lotes entre processos; cada processo recebe
+    os dados uma única vez e cada ajuste parte das estimativas da amostra
+    completa (alpha fixo no valor da amostra completa).
+    """
+    codigos, n_grupos = None, None
+    if grupos is not None:
+        codigos, uniques = pd.factorize(np.asarray(grupos))
+        n_grupos = len(uniques)
+
+    tamanhos = [tamanho_lote] * (n_rep // tamanho_lote)
+    if n_rep % tamanho_lote:
+        tamanhos.append(n_rep % tamanho_lote)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    tarefas = [(s, t) for s, t in zip(sementes, tamanhos)]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_iniciar_trabalhador,
+        initargs=(X, y, offset, alpha, np.asarray(beta_hat), codigos, n_grupos)
+    ) as executor:
+        lotes = list(executor.map(_ajustar_lote, tarefas))
+
+    return {
+        "betas": np.vstack([b for b, _, _ in lotes]),
+        "convergiu": np.concatenate([c for _, c, _ in lotes]),
+        "posto_completo": np.concatenate([p for _, _, p in lotes]),
+        "tipo": "casos" if grupos is None else "cluster",
+        "n_grupos": n_grupos,
+    }
+
+
+def replicas_validas(replicas: dict) -> np.ndarray:
+    """Réplicas que convergiram, com desenho de posto completo e coeficientes finitos."""
+    betas = np.asarray(replicas["betas"])
+    return (
+        np.asarray(replicas["convergiu"], dtype=bool)
+        & np.asarray(replicas["posto_completo"], dtype=bool)
+        & np.isfinite(betas).all(axis=1)
+    )
+
+
+def intervalos_bootstrap(betas, nomes, nivel: float = 0.95, validas=None) -> pd.DataFrame:
+    """
+    Erro-padrão e intervalos percentis (coeficiente e IRR) das réplicas.
+    Com `validas`, apenas as réplicas marcadas entram nos quantis e no EP.
+    """
+    betas = np.asarray(betas)
+    if validas is not None:
+        betas = betas[np.asarray(validas, dtype=bool)]
+    if len(betas) < 2:
+        raise ValueError("Réplicas bootstrap válidas insuficientes para calcular os intervalos.")
+    cauda = (1 - nivel) / 2 * 100
+    baixo, alto = np.percentile(betas, [cauda, 100 - cauda], axis=0)
+    return pd.DataFrame({
+        "Variável": nomes,
+        "EP bootstrap": betas.std(axis=0, ddof=1).round(4),
+        "IRR IC 95% bootstrap (low)": np.exp(baixo).round(3),
+        "IRR IC 95% bootstrap (high)": np.exp(alto).round(3),
+    })
+
+
+def obter_bootstrap(matriz: dict, artefato: dict, n_rep: int = 2000, grupos=None, nome_grupo=None,
+                    semente: int = 42, diretorio=DIRETORIO_ARTEFATOS) -> dict:
+    """
+    Réplicas bootstrap cacheadas no armazém de artefatos, por impressão
+    digital dos dados + especificação do ajuste + configuração do bootstrap.
+    """
+    chave = chave_artefato(
+        artefato["impressao_digital"], artefato["formula"],
+        alpha=artefato["alpha"], bootstrap=nome_grupo or "casos", n_rep=n_rep, semente=semente
+    )
+    resultado = carregar_artefato(chave, diretorio)
+    # Artefatos antigos não têm o diagnóstico de posto: recalcula
+    if resultado is None or "posto_completo" not in resultado:
+        replicas = bootstrap_glm(
+            matriz["X"], matriz["y"], matriz["offset"], artefato["params"], artefato["alpha"],
+            n_rep=n_rep, grupos=grupos, semente=semente
+        )
+        salvar_artefato(chave, {**replicas, "nomes": artefato["nomes"]}, diretorio)
+        resultado = carregar_artefato(chave, diretorio)
+    return resultado
@@ -0,0 +1,138 @@
+import bisect
+import numpy as np
+import pandas as pd
+from modules.tabela_paginada import normalizar_texto
+
+
+# Campos indexados: (tipo, coluna do texto, coluna filtrada pelo resultado)
+CAMPOS_BUSCA = [
+    ("IES", "no_ies", "no_ies"),
+    ("Sigla", "sg_ies", "no_ies"),
+    ("Curso", "no_curso", "no_curso"),
+    ("Área CINE", "no_cine_area_geral", "no_curso"),
+]
+
+
+def _trigramas(texto: str) -> set:
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+# Construção do índice
+def construir_indice_busca(df: pd.DataFrame) -> dict:
+    """
+    Índice de busca sobre nomes de IES, siglas, cursos e áreas CINE:
+    texto normalizado (sem acentos), lista ordenada de palavras para busca
+    por prefixo e listas invertidas de trigramas para busca aproximada.
+    Cada entrada guarda as UFs e IES onde ocorre, para restringir o escopo.
+    """
+    entradas = []
+    for tipo, coluna, alvo in CAMPOS_BUSCA:
+        colunas = list(dict.fromkeys([coluna, alvo, "sigla_uf", "no_ies", "qt_mat"]))
+        base = df[colunas].dropna(subset=[coluna])
+        grupos = base.groupby(coluna, sort=False)
+        for texto, grupo in grupos:
+            entradas.append({
+                "tipo": tipo,
+                "rotulo": str(texto),
+                "alvo": alvo,
+                "valores": tuple(sorted(grupo[alvo].dropna().astype(str).unique())),
+                "ufs": frozenset(grupo["sigla_uf"].dropna()),
+                "ies": frozenset(grupo["no_ies"].dropna()),
+                "peso": float(grupo["qt_mat"].sum()),
+            })
+
+    normalizados = [normalizar_texto(e["rotulo"]) for e in entradas]
+
+    # Nomes completos e palavras ordenados para busca por prefixo
+    nomes = sorted((texto, i) for i, texto in enumerate(normalizados))
+    palavras = sorted(
+        (palavra, i)
+        for i, texto in enumerate(normalizados)
+        for palavra in set(texto.split())
+    )
+
+    # Listas invertidas de trigramas
+    postagens = {}
+    n_trigramas = np.zeros(len(entradas), dtype=np.int32)
+    for i, texto in enumerate(normalizados):
+        tris = _trigramas(texto)
+        n_trigramas[i] = len(tris)
+        for tri in tris:
+            postagens.setdefault(tri, []).append(i)
+
+    return {
+        "entradas": entradas,
+        "nomes": [t for t, _ in nomes],
+        "ids_nomes": np.array([i for _, i in nomes], dtype=np.int32),
+        "palavras": [p for p, _ in palavras],
+        "ids_palavras": np.array([i for _, i in palavras], dtype=np.int32),
+        "postagens": {tri: np.array(ids, dtype=np.int32) for tri, ids in postagens.items()},
+        "n_trigramas": n_trigramas,
+        "pesos": np.array([e["peso"] for e in entradas]),
+    }
+
+
+# Consulta
+def buscar(indice: dict, termo: str, ufs=(), ies=(), tipos=None, limite: int = 20) -> list:
+    """
+    Retorna as entradas mais relevantes para o termo digitado, restritas às
+    UFs/IES ativas. Ordem: texto igual, prefixo do nome, prefixo de palavra e,
+    por fim, similaridade de trigramas; empates são resolvidos pelo número de
+    matrículas.
+    """
+    consulta = normalizar_texto(termo).strip()
+    if not consulta:
+        return []
+
+    n = len(indice["entradas"])
+    pontuacao = np.zeros(n)
+
+    # Similaridade de trigramas (coeficiente de Jaccard)
+    tris = _trigramas(consulta)
+    listas = [indice["postagens"][t] for t in tris if t in indice["postagens"]]
+    if listas:
+        comuns = np.bincount(np.concatenate(listas), minlength=n)
+        pontuacao = comuns / (len(tris) + indice["n_trigramas"] - comuns)
+
+    # Prefixo de palavra (última palavra digitada)
+    ultima = consulta.split()[-1]
+    inicio = bisect.bisect_left(indice["palavras"], ultima)
+    fim = bisect.bisect_left(indice["palavras"], ultima + "\uffff")
+    pontuacao[indice["ids_palavras"][inicio:fim]] += 1.0
+
+    # Prefixo do nome inteiro e texto igual
+    inicio = bisect.bisect_left(indice["nomes"], consulta)
+    fim = bisect.bisect_left(indice["nomes"], consulta + "\uffff")
+    iguais = bisect.bisect_right(indice["nomes"], consulta, inicio, fim)
+    pontuacao[indice["ids_nomes"][inicio:fim]] += 2.0
+    pontuacao[indice["ids_nomes"][inicio:iguais]] += 1.0
+
+    candidatos = np.flatnonzero(pontuacao > 0.2)
+    ordem = candidatos[np.lexsort((-indice["pesos"][candidatos], -pontuacao[candidatos]))]
+
+    ufs, ies = set(ufs), set(ies)
+    resultados = []
+    for i in ordem:
+        entrada = indice["entradas"][i]
+        if tipos and entrada["tipo"] not in tipos:
+            continue
+        if ufs and not ufs & entrada["ufs"]:
+            continue
+        if ies and not ies & entrada["ies"]:
+            continue
+        resultados.append({**entrada, "pontuacao": round(float(pontuacao[i]), 3)})
+        if len(resultados) >= limite:
+            break
+    return resultados
+
+
+def opcoes_em_escopo(indice: dict, tipo: str, ufs=(), ies=()) -> list:
+    """Rótulos de um tipo de entrada presentes nas UFs/IES ativas, em ordem alfabética."""
+    ufs, ies = set(ufs), set(ies)
+    return sorted(
+        e["rotulo"] for e in indice["entradas"]
+        if e["tipo"] == tipo
+        and (not ufs or ufs & e["ufs"])
+        and (not ies or ies & e["ies"])
+    )
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import streamlit as st
+
+
+LIMITE_FIGURAS = 256
+
+# Atributos de traço que o plotly.express preenche com valores vazios ou padrão
+ATRIBUTOS_VAZIOS = ("", None, [], {})
+ATRIBUTOS_PADRAO = {"xaxis": "x", "yaxis": "y"}
+
+
+# Versão do conjunto de dados (barata: formato, colunas e somas numéricas)
+def versao_dataset(df: pd.DataFrame) -> str:
+    """Identificador curto que muda quando os dados carregados mudam."""
+    somas = df.select_dtypes("number").sum().round(6)
+    conteudo = json.dumps([list(df.shape), list(map(str, df.columns)), somas.tolist()])
+    return hashlib.sha1(conteudo.encode()).hexdigest()[:12]
+
+
+# Compactação do spec da figura
+def _compactar_array(valores, casas):
+    arr = np.asarray(valores)
+    if arr.dtype.kind == "f":
+        arr = np.round(arr, casas)
+        if np.all(np.isfinite(arr)) and np.all(arr == np.round(arr)) and np.abs(arr).max(initial=0) < 2**31:
+            arr = arr.astype(np.int32)
+    elif arr.dtype.kind in "iu" and np.abs(arr).max(initial=0) < 2**31:
+        arr = arr.astype(np.int32)
+    return arr
+
+
+def compactar_figura(fig, casas: int = 2) -> dict:
+    """
+    Serializa a figura em um spec JSON compacto: arredonda os valores
+    numéricos, converte contagens para int32 e remove atributos vazios ou
+    com valor padrão.
+    """
+    for trace in fig.data:
+        for attr in ("x", "y", "values", "text"):
+            valor = getattr(trace, attr, None)
+            if isinstance(valor, (tuple, list, np.ndarray)) and len(valor) and not isinstance(valor[0], str):
+                try:
+                    trace[attr] = _compactar_array(valor, casas)
+                except (TypeError, ValueError):
+                    pass
+
+    spec = json.loads(pio.to_json(fig, validate=False))
+    spec["data"] = [
+        {k: v for k, v in trace.items()
+         if v not in ATRIBUTOS_VAZIOS and ATRIBUTOS_PADRAO.get(k) != v}
+        for trace in spec["data"]
+    ]
+    return spec
+
+
+# Cache de figuras por (gráfico, filtros, versão dos dados)
+@st.cache_resource
+def _armazem_figuras():
+    return OrderedDict(), threading.Lock()
+
+
+def figura_cacheada(id_grafico: str, chave_filtros, versao: str, construtor, casas: int = 2) -> dict:
+    """
+    Devolve o spec compacto do gráfico. O construtor só é chamado quando a
+    combinação (gráfico, filtros, versão dos dados) ainda não está no cache.
+    """
+    armazem, trava = _armazem_figuras()
+    chave = (id_grafico, chave_filtros, versao)
+    with trava:
+        spec = armazem.get(chave)
+        if spec is not None:
+            armazem.move_to_end(chave)
+            return spec
+
+    spec = compactar_figura(construtor(), casas)
+    with trava:
+        armazem[chave] = spec
+        while len(armazem) > LIMITE_FIGURAS:
+            armazem.popitem(last=False)
+    return spec
+
+
+def mostrar_figura(id_grafico: str, chave_filtros, versao: str, construtor, casas: int = 2, **kwargs):
+    """Atalho para st.plotly_chart com o spec cacheado."""
+    st.plotly_chart(figura_cacheada(id_grafico, chave_filtros, versao, construtor, casas), **kwargs)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from modules.artefatos import chave_artefato, salvar_artefato, carregar_artefato, DIRETORIO_ARTEFATOS
+
+
+# Influência e resíduos do GLM NB
+def diagnosticos_glm(matriz: dict, artefato: dict) -> dict:
+    """
+    Alavancagem, resíduos e distância de Cook por curso, sem formar a matriz
+    chapéu n x n: a diagonal sai da QR fina do desenho ponderado
+    (W^1/2 X = QR => h_i = soma das linhas de Q²), em O(n·k²). W é a
+    informação observada, como na covariância robusta.
+    """
+    X, y = matriz["X"], matriz["y"]
+    beta, alpha = np.asarray(artefato["params"]), artefato["alpha"]
+    k = X.shape[1]
+    mu = np.exp(X @ beta + matriz["offset"])
+    w = mu * (1 + alpha * y) / (1 + alpha * mu) ** 2
+
+    Q, _ = np.linalg.qr(X * np.sqrt(w)[:, None], mode="reduced")
+    alavancagem = np.einsum("ij,ij->i", Q, Q)
+
+    pearson = (y - mu) / np.sqrt(mu + alpha * mu ** 2)
+    inv = 1.0 / alpha
+    termo_y = np.where(y > 0, y * np.log(np.where(y > 0, y, 1) / mu), 0.0)
+    desvio = np.sign(y - mu) * np.sqrt(np.maximum(
+        2 * (termo_y - (y + inv) * np.log((1 + alpha * y) / (1 + alpha * mu))), 0
+    ))
+    complemento = np.clip(1 - alavancagem, 1e-12, None)
+
+    return {
+        "ajustado": mu,
+        "alavancagem": alavancagem,
+        "residuo_pearson": pearson,
+        "residuo_padronizado": pearson / np.sqrt(complemento),
+        "residuo_desvio": desvio,
+        "cook": pearson ** 2 * alavancagem / (k * complemento ** 2),
+        "k": k,
+    }
+
+
+def obter_diagnosticos(matriz: dict, artefato: dict, diretorio=DIRETORIO_ARTEFATOS) -> dict:
+    """Diagnósticos persistidos junto ao artefato do ajuste (mesma impressão digital e especificação)."""
+    chave = chave_artefato(artefato["impressao_digital"], artefato["formula"], ajuste=artefato["chave"], diagnosticos=1)
+    resultado = carregar_artefato(chave, diretorio)
+    if resultado is None:
+        salvar_artefato(chave, diagnosticos_glm(matriz, artefato), diretorio)
+        resultado = carregar_artefato(chave, diretorio)
+    return {c: np.asarray(v) if isinstance(v, list) else v for c, v in resultado.items()}
+
+
+def tabela_diagnosticos(diagnosticos: dict, df_model: pd.DataFrame, matriz: dict) -> pd.DataFrame:
+    """Uma linha por curso do ajuste, identificada por IES e curso."""
+    linhas = df_model.iloc[matriz["posicoes"]]
+    return pd.DataFrame({
+        "no_ies": linhas["no_ies"].to_numpy(),
+        "no_curso": linhas["no_curso"].to_numpy(),
+        "qt_ing": matriz["y"],
+        "Ajustado": diagnosticos["ajustado"],
+        "Alavancagem": diagnosticos["alavancagem"],
+        "Resíduo padronizado": diagnosticos["residuo_padronizado"],
+        "Resíduo deviance": diagnosticos["residuo_desvio"],
+        "Distância de Cook": diagnosticos["cook"],
+    })
+
+
+def cursos_influentes(tabela: pd.DataFrame, k: int, limite_residuo: float = 3.0, top: int = 25) -> pd.DataFrame:
+    """
+    Cursos sinalizados: Cook > 4/n, alavancagem > 2k/n ou |resíduo
+    padronizado| > limite_residuo; ordenados pela distância de Cook.
+    """
+    n = len(tabela)
+    sinalizados = tabela[
+        (tabela["Distância de Cook"] > 4 / n)
+        | (tabela["Alavancagem"] > 2 * k / n)
+        | (tabela["Resíduo padronizado"].abs() > limite_residuo)
+    ]
+    return sinalizados.nlargest(top, "Distância de Cook")
+
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from modules.irls import loglik_nb, _desvio_nb
+from modules.matriz_desenho import colunas_independentes
+
+
+# Blocos esparsos dos efeitos fixos
+def blocos_indicadores(grupos) -> list:
+    """
+    Uma matriz indicadora esparsa (n x níveis) por dimensão de efeito fixo.
+    Cada linha tem um único 1: a memória cresce com n, não com n x níveis.
+    """
+    blocos = []
+    for codigos in grupos:
+        codigos = np.asarray(codigos)
+        n_niveis = int(codigos.max()) + 1
+        blocos.append(sparse.csr_matrix(
+            (np.ones(len(codigos)), (np.arange(len(codigos)), codigos)), shape=(len(codigos), n_niveis)
+        ))
+    return blocos
+
+
+def centralizar(V, blocos, w, tol=1e-10, max_iter=1000):
+    """
+    Remove de V (n x k) os efeitos fixos por projeções alternadas ponderadas
+    (método de Gauss-Seidel / teorema de Frisch-Waugh-Lovell): subtrai, em
+    cada dimensão, a média ponderada por grupo até estabilizar. Com uma única
+    dimensão basta uma passagem.
+    """
+    V = np.array(V, dtype=float, copy=True)
+    somas_w = [D.T @ w for D in blocos]
+    escala = np.abs(V).max() + 1.0
+    for iteracao in range(1, max_iter + 1):
+        maior = 0.0
+        for D, soma in zip(blocos, somas_w):
+            medias = (D.T @ (V * w[:, None])) / np.where(soma > 0, soma, 1)[:, None]
+            V -= D @ medias
+            maior = max(maior, np.abs(medias).max())
+        if len(blocos) == 1 or maior <= tol * escala:
+            break
+    return V, iteracao
+
+
+def linhas_identificaveis(y, grupos) -> np.ndarray:
+    """
+    Linhas mantidas no ajuste: grupos cujo total de y é zero têm efeito fixo
+    em -infinito (separação) e são descartados, repetindo até estabilizar.
+    """
+    manter = np.ones(len(y), dtype=bool)
+    while True:
+        novo = manter.copy()
+        for codigos in grupos:
+            totais = np.bincount(codigos[manter], weights=y[manter], minlength=codigos.max() + 1)
+            novo &= totais[codigos] > 0
+        if (novo == manter).all():
+            return manter
+        manter = novo
+
+
+# IRLS com efeitos fixos absorvidos
+def irls_nb_efeitos_fixos(X, y, offset, grupos, alpha, beta0=None, tol=1e-8, max_iter=100, tol_colinear=1e-8):
+    """
+    IRLS do GLM NB2 com efeitos fixos de alta cardinalidade absorvidos: em
+    cada iteração a variável de trabalho e as colunas de X são centralizadas
+    nos efeitos fixos (projeções alternadas ponderadas) e só os coeficientes
+    de X são estimados. As dummies nunca são materializadas.
+
+    X não deve ter intercepto (absorvido pelos efeitos fixos). Colunas
+    constantes dentro dos grupos (ex.: características da própria IES com
+    efeito fixo de IES), ou combinações lineares de outras depois da
+    centralização, não são identificáveis e são marcadas como absorvidas.
+    """
+    grupos = [pd.factorize(np.asarray(g))[0] for g in grupos]
+    blocos = blocos_indicadores(grupos)
+    n, k = X.shape
+
+    mu = (y + y.mean()) / 2
+    eta = np.log(mu)
+    manter = np.ones(k, dtype=bool)
+    desvio_anterior = np.inf
+    convergiu = False
+    iteracoes_projecao = 0
+    for iteracao in range(1, max_iter + 1):
+        w = mu / (1 + alpha * mu)
+        z = eta - offset + (y - mu) / mu
+        centrado, it = centralizar(np.column_stack([z, X]), blocos, w)
+        iteracoes_projecao += it
+        z_c, X_c = centrado[:, 0], centrado[:, 1:]
+
+        if iteracao == 1:
+            # Colunas que a centralização zera são colineares com os efeitos
+            # fixos; entre as restantes, combinações lineares que ficam
+            # constantes nos grupos (ex.: x1 + x2 com x2 = valor da IES - x1)
+            # saem pelo QR do desenho centralizado
+            manter = np.linalg.norm(X_c, axis=0) > tol_colinear * (np.linalg.norm(X, axis=0) + 1e-300)
+            manter[manter] = colunas_independentes(X_c[:, manter], tol_colinear)
+        Xw = X_c[:, manter] * w[:, None]
+        beta = np.linalg.solve(X_c[:, manter].T @ Xw, Xw.T @ z_c)
+
+        # Preditor linear: z menos o resíduo da regressão centralizada
+        eta = offset + z - (z_c - X_c[:, manter] @ beta)
+        mu = np.exp(eta)
+
+        desvio = _desvio_nb(y, mu, alpha, np.ones(n))
+        if abs(desvio - desvio_anterior) <= tol * (abs(desvio) + 0.1):
+            convergiu = True
+            break
+        desvio_anterior = desvio
+
+    w = mu / (1 + alpha * mu)
+    X_c = centralizar(X[:, manter], blocos, w)[0]
+    return {
+        "beta": beta,
+        "cov": np.linalg.inv(X_c.T @ (X_c * w[:, None])),
+        "manter": manter,
+        "mu": mu,
+        "efeito_fixo": eta - offset - X[:, manter] @ beta,
+        "n_niveis": [D.shape[1] for D in blocos],
+        "iteracoes": iteracao,
+        "iteracoes_projecao": iteracoes_projecao,
+        "convergiu": convergiu,
+        "llf": loglik_nb(y, mu, alpha),
+        "desvio": desvio,
+    }
@@ -0,0 +1,88 @@
+import secrets
+import time
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+TAMANHO_LOTE = 50_000
+
+# Arquivos gerados ficam na pasta servida pelo próprio Streamlit
+# (server.enableStaticServing, pasta static/ ao lado do Home.py), que os
+# envia direto do disco em blocos, sem passar pela memória do processo
+DIRETORIO_EXPORTACOES = Path(__file__).parent.parent / "static" / "exportacoes"
+URL_EXPORTACOES = "app/static/exportacoes"
+IDADE_MAXIMA_EXPORTACAO = 3600  # segundos
+TAMANHO_MAXIMO_EXPORTACAO = 200 * 1024 * 1024  # acima disso o Streamlit não serve o arquivo
+
+FORMATOS_EXPORTACAO = {
+    "CSV": {"extensao": "csv", "mime": "text/csv"},
+    "Parquet": {"extensao": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+
+def iterar_lotes(df: pd.DataFrame, colunas, tamanho_lote: int = TAMANHO_LOTE):
+    """Percorre o recorte de colunas em lotes de linhas, sem copiar o todo."""
+    for inicio in range(0, len(df), tamanho_lote):
+        yield df.iloc[inicio:inicio + tamanho_lote][colunas]
+
+
+def escrever_csv(df: pd.DataFrame, colunas, destino, tamanho_lote: int = TAMANHO_LOTE):
+    """Escreve o CSV lote a lote (cabeçalho só no primeiro)."""
+    for i, lote in enumerate(iterar_lotes(df, colunas, tamanho_lote)):
+        destino.write(lote.to_csv(index=False, header=(i == 0)).encode("utf-8"))
+    if len(df) == 0:
+        destino.write(df[colunas].to_csv(index=False).encode("utf-8"))
+
+
+def escrever_parquet(df: pd.DataFrame, colunas, destino, tamanho_lote: int = TAMANHO_LOTE):
+    """Escreve o Parquet com um row group por lote (esquema do primeiro lote)."""
+    esquema = pa.Schema.from_pandas(df[colunas].iloc[:tamanho_lote], preserve_index=False)
+    with pq.ParquetWriter(destino, esquema, compression="snappy") as escritor:
+        for lote in iterar_lotes(df, colunas, tamanho_lote):
+            escritor.write_table(pa.Table.from_pandas(lote, schema=esquema, preserve_index=False))
+
+
+def limpar_exportacoes(diretorio: Path = DIRETORIO_EXPORTACOES, idade_maxima: float = IDADE_MAXIMA_EXPORTACAO):
+    """Apaga exportações (e escritas interrompidas) mais antigas que idade_maxima."""
+    limite = time.time() - idade_maxima
+    for caminho in Path(diretorio).glob("*"):
+        if caminho.is_file() and caminho.name != ".gitkeep" and caminho.stat().st_mtime < limite:
+            caminho.unlink(missing_ok=True)
+
+
+def exportar_arquivo(df: pd.DataFrame, colunas, formato: str = "CSV", diretorio: Path = DIRETORIO_EXPORTACOES,
+                     tamanho_lote: int = TAMANHO_LOTE) -> Path:
+    """
+    Grava a exportação lote a lote direto na pasta servida pelo Streamlit,
+    com nome aleatório (não adivinhável), e devolve o caminho. Só um lote
+    fica em memória por vez. A escrita vai para um arquivo parcial,
+    renomeado ao final; exportações antigas são apagadas antes.
+    """
+    diretorio = Path(diretorio)
+    limpar_exportacoes(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+
+    caminho = diretorio / f"{secrets.token_urlsafe(16)}.{FORMATOS_EXPORTACAO[formato]['extensao']}"
+    parcial = caminho.with_name(caminho.name + ".parcial")
+    try:
+        with open(parcial, "wb") as destino:
+            if formato == "Parquet":
+                escrever_parquet(df, colunas, destino, tamanho_lote)
+            else:
+                escrever_csv(df, colunas, destino, tamanho_lote)
+        if parcial.stat().st_size > TAMANHO_MAXIMO_EXPORTACAO:
+            raise ValueError(
+                f"o arquivo passa de {TAMANHO_MAXIMO_EXPORTACAO // 1024 ** 2} MB; aplique filtros ou reduza as colunas."
+            )
+    except BaseException:
+        parcial.unlink(missing_ok=True)
+        raise
+    parcial.replace(caminho)
+    return caminho
+
+
+def url_exportacao(caminho: Path) -> str:
+    """Endereço relativo do arquivo exportado no servidor de arquivos estáticos."""
+    return f"{URL_EXPORTACOES}/{Path(caminho).name}"
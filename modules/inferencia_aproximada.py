@@ -0,0 +1,156 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+
+# Motores de inferência para o modelo NB do PyMC (método -> rótulo)
+METODOS_INFERENCIA = {
+    "nuts": "NUTS (referência)",
+    "advi": "ADVI (campo médio)",
+    "fullrank_advi": "ADVI (posto completo)",
+    "pathfinder": "Pathfinder",
+    "laplace": "Laplace no MAP",
+}
+
+# Otimização do ADVI: Adam converge bem mais que o adagrad padrão com
+# covariáveis em escalas diferentes (qt_conc vs proporções)
+ITERACOES_ADVI = 20000
+TAXA_APRENDIZADO_ADVI = 0.01
+
+
+def aproximar(model, metodo: str, draws: int = 4000, random_seed: int = 42, iteracoes: int = ITERACOES_ADVI):
+    """
+    Posterior aproximada do modelo como InferenceData (uma cadeia com
+    `draws` amostras), com as mesmas variáveis e dimensões do NUTS, de modo
+    que tabela_resultados e as páginas a aceitam sem mudança. O tempo gasto
+    fica em posterior.attrs["sampling_time"], como no pm.sample.
+    """
+    inicio = time.perf_counter()
+    if metodo in ("advi", "fullrank_advi"):
+        idata = _advi(model, metodo, draws, random_seed, iteracoes)
+    elif metodo == "pathfinder":
+        idata = _pathfinder(model, draws, random_seed)
+    elif metodo == "laplace":
+        idata = _laplace(model, draws, random_seed)
+    else:
+        raise ValueError(f"Método de inferência desconhecido: {metodo!r} (opções: {', '.join(METODOS_INFERENCIA)})")
+    idata.posterior.attrs["sampling_time"] = time.perf_counter() - inicio
+    idata.posterior.attrs["metodo"] = metodo
+    return idata
+
+
+def _advi(model, metodo, draws, random_seed, iteracoes):
+    import pymc as pm
+
+    with model:
+        aproximacao = pm.fit(
+            iteracoes, method=metodo, random_seed=random_seed, progressbar=False,
+            obj_optimizer=pm.adam(learning_rate=TAXA_APRENDIZADO_ADVI)
+        )
+    return aproximacao.sample(draws, random_seed=random_seed)
+
+
+def _pathfinder(model, draws, random_seed):
+    try:
+        import pymc_extras as pmx
+    except ImportError as erro:
+        raise ImportError("O Pathfinder requer o pacote pymc-extras (pip install pymc-extras).") from erro
+
+    # Os caminhos rodam em processos separados; com uma única CPU, em série
+    concorrente = "process" if (os.cpu_count() or 1) > 1 else None
+    idata = pmx.fit(
+        method="pathfinder", model=model, num_draws=draws, random_seed=random_seed,
+        concurrent=concorrente, progressbar=False, display_summary=False
+    )
+    return _apenas_posterior(idata)
+
+
+def _laplace(model, draws, random_seed):
+    """
+    Normal multivariada centrada no MAP, no espaço sem restrições (log alpha),
+    com covariância igual à inversa do hessiano negativo do log-posterior.
+    As amostras voltam à escala original pelas transformações do próprio modelo.
+    """
+    import pymc as pm
+    import arviz as az
+    from pymc.blocking import DictToArrayBijection
+
+    with model:
+        mapa = pm.find_MAP(progressbar=False, seed=random_seed)
+    variaveis = model.value_vars
+    ponto = DictToArrayBijection.map({v.name: mapa[v.name] for v in variaveis})
+    hessiano = model.compile_d2logp(vars=model.free_RVs, jacobian=True, negate_output=False)
+    covariancia = np.linalg.inv(-hessiano({v.name: mapa[v.name] for v in variaveis}))
+
+    rng = np.random.default_rng(random_seed)
+    amostras = rng.multivariate_normal(ponto.data, (covariancia + covariancia.T) / 2, size=draws, method="cholesky")
+
+    # Volta à escala original variável a variável (as transformações são elemento a elemento)
+    posterior, inicio = {}, 0
+    for rv, (_, forma, *_) in zip(model.free_RVs, ponto.point_map_info):
+        tamanho = int(np.prod(forma, dtype=int))
+        valores = amostras[:, inicio:inicio + tamanho].reshape(draws, *forma)
+        inicio += tamanho
+        transformacao = model.rvs_to_transforms.get(rv)
+        if transformacao is not None:
+            valores = transformacao.backward(valores, *rv.owner.inputs).eval()
+        posterior[rv.name] = np.asarray(valores)[None, ...]
+    idata = az.from_dict(posterior=posterior)
+    if model.deterministics:
+        # Ex.: beta/intercept na escala original das parametrizações padronizada e QR
+        idata.posterior = pm.compute_deterministics(idata.posterior, model=model, merge_dataset=True, progressbar=False)
+    return idata
+
+
+def _apenas_posterior(idata):
+    """Descarta grupos auxiliares (ex.: diagnósticos do otimizador) e variáveis transformadas."""
+    import arviz as az
+
+    posterior = idata.posterior
+    posterior = posterior[[v for v in posterior.data_vars if not v.endswith("__")]]
+    return az.InferenceData(posterior=posterior)
+
+
+# Relatório de precisão
+def relatorio_precisao(aproximacoes: dict, referencia, var_names=("beta", "intercept", "alpha")) -> tuple:
+    """
+    Compara cada aproximação com uma posterior de referência (NUTS), por
+    parâmetro escalar:
+      - erro padronizado da média: (média_aprox - média_ref) / dp_ref;
+      - razão de desvios-padrão: dp_aprox / dp_ref (< 1 = subestima a incerteza).
+    Devolve (tabela por parâmetro, resumo por método com o tempo gasto).
+    """
+    import arviz as az
+
+    ref = az.summary(referencia, var_names=list(var_names), kind="stats", round_to="none")
+    tempo_ref = referencia.posterior.attrs.get("sampling_time")
+    detalhes, resumo = [], [{
+        "Método": METODOS_INFERENCIA["nuts"], "Segundos": tempo_ref,
+        "Máx |erro padronizado|": 0.0, "Razão de dp (mediana)": 1.0,
+        "Razão de dp (mín)": 1.0, "Razão de dp (máx)": 1.0,
+    }]
+    for metodo, idata in aproximacoes.items():
+        aprox = az.summary(idata, var_names=list(var_names), kind="stats", round_to="none").reindex(ref.index)
+        erro = (aprox["mean"] - ref["mean"]) / ref["sd"]
+        razao = aprox["sd"] / ref["sd"]
+        detalhes.append(pd.DataFrame({
+            "método": metodo,
+            "parâmetro": ref.index,
+            "média (ref)": ref["mean"].to_numpy(),
+            "média": aprox["mean"].to_numpy(),
+            "erro padronizado": erro.to_numpy(),
+            "dp (ref)": ref["sd"].to_numpy(),
+            "dp": aprox["sd"].to_numpy(),
+            "razão de dp": razao.to_numpy(),
+        }))
+        resumo.append({
+            "Método": METODOS_INFERENCIA.get(metodo, metodo),
+            "Segundos": idata.posterior.attrs.get("sampling_time"),
+            "Máx |erro padronizado|": erro.abs().max(),
+            "Razão de dp (mediana)": razao.median(),
+            "Razão de dp (mín)": razao.min(),
+            "Razão de dp (máx)": razao.max(),
+        })
+    detalhes = pd.concat(detalhes, ignore_index=True) if detalhes else pd.DataFrame()
+    return detalhes, pd.DataFrame(resumo).set_index("Método").round(4)
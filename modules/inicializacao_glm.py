@@ -0,0 +1,116 @@
+import warnings
+import numpy as np
+
+
+# Inicializações do NUTS (modo -> rótulo)
+INICIALIZACOES = {
+    "padrao": "Padrão do PyMC (jitter + matriz de massa diagonal)",
+    "glm": "A partir do GLM NB (pontos iniciais + matriz de massa densa)",
+}
+
+# Peso da covariância do GLM na adaptação da matriz de massa, em "amostras
+# equivalentes": domina o começo do aquecimento e é diluída pelas amostras
+PESO_COVARIANCIA_GLM = 100
+
+
+def estimativas_glm(X, y, offset) -> dict:
+    """
+    MLE do NB2 (statsmodels, alpha estimado junto) no mesmo desenho do
+    modelo bayesiano, nas coordenadas g = (intercepto, beta, log alpha_PyMC).
+    O alpha do PyMC é o de forma (= 1/alpha do statsmodels); a covariância
+    de log alpha sai pelo método delta.
+    """
+    import statsmodels.api as sm
+
+    Xc = np.column_stack([np.ones(len(X)), X])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ajuste = sm.NegativeBinomial(y, Xc, offset=offset, loglike_method="nb2").fit(disp=0, maxiter=500)
+    params, cov = np.asarray(ajuste.params), np.asarray(ajuste.cov_params())
+    alpha_sm = params[-1]
+
+    # (intercepto, beta, alpha_sm) -> (intercepto, beta, -log alpha_sm)
+    J = np.eye(len(params))
+    J[-1, -1] = -1 / alpha_sm
+    media = np.concatenate([params[:-1], [-np.log(alpha_sm)]])
+    return {"media": media, "cov": J @ cov @ J.T, "convergiu": bool(ajuste.mle_retvals.get("converged", True))}
+
+
+def _mapa_valores(model, X, parametrizacao: str) -> dict:
+    """Linhas L de cada variável livre (espaço sem restrições) como função linear de g."""
+    k = X.shape[1]
+    mapas = {"alpha_log__": np.column_stack([np.zeros(1), np.zeros((1, k)), np.ones(1)])}
+    if parametrizacao == "original":
+        mapas["beta"] = np.column_stack([np.zeros(k), np.eye(k), np.zeros(k)])
+        mapas["intercept"] = np.column_stack([np.ones(1), np.zeros((1, k)), np.zeros(1)])
+    else:
+        from modules.Modelo_Bayes import reparametrizacao
+
+        r = reparametrizacao(X, parametrizacao)
+        # theta = M^-1 beta; a = intercepto + centro @ beta
+        mapas["theta"] = np.column_stack([np.zeros(k), np.linalg.inv(r["M"]), np.zeros(k)])
+        mapas["a"] = np.column_stack([np.ones(1), r["centro"][None, :], np.zeros(1)])
+    return {v.name: mapas[v.name] for v in model.value_vars if v.name in mapas}
+
+
+def inicializacao_glm(model, X, y, offset, parametrizacao: str = "original", chains: int = 4,
+                      target_accept: float = 0.95, random_seed=42, peso: float = PESO_COVARIANCIA_GLM):
+    """
+    Pontos iniciais e passo NUTS a partir do GLM:
+      - cada cadeia parte de uma amostra de N(g_glm, V_glm), levada ao espaço
+        da parametrização do modelo;
+      - a matriz de massa densa começa na covariância do GLM nesse espaço
+        (QuadPotentialFullAdapt) e continua adaptando durante o aquecimento.
+    Com a geometria já aproximada, o aquecimento pode ser bem mais curto.
+    """
+    import pymc as pm
+    from pymc.step_methods.hmc.quadpotential import QuadPotentialFullAdapt
+
+    glm = estimativas_glm(X, y, offset)
+    mapas = _mapa_valores(model, X, parametrizacao)
+
+    # Variáveis sem equivalente no GLM (ex.: z e log sigma dos efeitos de grupo
+    # do modelo hierárquico) partem do ponto inicial do modelo, com variância 1
+    inicial = model.initial_point()
+    extras = [v.name for v in model.value_vars if v.name not in mapas]
+    tamanhos = {nome: np.size(inicial[nome]) for nome in extras}
+    n_extras = sum(tamanhos.values())
+    media_ext = np.concatenate([glm["media"], *[np.ravel(inicial[nome]) for nome in extras]])
+    cov_ext = np.block([
+        [glm["cov"], np.zeros((len(glm["media"]), n_extras))],
+        [np.zeros((n_extras, len(glm["media"]))), np.eye(n_extras)],
+    ])
+    linhas, posicao = [], len(glm["media"])
+    for v in model.value_vars:
+        if v.name in mapas:
+            linhas.append(np.column_stack([mapas[v.name], np.zeros((mapas[v.name].shape[0], n_extras))]))
+        else:
+            seletor = np.zeros((tamanhos[v.name], len(media_ext)))
+            seletor[:, posicao:posicao + tamanhos[v.name]] = np.eye(tamanhos[v.name])
+            linhas.append(seletor)
+            posicao += tamanhos[v.name]
+    L = np.vstack(linhas)
+    media = L @ media_ext
+    cov = L @ cov_ext @ L.T
+    cov = (cov + cov.T) / 2
+
+    # Pontos iniciais por cadeia, de volta à escala restrita (log -> exp)
+    rng = np.random.default_rng(random_seed)
+    limites = np.cumsum([0] + [linha.shape[0] for linha in linhas])
+    initvals = []
+    for z in rng.multivariate_normal(media, cov, size=chains, method="cholesky"):
+        ponto = {}
+        for i, v in enumerate(model.value_vars):
+            valor = z[limites[i]:limites[i + 1]].reshape(np.shape(inicial[v.name]))
+            if v.name.endswith("_log__"):
+                ponto[v.name[:-len("_log__")]] = np.exp(valor)
+            else:
+                ponto[v.name] = valor
+        initvals.append(ponto)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # "experimental feature"
+        potencial = QuadPotentialFullAdapt(len(media), media, cov, initial_weight=peso)
+    with model:
+        passo = pm.NUTS(potential=potencial, target_accept=target_accept)
+    return initvals, passo
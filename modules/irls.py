@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import warnings
+import numpy as np
+from scipy import optimize
+from scipy.special import gammaln
+
+
+# Núcleo numérico do GLM Binomial Negativo (NB2, ligação log)
+def loglik_nb(y, mu, alpha, pesos=None):
+    """Log-verossimilhança NB2 (soma ponderada por pesos de frequência)."""
+    inv = 1.0 / alpha
+    ll = (
+        gammaln(y + inv) - gammaln(inv) - gammaln(y + 1)
+        + y * np.log(alpha * mu / (1 + alpha * mu))
+        - inv * np.log1p(alpha * mu)
+    )
+    return float(ll.sum() if pesos is None else ll @ pesos)
+
+
+def irls_nb(X, y, offset, alpha, beta0=None, pesos=None, tol=1e-8, max_iter=100):
+    """
+    IRLS do GLM NB2 com alpha fixo. Aceita coeficientes iniciais (warm start)
+    e pesos de frequência (usados no bootstrap). Retorna coeficientes, médias
+    ajustadas, pesos de trabalho e diagnóstico de convergência.
+    """
+    n, k = X.shape
+    pesos = np.ones(n) if pesos is None else np.asarray(pesos, dtype=float)
+    if beta0 is None:
+        # Início padrão do statsmodels: mu = (y + média) / 2
+        mu = (y + y.mean()) / 2
+        eta = np.log(mu)
+        beta = None
+    else:
+        beta = np.asarray(beta0, dtype=float)
+        eta = X @ beta + offset
+        mu = np.exp(eta)
+
+    desvio_anterior = np.inf
+    convergiu = False
+    for iteracao in range(1, max_iter + 1):
+        w = pesos * mu / (1 + alpha * mu)
+        z = eta - offset + (y - mu) / mu
+        Xw = X * w[:, None]
+        try:
+            beta = np.linalg.solve(X.T @ Xw, Xw.T @ z)
+        except np.linalg.LinAlgError:
+            beta = np.linalg.lstsq(X.T @ Xw, Xw.T @ z, rcond=None)[0]
+        eta = X @ beta + offset
+        mu = np.exp(eta)
+
+        desvio = _desvio_nb(y, mu, alpha, pesos)
+        if abs(desvio - desvio_anterior) <= tol * (abs(desvio) + 0.1):
+            convergiu = True
+            break
+        desvio_anterior = desvio
+
+    w = pesos * mu / (1 + alpha * mu)
+    return {
+        "beta": beta,
+        "mu": mu,
+        "w": w,
+        "alpha": alpha,
+        "iteracoes": iteracao,
+        "convergiu": convergiu,
+        "llf": loglik_nb(y, mu, alpha, pesos),
+        "desvio": desvio,
+    }
+
+
+def _desvio_nb(y, mu, alpha, pesos):
+    inv = 1.0 / alpha
+    termo_y = np.where(y > 0, y * np.log(np.where(y > 0, y, 1) / mu), 0.0)
+    d = 2 * (termo_y - (y + inv) * np.log((1 + alpha * y) / (1 + alpha * mu)))
+    return float(d @ pesos)
+
+
+# Estimação de alpha por verossimilhança perfilada
+def perfil_alpha(X, y, offset, grade, beta0=None, pesos=None, n_jobs=None):
+    """
+    Log-verossimilhança perfilada em cada alpha da grade. Os pontos são
+    avaliados em paralelo (threads; a álgebra linear libera o GIL), todos
+    partindo do mesmo beta0.
+    """
+    n_jobs = n_jobs or min(len(grade), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        ajustes = list(executor.map(lambda a: irls_nb(X, y, offset, a, beta0, pesos), grade))
+    return ajustes
+
+
+# Limites da extensão da grade de alpha (fora deles, o máximo é tratado como de fronteira)
+LIMITES_ALPHA = (1e-8, 1e4)
+
+
+def estimar_alpha(X, y, offset, beta0=None, pesos=None, grade=None, n_jobs=None, tol=1e-4):
+    """
+    MLE NB2 completo: perfil de alpha em uma grade log-espaçada (paralela),
+    seguido de refinamento de Brent em log(alpha) dentro do intervalo do
+    melhor ponto. Cada passo do refinamento reaproveita os coeficientes do
+    passo anterior, de modo que o IRLS converge em poucas iterações.
+
+    Se o melhor ponto está numa ponta da grade, a grade é estendida para
+    aquele lado (mesmo espaçamento, até LIMITES_ALPHA) até o máximo ficar
+    no interior. Se não ficar (ex.: dados sem sobredispersão, alpha -> 0),
+    o resultado sai com perfil["interior"] = False e um aviso, em vez de
+    apresentar o valor da ponta como MLE.
+    """
+    grade = np.logspace(-3, 1.5, 10) if grade is None else np.asarray(grade, dtype=float)
+    if beta0 is None:
+        beta0 = irls_nb(X, y, offset, float(np.median(grade)), pesos=pesos)["beta"]
+    ajustes = perfil_alpha(X, y, offset, grade, beta0, pesos, n_jobs)
+    llfs = np.array([a["llf"] for a in ajustes])
+    melhor = int(np.argmax(llfs))
+
+    passo = float(np.diff(np.log(grade)).mean()) if len(grade) > 1 else np.log(10)
+    while melhor in (0, len(grade) - 1):
+        # Três pontos por vez para o lado do máximo, partindo dos coeficientes da ponta
+        sentido = -1 if melhor == 0 else 1
+        novos = np.exp(np.log(grade[melhor]) + sentido * passo * np.arange(1, 4))
+        novos = novos[(novos >= LIMITES_ALPHA[0]) & (novos <= LIMITES_ALPHA[1])]
+        if len(novos) == 0:
+            break
+        extras = perfil_alpha(X, y, offset, novos, ajustes[melhor]["beta"], pesos, n_jobs)
+        if sentido < 0:
+            grade, ajustes = np.concatenate([novos[::-1], grade]), extras[::-1] + ajustes
+        else:
+            grade, ajustes = np.concatenate([grade, novos]), ajustes + extras
+        llfs = np.array([a["llf"] for a in ajustes])
+        melhor = int(np.argmax(llfs))
+
+    interior = 0 < melhor < len(grade) - 1
+    if not interior:
+        warnings.warn(
+            f"O máximo do perfil de alpha ficou na fronteira ({grade[melhor]:.3g}); "
+            "alpha não é estimado no interior do intervalo.",
+            RuntimeWarning
+        )
+
+    log_grade = np.log(grade)
+    limites = (log_grade[max(melhor - 1, 0)], log_grade[min(melhor + 1, len(grade) - 1)])
+    estado = {"beta": ajustes[melhor]["beta"], "iteracoes": 0}
+
+    def negativo_llf(log_alpha):
+        ajuste = irls_nb(X, y, offset, float(np.exp(log_alpha)), estado["beta"], pesos)
+        estado["beta"] = ajuste["beta"]
+        estado["iteracoes"] += ajuste["iteracoes"]
+        return -ajuste["llf"]
+
+    resultado = optimize.minimize_scalar(negativo_llf, bounds=limites, method="bounded", options={"xatol": tol})
+    alpha = float(np.exp(resultado.x))
+    final = irls_nb(X, y, offset, alpha, estado["beta"], pesos)
+
+    return {
+        **final,
+        "perfil": {"alpha": grade.tolist(), "llf": llfs.tolist(), "interior": interior},
+        "iteracoes_refinamento": estado["iteracoes"],
+    }
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+MEDIDAS_MAPA = {
+    "qt_mat": "Matrículas",
+    "qt_ing": "Ingressantes",
+    "qt_conc": "Concluintes",
+    "qt_vg_total": "Vagas"
+}
+
+
+def geometria_municipios(df: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por município: nome, UF e coordenadas."""
+    return (
+        df.dropna(subset=["longitude", "latitude"])
+        .drop_duplicates(subset=["co_municipio_ies"])
+        .set_index("co_municipio_ies")[["nome_municipio", "sigla_uf", "longitude", "latitude"]]
+        .astype({"longitude": "float32", "latitude": "float32"})
+    )
+
+
+def totais_por_grupo(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Totais pré-calculados por município x IES x curso. Os filtros da página
+    (UF, IES, curso) são aplicados sobre esta tabela, bem menor que os dados
+    linha a linha.
+    """
+    return (
+        df.groupby(["co_municipio_ies", "sigla_uf", "no_ies", "no_curso"], as_index=False, observed=True)
+        .agg(**{medida: (medida, "sum") for medida in MEDIDAS_MAPA}, n_cursos=("co_curso", "nunique"))
+    )
+
+
+def totais_municipio(grupos: pd.DataFrame, ufs=(), ies=(), cursos=()) -> pd.DataFrame:
+    """Aplica os filtros e agrega os totais por município."""
+    mascara = np.ones(len(grupos), dtype=bool)
+    if ufs:
+        mascara &= grupos["sigla_uf"].isin(ufs).to_numpy()
+    if ies:
+        mascara &= grupos["no_ies"].isin(ies).to_numpy()
+    if cursos:
+        mascara &= grupos["no_curso"].isin(cursos).to_numpy()
+    filtrado = grupos[mascara]
+    return filtrado.groupby("co_municipio_ies").agg(
+        **{medida: (medida, "sum") for medida in MEDIDAS_MAPA},
+        n_ies=("no_ies", "nunique"),
+        n_cursos=("n_cursos", "sum")
+    )
+
+
+def figura_mapa(totais: pd.DataFrame, geometria: pd.DataFrame, medida: str = "qt_mat") -> go.Figure:
+    """
+    Mapa de bolhas (WebGL/MapLibre) com um ponto por município, com área
+    proporcional à medida escolhida.
+    """
+    pontos = geometria.join(totais, how="inner")
+    valores = pontos[medida].fillna(0).to_numpy()
+    tamanho = 6 + 34 * np.sqrt(valores / valores.max()) if len(valores) and valores.max() > 0 else 6
+
+    fig = go.Figure(go.Scattermap(
+        lon=pontos["longitude"],
+        lat=pontos["latitude"],
+        mode="markers",
+        marker={"size": tamanho, "color": valores, "colorscale": "Blugrn", "showscale": True,
+                "colorbar": {"title": MEDIDAS_MAPA[medida]}},
+        customdata=np.column_stack([pontos["nome_municipio"], pontos["sigla_uf"], valores,
+                                    pontos["n_ies"], pontos["n_cursos"]]),
+        hovertemplate=(
+            "<b>%{customdata[0]} - %{customdata[1]}</b><br>"
+            f"{MEDIDAS_MAPA[medida]}: " "%{customdata[2]:,}<br>"
+            "IES: %{customdata[3]}<br>Cursos: %{customdata[4]}<extra></extra>"
+        )
+    ))
+    fig.update_layout(
+        map={"style": "carto-positron", "zoom": 6.5,
+             "center": {"lon": float(pontos["longitude"].mean()) if len(pontos) else -47.9,
+                        "lat": float(pontos["latitude"].mean()) if len(pontos) else -15.8}},
+        margin={"l": 0, "r": 0, "t": 0, "b": 0},
+        height=600
+    )
+    return fig
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import patsy
+from modules.artefatos import impressao_digital
+
+
+LIMITE_MATRIZES = 8
+
+_matrizes = OrderedDict()
+_trava = threading.Lock()
+
+
+# Compilação da fórmula
+def compilar_desenho(formula: str, df_model: pd.DataFrame) -> dict:
+    """
+    Interpreta a fórmula uma única vez e guarda as codificações (níveis das
+    categóricas, contraste de referência) para reaplicá-las a qualquer
+    DataFrame com as mesmas colunas: subconjuntos, folds, perfis de predição.
+    """
+    y, X = patsy.dmatrices(formula, df_model, return_type="dataframe")
+    return {
+        "formula": " ".join(formula.split()),
+        "info_y": y.design_info,
+        "info_x": X.design_info,
+        "colunas": list(X.columns),
+        "resposta": y.columns[0],
+    }
+
+
+def codificar(desenho: dict, df: pd.DataFrame, offset: str = "offset_log_qtmat") -> dict:
+    """
+    Aplica o desenho compilado a um DataFrame. Linhas com valores ausentes
+    são descartadas (como no smf.glm); 'linhas' guarda o índice mantido e
+    'posicoes' as posições correspondentes no DataFrame de entrada.
+    """
+    y, X = patsy.build_design_matrices([desenho["info_y"], desenho["info_x"]], df, return_type="dataframe")
+    return {
+        "y": np.ascontiguousarray(y.to_numpy()[:, 0], dtype=float),
+        "X": np.ascontiguousarray(X.to_numpy(), dtype=float),
+        "offset": df.loc[X.index, offset].to_numpy(dtype=float) if offset else np.zeros(len(X)),
+        "linhas": X.index,
+        "posicoes": df.index.get_indexer(X.index),
+        "colunas": desenho["colunas"],
+    }
+
+
+def codificar_exog(desenho: dict, df: pd.DataFrame) -> np.ndarray:
+    """Só a matriz X (para perfis sem a variável resposta)."""
+    (X,) = patsy.build_design_matrices([desenho["info_x"]], df, return_type="dataframe")
+    return np.ascontiguousarray(X.to_numpy(), dtype=float)
+
+
+# Cache das matrizes por versão dos dados
+def matriz_modelo(df_model: pd.DataFrame, formula: str, colunas_impressao=None) -> dict:
+    """
+    Desenho compilado + matrizes codificadas para estes dados e fórmula,
+    reaproveitadas entre reajustes enquanto a impressão digital não mudar.
+    """
+    impressao = impressao_digital(df_model, colunas_impressao)
+    chave = (impressao, " ".join(formula.split()))
+    with _trava:
+        entrada = _matrizes.get(chave)
+        if entrada is not None:
+            _matrizes.move_to_end(chave)
+            return entrada
+
+    desenho = compilar_desenho(formula, df_model)
+    entrada = {**codificar(desenho, df_model), "desenho": desenho, "impressao_digital": impressao}
+    entrada["X"].setflags(write=False)
+    with _trava:
+        _matrizes[chave] = entrada
+        while len(_matrizes) > LIMITE_MATRIZES:
+            _matrizes.popitem(last=False)
+    return entrada
+
+
+def exog_dataframe(matriz: dict, linhas=None) -> pd.DataFrame:
+    """X como DataFrame com nomes de colunas (sem cópia quando linhas=None)."""
+    X = matriz["X"] if linhas is None else matriz["X"][linhas]
+    return pd.DataFrame(X, columns=matriz["colunas"], copy=False)
+
+
+def colunas_independentes(X: np.ndarray, tol: float = 1e-8) -> np.ndarray:
+    """
+    Máscara das colunas que não são combinação linear das anteriores (na
+    ordem dada), pelo QR das colunas normalizadas: |R_jj| é a distância da
+    coluna j ao espaço das anteriores. Colunas nulas devem ser removidas antes.
+    """
+    k = X.shape[1]
+    if k == 0:
+        return np.ones(0, dtype=bool)
+    Xs = X / np.linalg.norm(X, axis=0)
+    diagonal = np.zeros(k)
+    r = np.abs(np.diag(np.linalg.qr(Xs, mode="r")))
+    diagonal[:len(r)] = r  # com menos linhas que colunas, as excedentes são dependentes
+    return diagonal > tol * diagonal.max()
+
+
+def colunas_identificaveis(X: np.ndarray, colunas, tol: float = 1e-8) -> np.ndarray:
+    """
+    Máscara das colunas identificáveis nas linhas de X (o intercepto é sempre
+    mantido). Em subconjuntos de linhas, níveis ausentes viram colunas de
+    zeros e variáveis fixadas pelo filtro ficam colineares com o intercepto;
+    se o filtro remove o nível de referência, as dummies restantes somam o
+    intercepto. Além das colunas sem variação, remove cada coluna que é
+    combinação linear das anteriores (na ordem do desenho).
+    """
+    mascara = (np.ptp(X, axis=0) > 0) | (np.asarray(colunas) == "Intercept")
+    indices = np.flatnonzero(mascara)
+    mascara[indices] = colunas_independentes(X[:, indices], tol)
+    return mascara
+    Xs = X[:, indices]
+    Xs = Xs / np.linalg.norm(Xs, axis=0)
+    diagonal = np.zeros(len(indices))
+    r = np.abs(np.diag(np.linalg.qr(Xs, mode="r")))
+    diagonal[:len(r)] = r  # com menos linhas que colunas, as excedentes são dependentes
+    mascara[indices[diagonal <= tol * diagonal.max()]] = False
+    return mascara
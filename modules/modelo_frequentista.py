@@ -0,0 +1,330 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from modules.artefatos import (
+    impressao_digital, chave_artefato, salvar_artefato, carregar_artefato, DIRETORIO_ARTEFATOS
+)
+from modules.matriz_desenho import matriz_modelo, exog_dataframe, colunas_identificaveis
+from modules.irls import estimar_alpha
+from modules.efeitos_fixos import irls_nb_efeitos_fixos, linhas_identificaveis, blocos_indicadores
+
+
+FORMULA = """
+qt_ing ~ C(tp_rede)
+    + C(tp_organizacao_academica)
+    + C(tp_grau_academico)
+    + C(tp_modalidade_ensino)
+    + qt_conc
+    + prop_doc_avancado
+    + prop_ing_pp
+    + prop_ing_financiados
+"""
+
+# Colunas que determinam o ajuste (entram na impressão digital dos dados)
+COLUNAS_MODELO = [
+    "qt_ing",
+    "tp_rede",
+    "tp_organizacao_academica",
+    "tp_grau_academico",
+    "tp_modalidade_ensino",
+    "qt_conc",
+    "prop_doc_avancado",
+    "prop_ing_pp",
+    "prop_ing_financiados",
+    "offset_log_qtmat"
+]
+
+CATEGORICAS = ["tp_rede", "tp_organizacao_academica", "tp_grau_academico", "tp_modalidade_ensino"]
+
+# Dimensões de efeito fixo disponíveis (coluna -> rótulo)
+EFEITOS_FIXOS = {"co_ies": "IES", "co_municipio_ies": "Município"}
+
+CAMINHO_RESULTADOS = Path(__file__).parent / "resultados_freq.csv"
+
+
+# Função de preparação
+def preparar_dados(df: pd.DataFrame) -> pd.DataFrame:
+    """Cria variáveis derivadas e prepara dados para modelagem NB."""
+    df = df.copy()
+    df.columns = [c.lower() for c in df.columns]
+
+    # Total de docentes
+    df["qt_doc_total_calc"] = (
+        df["qt_doc_ex_grad"].fillna(0)
+        + df["qt_doc_ex_esp"].fillna(0)
+        + df["qt_doc_ex_mest"].fillna(0)
+        + df["qt_doc_ex_dout"].fillna(0)
+    )
+
+    # Proporção de docentes avançados (mestres + doutores)
+    df["prop_doc_avancado"] = (
+        (df["qt_doc_ex_mest"].fillna(0) + df["qt_doc_ex_dout"].fillna(0))
+        / df["qt_doc_total_calc"].replace(0, np.nan)
+    )
+
+    # Proporções de ingressantes
+    df["prop_ing_pp"] = (df["qt_ing_preta"] + df["qt_ing_parda"]) / df["qt_ing"].replace(0, np.nan)
+    df["prop_ing_financiados"] = (
+        df["qt_ing_fies"] + df["qt_ing_prounii"] + df["qt_ing_prounip"]
+    ) / df["qt_ing"].replace(0, np.nan)
+
+    # Tratar NaN e limitar
+    for col in ["prop_doc_avancado", "prop_ing_pp", "prop_ing_financiados"]:
+        df[col] = df[col].fillna(0).clip(0, 1)
+
+    # Remover linhas inválidas
+    df_model = df[(df["qt_ing"].notnull()) & (df["qt_ing"] >= 0) & (df["qt_mat"] > 0)].copy()
+
+    # Criar offset
+    df_model["offset_log_qtmat"] = np.log(df_model["qt_mat"])
+
+    return df_model
+
+
+# Ajuste do modelo
+def ajustar_modelo(df_model: pd.DataFrame, formula: str = FORMULA, estimar_dispersao: bool = False):
+    """
+    Ajusta regressão Binomial Negativa com offset log(qt_mat), usando a
+    matriz de desenho compilada e cacheada para estes dados.
+
+    Com estimar_dispersao=True, alpha é estimado por máxima verossimilhança
+    perfilada (IRLS com warm start) em vez de fixado em 1; o GLM final parte
+    dos coeficientes do perfil e converge em uma ou duas iterações.
+    """
+    matriz = matriz_modelo(df_model, formula, COLUNAS_MODELO)
+    alpha, inicio, perfil = 1.0, None, None
+    if estimar_dispersao:
+        ajuste = estimar_alpha(matriz["X"], matriz["y"], matriz["offset"])
+        alpha, inicio, perfil = ajuste["alpha"], ajuste["beta"], ajuste["perfil"]
+
+    modelo = sm.GLM(
+        pd.Series(matriz["y"], name=matriz["desenho"]["resposta"]),
+        exog_dataframe(matriz),
+        family=sm.families.NegativeBinomial(alpha=alpha),
+        offset=matriz["offset"]
+    ).fit(start_params=inicio)
+    modelo.perfil_alpha = perfil
+
+    return modelo
+
+
+# Artefato do ajuste
+def extrair_artefato(modelo, df_model: pd.DataFrame, impressao: str, formula: str = FORMULA) -> dict:
+    """Parâmetros, covariância, estatísticas de ajuste e metadados do desenho."""
+    return {
+        "impressao_digital": impressao,
+        "formula": " ".join(formula.split()),
+        "familia": "NegativeBinomial",
+        "alpha": float(modelo.model.family.alpha),
+        "alpha_estimado": getattr(modelo, "perfil_alpha", None) is not None,
+        "perfil_alpha": getattr(modelo, "perfil_alpha", None),
+        "nomes": list(modelo.params.index),
+        "params": modelo.params.to_numpy(),
+        "cov": modelo.cov_params().to_numpy(),
+        "estatisticas": {
+            "nobs": int(modelo.nobs),
+            "df_model": float(modelo.df_model),
+            "df_resid": float(modelo.df_resid),
+            "llf": float(modelo.llf),
+            "aic": float(modelo.aic),
+            "bic": float(getattr(modelo, "bic_llf", modelo.bic)),
+            "deviance": float(modelo.deviance),
+            "pearson_chi2": float(modelo.pearson_chi2),
+            "iteracoes": int(modelo.fit_history["iteration"]),
+            "convergiu": bool(modelo.converged),
+        },
+        "desenho": {
+            "colunas": list(modelo.model.exog_names),
+            "resposta": modelo.model.endog_names,
+            "offset": "offset_log_qtmat",
+            "niveis": {col: sorted(df_model[col].dropna().astype(str).unique()) for col in CATEGORICAS},
+        },
+    }
+
+
+def obter_artefato(df_model: pd.DataFrame, formula: str = FORMULA, estimar_dispersao: bool = False,
+                   diretorio: Path = DIRETORIO_ARTEFATOS) -> dict:
+    """
+    Carrega o artefato do ajuste para estes dados + fórmula; só reajusta o
+    modelo (e grava o novo artefato) quando os dados ou a fórmula mudam.
+    """
+    impressao = impressao_digital(df_model, COLUNAS_MODELO)
+    chave = chave_artefato(impressao, formula, estimar_dispersao=estimar_dispersao)
+    artefato = carregar_artefato(chave, diretorio)
+    # Perfis antigos de alpha não verificavam se o máximo era interior: reajusta
+    desatualizado = artefato is not None and estimar_dispersao and "interior" not in (artefato.get("perfil_alpha") or {})
+    if artefato is None or desatualizado:
+        modelo = ajustar_modelo(df_model, formula, estimar_dispersao)
+        artefato = extrair_artefato(modelo, df_model, impressao, formula)
+        salvar_artefato(chave, artefato, diretorio)
+        artefato = carregar_artefato(chave, diretorio)
+    return artefato
+
+
+# Reajuste na seleção filtrada
+def ajustar_filtrado(df_model: pd.DataFrame, mascara, artefato: dict) -> dict:
+    """
+    Reajusta o modelo só nas linhas selecionadas (mascara alinhada a
+    df_model), reaproveitando a matriz codificada dos dados completos por
+    subconjunto de linhas e partindo dos coeficientes do ajuste completo.
+    Colunas sem variação ou colineares na seleção são removidas; se o
+    desenho restante ainda for singular ou o ajuste não convergir, levanta
+    ValueError em vez de devolver coeficientes arbitrários.
+    """
+    matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+    linhas = np.flatnonzero(np.asarray(mascara)[matriz["posicoes"]])
+    X = matriz["X"][linhas]
+    colunas = colunas_identificaveis(X, matriz["colunas"])
+    nomes = [c for c, m in zip(matriz["colunas"], colunas) if m]
+    if np.linalg.matrix_rank(X[:, colunas]) < len(nomes):
+        raise ValueError("o desenho continua singular na seleção.")
+
+    modelo = sm.GLM(
+        pd.Series(matriz["y"][linhas], name=matriz["desenho"]["resposta"]),
+        pd.DataFrame(X[:, colunas], columns=nomes),
+        family=sm.families.NegativeBinomial(alpha=artefato["alpha"]),
+        offset=matriz["offset"][linhas]
+    ).fit(start_params=np.asarray(artefato["params"])[colunas])
+    if not modelo.converged:
+        raise ValueError("o reajuste não convergiu na seleção.")
+
+    filtrado = df_model.iloc[matriz["posicoes"][linhas]]
+    return {
+        **extrair_artefato(modelo, filtrado, artefato["impressao_digital"], artefato["formula"]),
+        "alpha_estimado": artefato["alpha_estimado"],
+        "linhas": linhas,
+        "removidas": [c for c, m in zip(matriz["colunas"], colunas) if not m],
+    }
+
+
+# Modelo com efeitos fixos
+def ajustar_efeitos_fixos(df_model: pd.DataFrame, efeitos, formula: str = FORMULA, alpha: float = 1.0) -> dict:
+    """
+    Ajusta o NB com efeitos fixos (ex.: IES e município) absorvidos no IRLS,
+    sem montar as dummies. Devolve um artefato no mesmo formato do modelo
+    base (nomes, params, cov, estatísticas), sem o intercepto e sem as
+    variáveis constantes dentro dos grupos.
+    """
+    matriz = matriz_modelo(df_model, formula, COLUNAS_MODELO)
+    grupos = [df_model[e].to_numpy()[matriz["posicoes"]] for e in efeitos]
+    grupos = [pd.factorize(g)[0] for g in grupos]
+    linhas = linhas_identificaveis(matriz["y"], grupos)
+
+    colunas = [i for i, c in enumerate(matriz["colunas"]) if c != "Intercept"]
+    ajuste = irls_nb_efeitos_fixos(
+        matriz["X"][linhas][:, colunas], matriz["y"][linhas], matriz["offset"][linhas],
+        [g[linhas] for g in grupos], alpha
+    )
+    nomes = [matriz["colunas"][i] for i in colunas]
+    k = len(ajuste["beta"]) + sum(ajuste["n_niveis"]) - (len(efeitos) - 1)
+
+    return {
+        "impressao_digital": impressao_digital(df_model, COLUNAS_MODELO + list(efeitos)),
+        "formula": " ".join(formula.split()),
+        "familia": "NegativeBinomial",
+        "alpha": float(alpha),
+        "efeitos_fixos": list(efeitos),
+        "nomes": [n for n, m in zip(nomes, ajuste["manter"]) if m],
+        "absorvidas": [n for n, m in zip(nomes, ajuste["manter"]) if not m],
+        "params": ajuste["beta"],
+        "cov": ajuste["cov"],
+        "estatisticas": {
+            "nobs": int(linhas.sum()),
+            "linhas_descartadas": int((~linhas).sum()),
+            "n_niveis": dict(zip(efeitos, ajuste["n_niveis"])),
+            "llf": ajuste["llf"],
+            "aic": -2 * ajuste["llf"] + 2 * k,
+            "deviance": ajuste["desvio"],
+            "iteracoes": ajuste["iteracoes"],
+            "iteracoes_projecao": ajuste["iteracoes_projecao"],
+            "convergiu": ajuste["convergiu"],
+        },
+    }
+
+
+def obter_artefato_efeitos_fixos(df_model: pd.DataFrame, efeitos, formula: str = FORMULA, alpha: float = 1.0,
+                                 diretorio: Path = DIRETORIO_ARTEFATOS) -> dict:
+    """Artefato do modelo com efeitos fixos, persistido como o do modelo base."""
+    impressao = impressao_digital(df_model, COLUNAS_MODELO + list(efeitos))
+    chave = chave_artefato(impressao, formula, alpha=alpha, efeitos_fixos=list(efeitos))
+    artefato = carregar_artefato(chave, diretorio)
+    if artefato is None:
+        salvar_artefato(chave, ajustar_efeitos_fixos(df_model, efeitos, formula, alpha), diretorio)
+        artefato = carregar_artefato(chave, diretorio)
+    return artefato
+
+
+# Erros-padrão robustos por cluster
+def covariancia_cluster(matriz: dict, artefato: dict, grupos) -> np.ndarray:
+    """
+    Covariância sanduíche agrupada (B M B). Os escores de cada curso são
+    somados por cluster em uma única multiplicação pela matriz indicadora
+    esparsa; o "pão" é a informação observada (a ligação log não é canônica
+    para o NB) e a correção de pequenas amostras é G/(G-1) * (n-1)/(n-k).
+    """
+    X, y = matriz["X"], matriz["y"]
+    params, alpha = np.asarray(artefato["params"]), artefato["alpha"]
+    mu = np.exp(X @ params + matriz["offset"])
+    w = mu * (1 + alpha * y) / (1 + alpha * mu) ** 2
+    escores = X * ((y - mu) / (1 + alpha * mu))[:, None]
+
+    codigos = pd.factorize(np.asarray(grupos))[0]
+    somas = blocos_indicadores([codigos])[0].T @ escores
+    pao = np.linalg.inv(X.T @ (X * w[:, None]))
+    recheio = somas.T @ somas
+
+    n, k = X.shape
+    g = somas.shape[0]
+    correcao = g / (g - 1) * (n - 1) / (n - k)
+    return correcao * pao @ recheio @ pao
+
+
+def artefato_cluster(df_model: pd.DataFrame, artefato: dict, agrupamento: str) -> dict:
+    """
+    Artefato com a covariância robusta por cluster (ex.: co_ies) no lugar da
+    do modelo. Vale também para reajustes filtrados, que guardam as linhas e
+    colunas da matriz completa que usaram.
+    """
+    matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+    linhas = artefato.get("linhas", slice(None))
+    colunas = [matriz["colunas"].index(nome) for nome in artefato["nomes"]]
+    subconjunto = {
+        "X": matriz["X"][linhas][:, colunas], "y": matriz["y"][linhas], "offset": matriz["offset"][linhas]
+    }
+    grupos = df_model[agrupamento].to_numpy()[matriz["posicoes"]][linhas]
+    return {
+        **artefato,
+        "cov": covariancia_cluster(subconjunto, artefato, grupos),
+        "tipo_cov": f"cluster:{agrupamento}",
+        "n_clusters": int(pd.Series(grupos).nunique()),
+    }
+
+
+# Tabela de resultados
+def tabela_resultados(artefato: dict, nivel: float = 0.95) -> pd.DataFrame:
+    """Coeficientes, IRR, IC de Wald e p-valores a partir do artefato."""
+    coef = np.asarray(artefato["params"])
+    ep = np.sqrt(np.diag(np.asarray(artefato["cov"])))
+    z = stats.norm.ppf(0.5 + nivel / 2)
+    pvals = 2 * stats.norm.sf(np.abs(coef / ep))
+
+    return pd.DataFrame({
+        "Variável": artefato["nomes"],
+        "Coeficiente (log)": coef.round(3),
+        "IRR (exp(coef))": np.exp(coef).round(3),
+        "IC 95% (low)": np.exp(coef - z * ep).round(3),
+        "IC 95% (high)": np.exp(coef + z * ep).round(3),
+        "p-valor": pvals.round(4)
+    })
+
+
+def salvar_resultados_csv(artefato: dict, caminho: Path = CAMINHO_RESULTADOS) -> bool:
+    """Regenera resultados_freq.csv a partir do artefato (só grava se mudou)."""
+    conteudo = tabela_resultados(artefato).set_index("Variável").to_csv()
+    caminho = Path(caminho)
+    if caminho.exists() and caminho.read_text() == conteudo:
+        return False
+    caminho.write_text(conteudo)
+    return True
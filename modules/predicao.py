@@ -0,0 +1,129 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from scipy import stats
+from modules.matriz_desenho import codificar_exog
+
+
+# Variáveis de um perfil de curso (além de qt_mat, que entra pelo offset)
+VARIAVEIS_CATEGORICAS = ["tp_rede", "tp_organizacao_academica", "tp_grau_academico", "tp_modalidade_ensino"]
+VARIAVEIS_CONTINUAS = ["qt_conc", "prop_doc_avancado", "prop_ing_pp", "prop_ing_financiados"]
+COLUNAS_PERFIL = VARIAVEIS_CATEGORICAS + VARIAVEIS_CONTINUAS + ["qt_mat"]
+
+LIMITE_PERFIS = 4096
+
+_perfis = OrderedDict()
+_trava = threading.Lock()
+
+
+def assinatura_ajuste(artefato: dict) -> str:
+    """Identifica coeficientes + covariância (muda com filtro, dispersão ou tipo de erro-padrão)."""
+    h = hashlib.sha1()
+    h.update(np.asarray(artefato["params"], dtype=float).tobytes())
+    h.update(np.asarray(artefato["cov"], dtype=float).tobytes())
+    return h.hexdigest()
+
+
+def _exog(desenho: dict, artefato: dict, perfis: pd.DataFrame) -> np.ndarray:
+    """Codifica os perfis com o desenho compilado e mantém só as colunas do ajuste."""
+    X = codificar_exog(desenho, perfis.assign(qt_ing=0))
+    indices = [desenho["colunas"].index(nome) for nome in artefato["nomes"]]
+    return X[:, indices]
+
+
+# Previsão
+def prever(desenho: dict, artefato: dict, perfis: pd.DataFrame, nivel: float = 0.95) -> pd.DataFrame:
+    """
+    Número esperado de ingressantes para cada perfil, com IC pelo método
+    delta na escala log (exp(eta ± z·ep), sempre positivo). A variância de
+    todos os perfis sai de uma única contração x' V x.
+
+    Perfis já calculados para o mesmo ajuste são memoizados; só os novos
+    são codificados e avaliados.
+    """
+    perfis = perfis[COLUNAS_PERFIL].reset_index(drop=True)
+    assinatura = assinatura_ajuste(artefato)
+    chaves = [(assinatura, nivel, *linha) for linha in perfis.itertuples(index=False)]
+    with _trava:
+        encontrados = {i: _perfis[c] for i, c in enumerate(chaves) if c in _perfis}
+        for i in encontrados:
+            _perfis.move_to_end(chaves[i])
+
+    novos = [i for i in range(len(perfis)) if i not in encontrados]
+    if novos:
+        X = _exog(desenho, artefato, perfis.iloc[novos])
+        eta = X @ np.asarray(artefato["params"]) + np.log(perfis["qt_mat"].to_numpy(dtype=float)[novos])
+        ep = np.sqrt(np.einsum("ij,jk,ik->i", X, np.asarray(artefato["cov"]), X))
+        z = stats.norm.ppf(0.5 + nivel / 2)
+        calculados = np.column_stack([np.exp(eta), np.exp(eta - z * ep), np.exp(eta + z * ep)])
+        with _trava:
+            for i, valores in zip(novos, calculados):
+                encontrados[i] = valores
+                _perfis[chaves[i]] = valores
+            while len(_perfis) > LIMITE_PERFIS:
+                _perfis.popitem(last=False)
+
+    valores = np.array([encontrados[i] for i in range(len(perfis))]).reshape(-1, 3)
+    return perfis.assign(
+        **{"Ingressantes esperados": valores[:, 0], "IC 95% (low)": valores[:, 1], "IC 95% (high)": valores[:, 2]}
+    )
+
+
+# Efeitos marginais médios
+def efeitos_marginais(desenho: dict, artefato: dict, dados: pd.DataFrame, nivel: float = 0.95) -> pd.DataFrame:
+    """
+    Efeitos marginais médios (AME) sobre o número esperado de ingressantes,
+    calculados de forma vetorizada sobre os perfis em `dados`:
+      - contínuas: média de beta_j * mu_i (derivada com ligação log);
+      - categóricas: média de mu_i(nível) - mu_i(referência), mudando o nível
+        de todos os perfis ao mesmo tempo.
+    O IC usa o gradiente em beta de cada efeito médio e a covariância do ajuste.
+    """
+    beta = np.asarray(artefato["params"])
+    V = np.asarray(artefato["cov"])
+    nomes = artefato["nomes"]
+    offset = np.log(dados["qt_mat"].to_numpy(dtype=float))
+    z = stats.norm.ppf(0.5 + nivel / 2)
+
+    efeitos, gradientes, rotulos = [], [], []
+    X = _exog(desenho, artefato, dados)
+    mu = np.exp(X @ beta + offset)
+    for variavel in VARIAVEIS_CONTINUAS:
+        if variavel in nomes:
+            j = nomes.index(variavel)
+            efeitos.append(beta[j] * mu.mean())
+            gradiente = beta[j] * (mu @ X) / len(mu)
+            gradiente[j] += mu.mean()
+            gradientes.append(gradiente)
+            rotulos.append((variavel, "+1 unidade"))
+
+    for variavel in VARIAVEIS_CATEGORICAS:
+        # Contraste de tratamento: trocar o nível = zerar/ligar as dummies da variável
+        niveis = artefato["desenho"]["niveis"][variavel]
+        dummies = [nomes.index(f"C({variavel})[T.{n}]") for n in niveis[1:] if f"C({variavel})[T.{n}]" in nomes]
+        X0 = X.copy()
+        X0[:, dummies] = 0
+        mu0 = np.exp(X0 @ beta + offset)
+        for nivel_cat in niveis[1:]:
+            if f"C({variavel})[T.{nivel_cat}]" not in nomes:
+                continue
+            X1 = X0.copy()
+            X1[:, nomes.index(f"C({variavel})[T.{nivel_cat}]")] = 1
+            mu1 = np.exp(X1 @ beta + offset)
+            efeitos.append((mu1 - mu0).mean())
+            gradientes.append((mu1 @ X1 - mu0 @ X0) / len(mu0))
+            rotulos.append((variavel, f"{nivel_cat} vs {niveis[0]}"))
+
+    G = np.array(gradientes)
+    ep = np.sqrt(np.einsum("ij,jk,ik->i", G, V, G))
+    efeitos = np.array(efeitos)
+    return pd.DataFrame({
+        "Variável": [r[0] for r in rotulos],
+        "Contraste": [r[1] for r in rotulos],
+        "Efeito marginal médio": efeitos,
+        "EP (delta)": ep,
+        "IC 95% (low)": efeitos - z * ep,
+        "IC 95% (high)": efeitos + z * ep,
+    })
@@ -0,0 +1,182 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import os
+import numpy as np
+import pandas as pd
+import patsy
+from modules.modelo_frequentista import FORMULA, COLUNAS_MODELO
+from modules.matriz_desenho import matriz_modelo
+from modules.irls import irls_nb
+
+
+# Termos candidatos (fórmula patsy -> rótulo)
+CANDIDATOS_SELECAO = {
+    "C(in_gratuito)": "Curso gratuito",
+    "C(no_cine_area_geral)": "Área geral (CINE)",
+    "C(in_capital_ies)": "IES na capital",
+    "C(in_acesso_portal_capes)": "Acesso ao Portal CAPES",
+    "C(in_repositorio_institucional)": "Repositório institucional",
+    "C(in_servico_internet)": "Serviço de internet",
+    "C(in_catalogo_online)": "Catálogo online",
+    "prop_ing_18_24": "Ingressantes 18-24 anos (%)",
+    "prop_ing_25_29": "Ingressantes 25-29 anos (%)",
+    "prop_ing_30_34": "Ingressantes 30-34 anos (%)",
+    "prop_ing_reserva_vaga": "Ingressantes por reserva de vagas (%)",
+}
+
+CRITERIOS = ("aic", "bic")
+
+
+# Preparação
+def preparar_candidatos(df_model: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta as proporções de ingressantes usadas como candidatas."""
+    df_model = df_model.copy()
+    for faixa in ["18_24", "25_29", "30_34", "reserva_vaga"]:
+        df_model[f"prop_ing_{faixa}"] = (
+            df_model[f"qt_ing_{faixa}"] / df_model["qt_ing"].replace(0, np.nan)
+        ).fillna(0).clip(0, 1)
+    return df_model
+
+
+def termos_formula(formula: str) -> list:
+    """Nomes dos termos do lado direito da fórmula (sem o intercepto)."""
+    termos = patsy.ModelDesc.from_formula(formula).rhs_termlist
+    return [t.name() for t in termos if t.factors]
+
+
+def matriz_completa(df_model: pd.DataFrame, candidatos, formula: str = FORMULA) -> dict:
+    """
+    Matriz de desenho compartilhada: fórmula base + todos os candidatos,
+    codificada uma vez (e cacheada) sobre as mesmas linhas. Cada
+    especificação é um subconjunto de colunas desta matriz.
+    """
+    formula_completa = " + ".join([" ".join(formula.split()), *candidatos])
+    colunas = list(dict.fromkeys(COLUNAS_MODELO + [t.removeprefix("C(").removesuffix(")") for t in candidatos]))
+    matriz = matriz_modelo(df_model, formula_completa, colunas)
+    fatias = matriz["desenho"]["info_x"].term_name_slices
+    return {**matriz, "fatias": {termo: np.arange(s.start, s.stop) for termo, s in fatias.items()}}
+
+
+# Ajuste de uma especificação (processo trabalhador)
+_dados = {}
+
+
+def _iniciar_trabalhador(X, y, offset, alpha):
+    _dados.update(X=X, y=y, offset=offset, alpha=alpha)
+
+
+def _ajustar_especificacao(tarefa):
+    """
+    Ajusta o modelo nas colunas indicadas, partindo dos coeficientes do
+    modelo pai (colunas novas começam em zero). Especificações com posto
+    incompleto (candidato colinear) são marcadas e não ajustadas.
+    """
+    colunas, beta_pai = tarefa
+    d = _dados
+    X = d["X"][:, colunas]
+    if np.linalg.matrix_rank(X) < len(colunas):
+        return {"llf": np.nan, "beta": None, "convergiu": False, "posto_completo": False}
+    inicio = None if beta_pai is None else beta_pai[colunas]
+    ajuste = irls_nb(X, d["y"], d["offset"], d["alpha"], inicio)
+    beta = np.zeros(d["X"].shape[1])
+    beta[colunas] = ajuste["beta"]
+    return {"llf": ajuste["llf"], "beta": beta, "convergiu": ajuste["convergiu"], "posto_completo": True}
+
+
+def _avaliar(executor, matriz, especificacoes, pais, n):
+    """Ajusta em paralelo as especificações (tuplas de termos), cada uma a partir do seu pai."""
+    tarefas = []
+    for termos, pai in zip(especificacoes, pais):
+        colunas = np.concatenate([matriz["fatias"][t] for t in ["Intercept", *termos] if t in matriz["fatias"]])
+        tarefas.append((np.sort(colunas), pai))
+    registros = []
+    for termos, (colunas, _), ajuste in zip(especificacoes, tarefas, executor.map(_ajustar_especificacao, tarefas)):
+        k = len(colunas)
+        registros.append({
+            "termos": tuple(termos),
+            "k": k,
+            **ajuste,
+            "aic": -2 * ajuste["llf"] + 2 * k,
+            "bic": -2 * ajuste["llf"] + k * np.log(n),
+        })
+    return registros
+
+
+def _executor(matriz, alpha, n_jobs):
+    return ProcessPoolExecutor(
+        max_workers=n_jobs or os.cpu_count() or 1,
+        initializer=_iniciar_trabalhador,
+        initargs=(matriz["X"], matriz["y"], matriz["offset"], alpha)
+    )
+
+
+# Estratégias de busca
+def selecao_stepwise(matriz: dict, termos_base, candidatos, criterio: str = "aic", alpha: float = 1.0,
+                     bidirecional: bool = True, n_jobs=None) -> list:
+    """
+    Stepwise por AIC/BIC: a cada passo avalia em paralelo todas as inclusões
+    (e, se bidirecional, exclusões de candidatos já incluídos) a partir do
+    modelo corrente, e aceita o movimento que mais reduz o critério.
+    """
+    n = len(matriz["y"])
+    avaliados = {}
+    with _executor(matriz, alpha, n_jobs) as executor:
+        atual = _avaliar(executor, matriz, [tuple(termos_base)], [None], n)[0]
+        avaliados[frozenset(atual["termos"])] = atual
+        while True:
+            incluidos = [t for t in atual["termos"] if t not in termos_base]
+            vizinhos = [(*atual["termos"], c) for c in candidatos if c not in atual["termos"]]
+            if bidirecional:
+                vizinhos += [tuple(t for t in atual["termos"] if t != c) for c in incluidos]
+            vizinhos = [v for v in vizinhos if frozenset(v) not in avaliados]
+            if not vizinhos:
+                break
+            registros = _avaliar(executor, matriz, vizinhos, [atual["beta"]] * len(vizinhos), n)
+            avaliados.update({frozenset(r["termos"]): r for r in registros})
+            validos = [r for r in registros if r["posto_completo"]]
+            melhor = min(validos, key=lambda r: r[criterio], default=None)
+            if melhor is None or melhor[criterio] >= atual[criterio]:
+                break
+            atual = melhor
+    return list(avaliados.values())
+
+
+def selecao_todos_subconjuntos(matriz: dict, termos_base, candidatos, tamanho_max: int = 3,
+                               alpha: float = 1.0, n_jobs=None) -> list:
+    """
+    Todos os subconjuntos de até tamanho_max candidatos, avaliados por nível
+    (tamanho). Cada subconjunto parte dos coeficientes do subconjunto sem o
+    seu último candidato, ajustado no nível anterior.
+    """
+    n = len(matriz["y"])
+    with _executor(matriz, alpha, n_jobs) as executor:
+        base = _avaliar(executor, matriz, [tuple(termos_base)], [None], n)[0]
+        niveis = {(): base}
+        registros = [base]
+        for tamanho in range(1, min(tamanho_max, len(candidatos)) + 1):
+            subconjuntos = list(combinations(candidatos, tamanho))
+            pais = [niveis.get(s[:-1], base)["beta"] for s in subconjuntos]
+            nivel = _avaliar(executor, matriz, [(*termos_base, *s) for s in subconjuntos], pais, n)
+            niveis = {s: r for s, r in zip(subconjuntos, nivel) if r["posto_completo"]}
+            registros += nivel
+    return registros
+
+
+def tabela_selecao(registros, termos_base, criterio: str = "aic", rotulos=CANDIDATOS_SELECAO) -> pd.DataFrame:
+    """Especificações ordenadas pelo critério, com diferença para a melhor."""
+    tabela = pd.DataFrame([
+        {
+            "Termos adicionados": " + ".join(rotulos.get(t, t) for t in r["termos"] if t not in termos_base) or "(modelo base)",
+            "Nº de candidatos": sum(t not in termos_base for t in r["termos"]),
+            "Parâmetros": r["k"],
+            "Log-verossimilhança": round(r["llf"], 2),
+            "AIC": round(r["aic"], 2),
+            "BIC": round(r["bic"], 2),
+            "Convergiu": r["convergiu"],
+        }
+        for r in registros if r["posto_completo"]
+    ])
+    coluna = criterio.upper()
+    tabela = tabela.sort_values(coluna).reset_index(drop=True)
+    tabela[f"Δ{coluna}"] = (tabela[coluna] - tabela[coluna].min()).round(2)
+    return tabela
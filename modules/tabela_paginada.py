@@ -0,0 +1,101 @@
+import unicodedata
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Normalização de texto (minúsculas e sem acentos) usada na busca
+def normalizar_texto(texto) -> str:
+    """Converte para minúsculas e remove acentos."""
+    if texto is None or (isinstance(texto, float) and np.isnan(texto)):
+        return ""
+    texto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+# Índice pré-ordenado da tabela
+def construir_indice_tabela(df: pd.DataFrame, colunas_ordenacao, colunas_busca) -> dict:
+    """
+    Pré-calcula as permutações de ordenação (crescente e decrescente) de cada
+    coluna ordenável e o texto normalizado usado na busca.
+    """
+    dados = df.reset_index(drop=True)
+    ordens = {}
+    for col in colunas_ordenacao:
+        chave = dados[col]
+        if not pd.api.types.is_numeric_dtype(chave):
+            chave = chave.map(normalizar_texto)
+        # NaN sempre no final, nos dois sentidos
+        ordens[(col, True)] = chave.sort_values(ascending=True, kind="stable", na_position="last").index.to_numpy()
+        ordens[(col, False)] = chave.sort_values(ascending=False, kind="stable", na_position="last").index.to_numpy()
+
+    texto = dados[colunas_busca[0]].map(normalizar_texto)
+    for col in colunas_busca[1:]:
+        texto = texto + " " + dados[col].map(normalizar_texto)
+
+    return {"dados": dados, "ordens": ordens, "texto": texto}
+
+
+def ordem_filtrada(indice: dict, coluna: str, ascendente: bool = True, busca: str = "") -> np.ndarray:
+    """Permutação das linhas que casam com a busca, já na ordem pedida."""
+    ordem = indice["ordens"][(coluna, ascendente)]
+    termo = normalizar_texto(busca).strip()
+    if termo:
+        mascara = indice["texto"].str.contains(termo, regex=False).to_numpy()
+        ordem = ordem[mascara[ordem]]
+    return ordem
+
+
+def pagina_tabela(ordem: np.ndarray, indice: dict, pagina: int = 1, tamanho: int = 50) -> pd.DataFrame:
+    """Materializa apenas as linhas da página pedida."""
+    inicio = (max(pagina, 1) - 1) * tamanho
+    return indice["dados"].iloc[ordem[inicio:inicio + tamanho]]
+
+
+# Componente Streamlit
+def mostrar_tabela_paginada(indice: dict, chave: str, rotulos: dict, tamanho: int = 50,
+                            coluna_padrao=None, ascendente_padrao: bool = True):
+    """
+    Exibe a tabela paginada: busca, ordenação e página são resolvidas no
+    servidor e somente a página visível é enviada ao navegador.
+    """
+    colunas_ordenacao = [col for (col, asc) in indice["ordens"] if asc]
+    coluna_padrao = coluna_padrao or colunas_ordenacao[0]
+
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        busca = st.text_input("🔎 Buscar", key=f"{chave}_busca")
+    with col2:
+        coluna = st.selectbox(
+            "Ordenar por",
+            colunas_ordenacao,
+            index=colunas_ordenacao.index(coluna_padrao),
+            format_func=lambda c: rotulos.get(c, c),
+            key=f"{chave}_ordem"
+        )
+    with col3:
+        sentido = st.selectbox(
+            "Sentido",
+            ["Crescente", "Decrescente"],
+            index=0 if ascendente_padrao else 1,
+            key=f"{chave}_sentido"
+        )
+
+    # Total de páginas depende da busca; calcula antes de escolher a página
+    ordem = ordem_filtrada(indice, coluna, sentido == "Crescente", busca)
+    total = len(ordem)
+    n_paginas = max(1, int(np.ceil(total / tamanho)))
+    if st.session_state.get(f"{chave}_pagina", 1) > n_paginas:
+        st.session_state[f"{chave}_pagina"] = 1
+    pagina = st.number_input(
+        f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, step=1,
+        key=f"{chave}_pagina"
+    )
+
+    linhas = pagina_tabela(ordem, indice, int(pagina), tamanho)
+    st.dataframe(
+        linhas[list(rotulos)].rename(columns=rotulos),
+        use_container_width=True,
+        hide_index=True
+    )
+    st.caption(f"{total:,} linhas".replace(",", "."))
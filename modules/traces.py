@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+import numpy as np
+
+
+DIRETORIO_TRACES = Path(__file__).parent / "artefatos" / "traces"
+
+# Tamanho máximo do armazém (traces menos usados recentemente são removidos)
+LIMITE_BYTES_TRACES = 2 * 1024 ** 3
+
+_trava = threading.Lock()
+
+
+# Chave de conteúdo
+def chave_trace(X, y, offset, especificacao: str, **opcoes) -> str:
+    """
+    Hash do que determina a posterior: matriz de desenho, resposta, offset,
+    especificação do modelo (priors) e configuração do amostrador.
+    """
+    h = hashlib.sha256()
+    for array in (X, y, offset):
+        array = np.ascontiguousarray(array, dtype=float)
+        h.update(json.dumps([str(array.dtype), array.shape]).encode())
+        h.update(array.tobytes())
+    h.update(json.dumps({"especificacao": especificacao, **opcoes}, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:24]
+
+
+# Armazém
+def carregar_trace(chave: str, diretorio: Path = DIRETORIO_TRACES):
+    """InferenceData guardado para a chave (marcado como usado agora), ou None."""
+    import arviz as az
+
+    caminho = Path(diretorio) / f"{chave}.nc"
+    if not caminho.exists():
+        return None
+    os.utime(caminho)
+    return az.from_netcdf(caminho)
+
+
+def salvar_trace(chave: str, idata, diretorio: Path = DIRETORIO_TRACES,
+                 limite_bytes: int = LIMITE_BYTES_TRACES) -> Path:
+    """Grava o trace (escrita atômica) e aplica o limite de tamanho por LRU."""
+    diretorio = Path(diretorio)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    caminho = diretorio / f"{chave}.nc"
+    temporario = diretorio / f"{chave}.{os.getpid()}.tmp"
+    idata.to_netcdf(temporario)
+    temporario.replace(caminho)
+    remover_excedentes(diretorio, limite_bytes, manter=caminho)
+    return caminho
+
+
+def remover_excedentes(diretorio: Path = DIRETORIO_TRACES, limite_bytes: int = LIMITE_BYTES_TRACES,
+                       manter: Path = None) -> list:
+    """Remove os traces usados há mais tempo até o armazém caber no limite."""
+    with _trava:
+        arquivos = sorted(Path(diretorio).glob("*.nc"), key=lambda c: c.stat().st_mtime)
+        total = sum(c.stat().st_size for c in arquivos)
+        removidos = []
+        for caminho in arquivos:
+            if total <= limite_bytes:
+                break
+            if caminho == manter:
+                continue
+            total -= caminho.stat().st_size
+            caminho.unlink(missing_ok=True)
+            removidos.append(caminho.name)
+    return removidos
+
+
+def trace_em_cache(chave: str, amostrar, diretorio: Path = DIRETORIO_TRACES,
+                   limite_bytes: int = LIMITE_BYTES_TRACES):
+    """Devolve o trace da chave; se não existir, chama amostrar() e guarda o resultado."""
+    idata = carregar_trace(chave, diretorio)
+    if idata is None:
+        idata = amostrar()
+        salvar_trace(chave, idata, diretorio, limite_bytes)
+    return idata
@@ -0,0 +1,175 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+import time
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from scipy.special import logsumexp
+from modules.artefatos import chave_artefato, salvar_artefato, carregar_artefato, DIRETORIO_ARTEFATOS
+
+
+MODELOS_CV = {"glm": "Frequentista (GLM)", "bayes": "Bayesiano (PyMC)"}
+
+# Amostragem reduzida por fold (o ajuste completo usa 2000 draws x 4 cadeias)
+OPCOES_BAYES_CV = {"draws": 500, "tune": 500, "chains": 2, "target_accept": 0.95}
+
+CAMINHO_RESULTADOS_CV = Path(__file__).parent / "resultados_cv.csv"
+
+
+# Estado de cada processo trabalhador (definido uma vez por processo)
+_dados = {}
+
+
+def _iniciar_trabalhador(X, y, offset, folds, colunas, alpha, beta0, opcoes_bayes):
+    _dados.update(
+        X=X, y=y, offset=offset, folds=folds, colunas=colunas,
+        alpha=alpha, beta0=beta0, opcoes_bayes=opcoes_bayes
+    )
+
+
+def atribuir_folds(n: int, k: int = 5, semente: int = 42) -> np.ndarray:
+    """Fold de cada linha (0..k-1), com tamanhos equilibrados e atribuição reprodutível."""
+    rng = np.random.default_rng(semente)
+    return rng.permutation(np.arange(n) % k)
+
+
+# Métricas fora da amostra
+def metricas_previsao(y, mu, log_densidade) -> dict:
+    """Desvio de Poisson médio, MAE e log score médio (densidade preditiva por linha)."""
+    termo_y = np.where(y > 0, y * np.log(np.where(y > 0, y, 1) / mu), 0.0)
+    return {
+        "desvio": float(np.mean(2 * (termo_y - (y - mu)))),
+        "mae": float(np.mean(np.abs(y - mu))),
+        "log_score": float(np.mean(log_densidade)),
+    }
+
+
+def _ajustar_fold_glm(treino, teste):
+    d = _dados
+    modelo = sm.GLM(
+        d["y"][treino], d["X"][treino],
+        family=sm.families.NegativeBinomial(alpha=d["alpha"]),
+        offset=d["offset"][treino]
+    ).fit(start_params=d["beta0"])
+    mu = np.exp(d["X"][teste] @ modelo.params + d["offset"][teste])
+    # NB2 do statsmodels: n = 1/alpha, p = 1/(1 + alpha*mu)
+    log_densidade = stats.nbinom.logpmf(d["y"][teste], 1 / d["alpha"], 1 / (1 + d["alpha"] * mu))
+    return mu, log_densidade
+
+
+def _ajustar_fold_bayes(treino, teste, semente):
+    from modules.Modelo_Bayes import modelo_nb_pymc, amostrar_nb
+
+    d = _dados
+    # O modelo bayesiano tem intercepto próprio: remove a coluna do patsy
+    sem_intercepto = [i for i, c in enumerate(d["colunas"]) if c != "Intercept"]
+    X = d["X"][:, sem_intercepto]
+    opcoes = d["opcoes_bayes"]
+
+    X_treino, y_treino, offset_treino = X[treino], d["y"][treino], d["offset"][treino]
+    trace = amostrar_nb(
+        modelo_nb_pymc(X_treino, y_treino, offset_treino), X_treino, y_treino, offset_treino,
+        opcoes["draws"], opcoes["tune"], opcoes["chains"], cores=1, target_accept=opcoes["target_accept"],
+        random_seed=semente, progressbar=False, compute_convergence_checks=False
+    )
+
+    posterior = trace.posterior.stack(amostra=("chain", "draw"))
+    beta = posterior["beta"].to_numpy()                      # (k, S)
+    intercepto = posterior["intercept"].to_numpy()           # (S,)
+    alpha = posterior["alpha"].to_numpy()                    # (S,)
+    mu = np.exp(intercepto + X[teste] @ beta + d["offset"][teste][:, None])
+
+    # PyMC: alpha é o parâmetro de forma (n = alpha, p = alpha / (alpha + mu))
+    log_dens = stats.nbinom.logpmf(d["y"][teste][:, None], alpha, alpha / (alpha + mu))
+    return mu.mean(axis=1), logsumexp(log_dens, axis=1) - np.log(mu.shape[1])
+
+
+def _ajustar_fold(tarefa):
+    """Ajusta um modelo nos folds de treino e avalia no fold de teste."""
+    modelo, fold, semente = tarefa
+    teste = _dados["folds"] == fold
+    treino = ~teste
+    inicio = time.perf_counter()
+    if modelo == "glm":
+        mu, log_densidade = _ajustar_fold_glm(treino, teste)
+    else:
+        mu, log_densidade = _ajustar_fold_bayes(treino, teste, semente)
+    return {
+        "modelo": modelo,
+        "fold": fold,
+        "n_teste": int(teste.sum()),
+        **metricas_previsao(_dados["y"][teste], mu, log_densidade),
+        "segundos": time.perf_counter() - inicio,
+    }
+
+
+def validacao_cruzada(matriz: dict, k: int = 5, modelos=("glm", "bayes"), alpha: float = 1.0,
+                      beta0=None, semente: int = 42, n_jobs=None, opcoes_bayes=None) -> pd.DataFrame:
+    """
+    Validação cruzada k-fold dos modelos NB sobre a mesma atribuição de folds.
+    As matrizes codificadas são enviadas uma vez a cada processo; cada par
+    (modelo, fold) é ajustado em paralelo. O GLM usa alpha fixo e pode partir
+    dos coeficientes da amostra completa (beta0).
+    """
+    folds = atribuir_folds(len(matriz["y"]), k, semente)
+    opcoes_bayes = {**OPCOES_BAYES_CV, **(opcoes_bayes or {})}
+    sementes = np.random.SeedSequence(semente).generate_state(k)
+    tarefas = [(modelo, fold, int(sementes[fold])) for modelo in modelos for fold in range(k)]
+
+    n_jobs = n_jobs or min(len(tarefas), os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=n_jobs,
+        initializer=_iniciar_trabalhador,
+        initargs=(
+            matriz["X"], matriz["y"], matriz["offset"], folds, list(matriz["colunas"]),
+            alpha, None if beta0 is None else np.asarray(beta0), opcoes_bayes
+        )
+    ) as executor:
+        resultados = list(executor.map(_ajustar_fold, tarefas))
+
+    return pd.DataFrame(resultados)
+
+
+def resumo_validacao(resultados: pd.DataFrame) -> pd.DataFrame:
+    """Média e desvio-padrão das métricas entre folds, por modelo."""
+    resumo = resultados.groupby("modelo")[["desvio", "mae", "log_score"]].agg(["mean", "std"])
+    resumo.columns = [f"{metrica} ({estatistica})" for metrica, estatistica in resumo.columns]
+    resumo.index = resumo.index.map(lambda m: MODELOS_CV.get(m, m))
+    resumo.index.name = "Modelo"
+    return resumo.round(4)
+
+
+def obter_validacao(matriz: dict, artefato: dict, k: int = 5, modelos=("glm",), semente: int = 42,
+                    opcoes_bayes=None, diretorio=DIRETORIO_ARTEFATOS) -> pd.DataFrame:
+    """
+    Resultados por fold cacheados no armazém de artefatos, por impressão
+    digital dos dados + especificação do ajuste + configuração da validação.
+    """
+    opcoes_bayes = {**OPCOES_BAYES_CV, **(opcoes_bayes or {})} if "bayes" in modelos else None
+    chave = chave_artefato(
+        artefato["impressao_digital"], artefato["formula"],
+        alpha=artefato["alpha"], validacao=k, modelos=list(modelos), semente=semente, opcoes_bayes=opcoes_bayes
+    )
+    resultado = carregar_artefato(chave, diretorio)
+    if resultado is None:
+        folds = validacao_cruzada(
+            matriz, k, modelos, artefato["alpha"], artefato["params"], semente, opcoes_bayes=opcoes_bayes
+        )
+        salvar_artefato(chave, {"folds": folds.to_dict(orient="list")}, diretorio)
+        resultado = carregar_artefato(chave, diretorio)
+    return pd.DataFrame(resultado["folds"])
+
+
+if __name__ == "__main__":
+    from modules.Modelo_Bayes import load_complete_ride_data
+    from modules.modelo_frequentista import preparar_dados, obter_artefato, COLUNAS_MODELO
+    from modules.matriz_desenho import matriz_modelo
+
+    df, error = load_complete_ride_data()
+    df_model = preparar_dados(df)
+    artefato = obter_artefato(df_model)
+    matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+    folds = obter_validacao(matriz, artefato, modelos=("glm", "bayes"))
+    resumo_validacao(folds).to_csv(CAMINHO_RESULTADOS_CV)
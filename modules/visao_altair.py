@@ -0,0 +1,88 @@
+import altair as alt
+import pandas as pd
+
+
+# Dimensões e medidas do cubo enviado ao navegador
+DIMENSOES_CUBO = ["sigla_uf", "no_ies", "no_curso", "tp_modalidade_ensino", "tp_rede"]
+MEDIDAS_CUBO = ["qt_mat", "qt_ing", "qt_conc"]
+
+ROTULOS_MEDIDAS = {
+    "qt_mat": "Matrículas",
+    "qt_ing": "Ingressantes",
+    "qt_conc": "Concluintes"
+}
+
+
+def cubo_exploratorio(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega os dados na granularidade do cubo (UF x IES x Curso x Modalidade x Rede),
+    com medidas inteiras, para ser enviado uma única vez ao navegador.
+    """
+    cubo = (
+        df.groupby(DIMENSOES_CUBO, as_index=False, observed=True, dropna=False)[MEDIDAS_CUBO]
+        .sum()
+    )
+    cubo[MEDIDAS_CUBO] = cubo[MEDIDAS_CUBO].fillna(0).astype("int32")
+    cubo[DIMENSOES_CUBO] = cubo[DIMENSOES_CUBO].fillna("Não informado").astype(str)
+    return cubo
+
+
+def _barras(base, campo, titulo, medida, selecao, top_n=None, altura=None):
+    """Gráfico de barras horizontal de uma dimensão, clicável."""
+    grafico = base.transform_aggregate(
+        total=f"sum({medida})", groupby=[campo]
+    )
+    if top_n:
+        grafico = grafico.transform_window(
+            posicao="rank()", sort=[alt.SortField("total", order="descending")]
+        ).transform_filter(alt.datum.posicao <= top_n)
+
+    return grafico.mark_bar().encode(
+        x=alt.X("total:Q", title=ROTULOS_MEDIDAS[medida]),
+        y=alt.Y(f"{campo}:N", sort="-x", title=None),
+        color=alt.condition(selecao, alt.value("#4c78a8"), alt.value("lightgray")),
+        tooltip=[alt.Tooltip(f"{campo}:N", title=titulo), alt.Tooltip("total:Q", title=ROTULOS_MEDIDAS[medida], format=",")]
+    ).add_params(selecao).properties(
+        title=titulo,
+        height=altura or alt.Step(18)
+    )
+
+
+def graficos_cruzados(cubo: pd.DataFrame, medida: str = "qt_mat", top_n: int = 15) -> alt.VConcatChart:
+    """
+    Gráficos ligados (UF → IES → Curso, Modalidade, Rede) com filtragem cruzada
+    feita no navegador via seleções do Vega-Lite. Cada gráfico é filtrado pelas
+    seleções dos demais, sem nova execução do script no servidor.
+    """
+    selecoes = {
+        campo: alt.selection_point(fields=[campo], name=f"sel_{campo}")
+        for campo in DIMENSOES_CUBO
+    }
+    titulos = {
+        "sigla_uf": "UF",
+        "no_ies": f"IES (top {top_n})",
+        "no_curso": f"Cursos (top {top_n})",
+        "tp_modalidade_ensino": "Modalidade de Ensino",
+        "tp_rede": "Rede"
+    }
+
+    base = alt.Chart(cubo)
+    graficos = {}
+    for campo in DIMENSOES_CUBO:
+        filtrado = base
+        for outro, selecao in selecoes.items():
+            if outro != campo:
+                filtrado = filtrado.transform_filter(selecao)
+        graficos[campo] = _barras(
+            filtrado,
+            campo,
+            titulos[campo],
+            medida,
+            selecoes[campo],
+            top_n=top_n if campo in ("no_ies", "no_curso") else None
+        )
+
+    return alt.vconcat(
+        alt.hconcat(graficos["sigla_uf"], graficos["tp_modalidade_ensino"], graficos["tp_rede"]),
+        alt.hconcat(graficos["no_ies"], graficos["no_curso"])
+    ).resolve_scale(color="independent")
@@ -2,7 +2,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
+from pathlib import Path
 from app import load_complete_ride_data, calcular_metricas_educacionais
+from modules.tabela_paginada import construir_indice_tabela, mostrar_tabela_paginada
+from modules.cache_figuras import versao_dataset, mostrar_figura
+from modules.visao_altair import cubo_exploratorio, graficos_cruzados, ROTULOS_MEDIDAS
+from modules.busca_textual import construir_indice_busca, buscar, opcoes_em_escopo
+from modules.exportacao import exportar_arquivo, url_exportacao, FORMATOS_EXPORTACAO
+from modules.mapa import geometria_municipios, totais_por_grupo, totais_municipio, figura_mapa, MEDIDAS_MAPA
 
 # Carregar dados integrados
 df, error = load_complete_ride_data()
@@ -11,8 +18,78 @@ if error:
     st.stop()
 
 
+# Índice da Tabela de Cursos (cacheado por combinação de filtros e versão dos dados)
+@st.cache_resource(max_entries=32)
+def construir_indice_cursos(chave_filtros, versao, _df_metricas):
+    # Agregar por IES + Curso + Ano (soma de vagas e ingressantes)
+    df_cursos = (
+        _df_metricas
+        .groupby(['co_ies','no_ies','no_curso','nu_ano_censo'], as_index=False)
+        .agg(
+            qt_vg_total=('qt_vg_total','sum'),
+            qt_ing=('qt_ing','sum')
+        )
+    )
+
+    # Calcular taxa de ingresso após agregar
+    df_cursos['taxa_ingresso'] = np.where(
+        df_cursos['qt_vg_total'] > 0,
+        (df_cursos['qt_ing'] / df_cursos['qt_vg_total'] * 100).round(2),
+        np.nan
+    )
+
+    # Ordem base: Nome da IES e Taxa de Ingresso decrescente. As ordenações do
+    # índice são estáveis, então empates em qualquer coluna seguem essa ordem
+    df_cursos = df_cursos.sort_values(
+        by=['no_ies', 'taxa_ingresso'],
+        ascending=[True, False]
+    )
+
+    return construir_indice_tabela(
+        df_cursos,
+        colunas_ordenacao=['no_ies', 'no_curso', 'qt_vg_total', 'qt_ing', 'taxa_ingresso'],
+        colunas_busca=['no_ies', 'no_curso']
+    )
+
+
+# Cubo pré-agregado da exploração no navegador (um por versão dos dados)
+@st.cache_data
+def construir_cubo(versao, _df):
+    return cubo_exploratorio(_df)
+
+
+# Índice de busca (um por versão dos dados)
+@st.cache_resource(max_entries=2)
+def construir_indice_busca_cache(versao, _df):
+    return construir_indice_busca(_df)
+
+
+# Geometria dos municípios e totais por grupo do mapa (um por versão dos dados)
+@st.cache_resource(max_entries=2)
+def construir_base_mapa(versao, _df):
+    return geometria_municipios(_df), totais_por_grupo(_df)
+
+
 if df is not None and not df.empty:
 
+    versao = versao_dataset(df)
+
+    # Modo de exploração
+    modo = st.sidebar.radio(
+        "🧭 Modo de exploração",
+        ["Filtros (servidor)", "Seleção cruzada (navegador)"],
+        help="Na seleção cruzada os dados agregados são enviados uma vez e os gráficos se filtram no próprio navegador."
+    )
+
+    if modo == "Seleção cruzada (navegador)":
+        st.subheader("Análise Exploratória dos Dados - Seleção Cruzada")
+        st.markdown("Clique em uma barra para filtrar os demais gráficos (Shift + clique seleciona vários valores; clique duplo limpa a seleção).")
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        medida = st.selectbox("📊 Medida", list(ROTULOS_MEDIDAS), format_func=ROTULOS_MEDIDAS.get)
+        st.altair_chart(graficos_cruzados(construir_cubo(versao, df), medida), use_container_width=True)
+        st.stop()
+
     # Sidebar
     st.sidebar.subheader("Filtros")
 
@@ -24,31 +101,76 @@ if df is not None and not df.empty:
     else:
         df_filtrado = df.copy()
 
+    # Busca rápida por IES, sigla, curso ou área CINE (índice pré-construído)
+    indice_busca = construir_indice_busca_cache(versao, df)
+    termo_busca = st.sidebar.text_input("🔎 Buscar IES, sigla, curso ou área", placeholder="Ex.: UnB, Direito, Saúde")
+    # IES e siglas respeitam só a UF (para permitir incluir outra IES); cursos e
+    # áreas respeitam também as IES já escolhidas (o multiselect vem abaixo)
+    resultados_busca = (
+        buscar(indice_busca, termo_busca, ufs=uf_selecionada, tipos={"IES", "Sigla"}, limite=50)
+        + buscar(indice_busca, termo_busca, ufs=uf_selecionada, ies=st.session_state.get("filtro_ies", []),
+                 tipos={"Curso", "Área CINE"}, limite=50)
+    ) if termo_busca else []
+
+    def restringir_pela_busca(opcoes, alvo, selecionados):
+        """Mantém apenas as opções encontradas pela busca (e as já selecionadas)."""
+        encontrados = {v for r in resultados_busca if r["alvo"] == alvo for v in r["valores"]}
+        if not encontrados:
+            return opcoes
+        return [o for o in opcoes if o in encontrados or o in selecionados]
+
     # Filtro por IES (opções dependem do filtro de UF)
-    if uf_selecionada:
-        ies_disponiveis = sorted(df[df['sigla_uf'].isin(uf_selecionada)]['no_ies'].unique())
-    else:
-        ies_disponiveis = sorted(df['no_ies'].unique())
-    ies_selecionada = st.sidebar.multiselect("🏫 Filtrar por IES", ies_disponiveis)
+    ies_disponiveis = opcoes_em_escopo(indice_busca, "IES", ufs=uf_selecionada)
+    ies_disponiveis = restringir_pela_busca(ies_disponiveis, "no_ies", st.session_state.get("filtro_ies", []))
+    ies_selecionada = st.sidebar.multiselect("🏫 Filtrar por IES", ies_disponiveis, key="filtro_ies")
     if ies_selecionada:
         df_filtrado = df_filtrado[df_filtrado['no_ies'].isin(ies_selecionada)]
     else:
         df_filtrado = df_filtrado.copy()
 
     # Filtro por Curso (opções dependem dos filtros de UF e IES)
-    if ies_selecionada:
-        cursos_disponiveis = sorted(df_filtrado['no_curso'].unique())
-    elif uf_selecionada:
-        cursos_disponiveis = sorted(df[df['sigla_uf'].isin(uf_selecionada)]['no_curso'].unique())
-    else:
-        cursos_disponiveis = sorted(df['no_curso'].unique())
-    curso_selecionado = st.sidebar.multiselect("📚 Filtrar por Curso", cursos_disponiveis)
+    cursos_disponiveis = opcoes_em_escopo(indice_busca, "Curso", ufs=uf_selecionada, ies=ies_selecionada)
+    cursos_disponiveis = restringir_pela_busca(cursos_disponiveis, "no_curso", st.session_state.get("filtro_curso", []))
+    curso_selecionado = st.sidebar.multiselect("📚 Filtrar por Curso", cursos_disponiveis, key="filtro_curso")
 
     if curso_selecionado:
         df_filtrado = df_filtrado[df_filtrado['no_curso'].isin(curso_selecionado)]
     else:
         df_filtrado = df_filtrado.copy()
 
+    # Chave dos filtros ativos (usada nos caches da página)
+    chave_filtros = (tuple(uf_selecionada), tuple(ies_selecionada), tuple(curso_selecionado))
+
+    # Exportação dos dados filtrados (gerada em lotes apenas ao clicar)
+    with st.sidebar.expander("⬇️ Exportar dados filtrados"):
+        colunas_exportacao = st.multiselect(
+            "Colunas",
+            list(df_filtrado.columns),
+            default=['nu_ano_censo', 'sigla_uf', 'nome_municipio', 'no_ies', 'no_curso', 'qt_vg_total', 'qt_ing', 'qt_mat', 'qt_conc'],
+            key="colunas_exportacao"
+        )
+        formato_exportacao = st.radio("Formato", list(FORMATOS_EXPORTACAO), horizontal=True, key="formato_exportacao")
+        st.caption(f"{len(df_filtrado):,} linhas".replace(",", "."))
+
+        # O arquivo é gerado em disco só ao clicar e baixado pelo servidor de
+        # arquivos estáticos; o link vale enquanto seleção, colunas e formato não mudam
+        chave_exportacao = (versao, chave_filtros, tuple(colunas_exportacao), formato_exportacao)
+        if st.button("Gerar arquivo", disabled=not colunas_exportacao, key="gerar_exportacao"):
+            try:
+                caminho = exportar_arquivo(df_filtrado, colunas_exportacao, formato_exportacao)
+                st.session_state["exportacao"] = {"chave": chave_exportacao, "caminho": str(caminho)}
+            except ValueError as erro:
+                st.warning(f"Não foi possível exportar: {erro}")
+        exportacao = st.session_state.get("exportacao")
+        if exportacao and exportacao["chave"] == chave_exportacao and Path(exportacao["caminho"]).exists():
+            extensao = FORMATOS_EXPORTACAO[formato_exportacao]["extensao"]
+            st.markdown(
+                f'<a href="{url_exportacao(exportacao["caminho"])}" download="ride_df_filtrado.{extensao}">⬇️ Baixar arquivo</a>',
+                unsafe_allow_html=True
+            )
+        if not st.get_option("server.enableStaticServing"):
+            st.caption("⚠️ Ative `server.enableStaticServing` (.streamlit/config.toml) para servir as exportações.")
+
     # Limpar Filtros
     # if st.sidebar.button("🧹 Limpar Filtros"):
     #    df = load_complete_ride_data()[0]  # Recarregar dados sem filtros
@@ -94,11 +216,12 @@ if df is not None and not df.empty:
 
 
     # Abas
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "🧑 Estudantes", 
         "🧑‍🏫 Professores", 
         "🏫 Instituições",
-        "📚 Cursos"
+        "📚 Cursos",
+        "🗺️ Mapa"
     ])
 
     with tab1:
@@ -108,114 +231,120 @@ if df is not None and not df.empty:
         # Use os dados filtrados para aplicar os filtros selecionados
         df_estudantes = df_filtrado if 'df_filtrado' in locals() else df
 
-        # Totais de gênero
-        total_feminino = df_estudantes['qt_mat_fem'].sum()
-        total_masculino = df_estudantes['qt_mat_masc'].sum()
-
+        # As agregações de cada gráfico ficam dentro do construtor, que só roda
+        # quando a figura não está no cache (gráfico, filtros, versão dos dados)
         col1, col2 = st.columns(2)
 
         with col1:    
             st.markdown("**Distribuição por Gênero**")
 
-            genero_data = pd.DataFrame({
-                'Gênero': ['Feminino', 'Masculino'],
-                'Quantidade': [total_feminino, total_masculino]
-            })
-            fig = px.pie(
-                genero_data, 
-                names='Gênero', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.amp
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                genero_data = pd.DataFrame({
+                    'Gênero': ['Feminino', 'Masculino'],
+                    'Quantidade': [df_estudantes['qt_mat_fem'].sum(), df_estudantes['qt_mat_masc'].sum()]
+                })
+                fig = px.pie(
+                    genero_data, 
+                    names='Gênero', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.amp
+                )
+                return fig
+            mostrar_figura("estudantes_genero", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             st.markdown("**Distribuição por Faixa Etária**")
 
-            faixa_data = pd.DataFrame({
-                'Faixa Etária': ['18-24 anos', '25-29 anos', '30-34 anos'],
-                'Quantidade': [
+            def grafico():
+                faixa_data = pd.DataFrame({
+                    'Faixa Etária': ['18-24 anos', '25-29 anos', '30-34 anos'],
+                    'Quantidade': [
+                        df_estudantes['qt_mat_18_24'].sum(),
+                        df_estudantes['qt_mat_25_29'].sum(),
+                        df_estudantes['qt_mat_30_34'].sum(),
+                    ]
+                })
+                fig = px.pie(
+                    faixa_data, 
+                    names='Faixa Etária', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.amp
+                )
+                return fig
+            mostrar_figura("estudantes_faixa_etaria", chave_filtros, versao, grafico, use_container_width=True)
+
+        # Gráfico
+        def grafico():
+            # Totais de matrículas por faixa (independente de sexo)
+            faixa_data = {
+                "Faixa Etária": ["18-24 anos", "25-29 anos", "30-34 anos"],
+                "Total": [
                     df_estudantes['qt_mat_18_24'].sum(),
                     df_estudantes['qt_mat_25_29'].sum(),
-                    df_estudantes['qt_mat_30_34'].sum(),
+                    df_estudantes['qt_mat_30_34'].sum()
                 ]
-            })
+            }
+            faixa_df = pd.DataFrame(faixa_data)
 
-            fig = px.pie(
-                faixa_data, 
-                names='Faixa Etária', 
-                values='Quantidade',
+            # Distribuir por gênero (proporção)
+            total_feminino = df_estudantes['qt_mat_fem'].sum()
+            total_masculino = df_estudantes['qt_mat_masc'].sum()
+            soma_genero = total_feminino + total_masculino
+            prop_fem = total_feminino / soma_genero if soma_genero > 0 else 0
+            prop_masc = total_masculino / soma_genero if soma_genero > 0 else 0
+
+            faixa_df["Feminino"] = (faixa_df["Total"] * prop_fem).round().astype(int)
+            faixa_df["Masculino"] = (faixa_df["Total"] * prop_masc).round().astype(int)
+
+            # Transformar para formato longo
+            faixa_long = faixa_df.melt(id_vars="Faixa Etária", value_vars=["Feminino", "Masculino"],
+                                    var_name="Gênero", value_name="Matriculados")
+
+            fig = px.bar(
+                faixa_long,
+                x="Faixa Etária",
+                y="Matriculados",
+                color="Gênero",
+                barmode="group",
+                text="Matriculados",
+                title="Distribuição de Matriculados por Faixa Etária e Gênero",
                 color_discrete_sequence=px.colors.sequential.amp
             )
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Totais de matrículas por faixa (independente de sexo)
-        faixa_data = {
-            "Faixa Etária": ["18-24 anos", "25-29 anos", "30-34 anos"],
-            "Total": [
-                df_estudantes['qt_mat_18_24'].sum(),
-                df_estudantes['qt_mat_25_29'].sum(),
-                df_estudantes['qt_mat_30_34'].sum()
-            ]
-        }
-        faixa_df = pd.DataFrame(faixa_data)
-
-        # Distribuir por gênero (proporção)
-        total_geral = faixa_df["Total"].sum()
-        soma_genero = total_feminino + total_masculino
-        prop_fem = total_feminino / soma_genero if soma_genero > 0 else 0
-        prop_masc = total_masculino / soma_genero if soma_genero > 0 else 0
-
-        faixa_df["Feminino"] = (faixa_df["Total"] * prop_fem).round().astype(int)
-        faixa_df["Masculino"] = (faixa_df["Total"] * prop_masc).round().astype(int)
-
-        # Transformar para formato longo
-        faixa_long = faixa_df.melt(id_vars="Faixa Etária", value_vars=["Feminino", "Masculino"],
-                                var_name="Gênero", value_name="Matriculados")
-
-        # Gráfico
-        fig = px.bar(
-            faixa_long,
-            x="Faixa Etária",
-            y="Matriculados",
-            color="Gênero",
-            barmode="group",
-            text="Matriculados",
-            title="Distribuição de Matriculados por Faixa Etária e Gênero",
-            color_discrete_sequence=px.colors.sequential.amp
-        )
-        fig.update_traces(textposition="outside")
-        st.plotly_chart(fig, use_container_width=True)
+            fig.update_traces(textposition="outside")
+            return fig
+        mostrar_figura("estudantes_faixa_genero", chave_filtros, versao, grafico, use_container_width=True)
 
 
         st.divider()
 
 
         # Gráfico de Barras - 'qt_mat_branca', 'qt_mat_preta', 'qt_mat_parda'
-        raca_data = pd.DataFrame({
-            'Raça/Cor': ['Branca', 'Preta', 'Parda'],
-            'Quantidade': [
-                df_estudantes['qt_mat_branca'].sum(),
-                df_estudantes['qt_mat_preta'].sum(),
-                df_estudantes['qt_mat_parda'].sum(),
-            ]
-        })
+        def grafico():
+            raca_data = pd.DataFrame({
+                'Raça/Cor': ['Branca', 'Preta', 'Parda'],
+                'Quantidade': [
+                    df_estudantes['qt_mat_branca'].sum(),
+                    df_estudantes['qt_mat_preta'].sum(),
+                    df_estudantes['qt_mat_parda'].sum(),
+                ]
+            })
 
-        raca_data = raca_data.sort_values(by='Quantidade', ascending=False)
-
-        fig = px.bar(
-            raca_data, 
-            x='Quantidade', 
-            y='Raça/Cor',
-            color='Raça/Cor',
-            text='Quantidade',
-            orientation='h',
-            title="Distribuição de Matriculados por Raça/Cor",
-            color_discrete_sequence=px.colors.sequential.amp
-        )
-        fig.update_traces(textposition='outside')
-        fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
-        st.plotly_chart(fig, use_container_width=True)
+            raca_data = raca_data.sort_values(by='Quantidade', ascending=False)
+
+            fig = px.bar(
+                raca_data, 
+                x='Quantidade', 
+                y='Raça/Cor',
+                color='Raça/Cor',
+                text='Quantidade',
+                orientation='h',
+                title="Distribuição de Matriculados por Raça/Cor",
+                color_discrete_sequence=px.colors.sequential.amp
+            )
+            fig.update_traces(textposition='outside')
+            fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
+            return fig
+        mostrar_figura("estudantes_raca", chave_filtros, versao, grafico, use_container_width=True)
 
 
         st.divider()
@@ -227,40 +356,41 @@ if df is not None and not df.empty:
         with col1:
             # Gráfico de Pizza com Matrículas via Bolsas
             # qt_mat_financ', 'qt_mat_fies', 'qt_mat_prounii', 'qt_mat_prounip'
-            total_matriculados = df_estudantes['qt_mat'].sum()
-            total_financiados = (
-                df_estudantes['qt_mat_financ'].sum() +
-                df_estudantes['qt_mat_fies'].sum() +
-                df_estudantes['qt_mat_prounii'].sum() +
-                df_estudantes['qt_mat_prounip'].sum()
-            )
-            nao_financiados = total_matriculados - total_financiados
-
-            financ_data = pd.DataFrame({
-                'Tipo de Financiamento': [
-                    'Não Financiado',
-                    'Financiado (Outros)',
-                    'FIES',
-                    'ProUni Integral',
-                    'ProUni Parcial'
-                ],
-                'Quantidade': [
-                    nao_financiados,
-                    df_estudantes['qt_mat_financ'].sum(),
-                    df_estudantes['qt_mat_fies'].sum(),
-                    df_estudantes['qt_mat_prounii'].sum(),
-                    df_estudantes['qt_mat_prounip'].sum(),
-                ]
-            })
-                        
             st.markdown("**Distribuição de Matrículas por Tipo de Financiamento**")
-            fig = px.pie(
-                financ_data, 
-                names='Tipo de Financiamento', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.amp
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                total_matriculados = df_estudantes['qt_mat'].sum()
+                total_financiados = (
+                    df_estudantes['qt_mat_financ'].sum() +
+                    df_estudantes['qt_mat_fies'].sum() +
+                    df_estudantes['qt_mat_prounii'].sum() +
+                    df_estudantes['qt_mat_prounip'].sum()
+                )
+                nao_financiados = total_matriculados - total_financiados
+
+                financ_data = pd.DataFrame({
+                    'Tipo de Financiamento': [
+                        'Não Financiado',
+                        'Financiado (Outros)',
+                        'FIES',
+                        'ProUni Integral',
+                        'ProUni Parcial'
+                    ],
+                    'Quantidade': [
+                        nao_financiados,
+                        df_estudantes['qt_mat_financ'].sum(),
+                        df_estudantes['qt_mat_fies'].sum(),
+                        df_estudantes['qt_mat_prounii'].sum(),
+                        df_estudantes['qt_mat_prounip'].sum(),
+                    ]
+                })
+                fig = px.pie(
+                    financ_data, 
+                    names='Tipo de Financiamento', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.amp
+                )
+                return fig
+            mostrar_figura("estudantes_financiamento", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Tabela com Cursos Únicos com mais Financiamentos (FIES, ProUni)
@@ -295,39 +425,43 @@ if df is not None and not df.empty:
         col1, col2 = st.columns(2)
         with col1:
             # Quantidade de Ingressantes por Gênero 'qt_ing_fem', 'qt_ing_masc'
-            ingressantes_fem = df_estudantes['qt_ing_fem'].sum()
-            ingressantes_masc = df_estudantes['qt_ing_masc'].sum()
-            ingressantes_data = pd.DataFrame({
-                'Gênero': ['Feminino', 'Masculino'],
-                'Quantidade': [ingressantes_fem, ingressantes_masc]
-            })
-            fig = px.pie(
-                ingressantes_data, 
-                names='Gênero', 
-                values='Quantidade',
-                title="Distribuição de Ingressantes por Gênero",
-                color_discrete_sequence=px.colors.sequential.algae
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                ingressantes_fem = df_estudantes['qt_ing_fem'].sum()
+                ingressantes_masc = df_estudantes['qt_ing_masc'].sum()
+                ingressantes_data = pd.DataFrame({
+                    'Gênero': ['Feminino', 'Masculino'],
+                    'Quantidade': [ingressantes_fem, ingressantes_masc]
+                })
+                fig = px.pie(
+                    ingressantes_data, 
+                    names='Gênero', 
+                    values='Quantidade',
+                    title="Distribuição de Ingressantes por Gênero",
+                    color_discrete_sequence=px.colors.sequential.algae
+                )
+                return fig
+            mostrar_figura("ingressantes_genero", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Quantidade de Ingressantes por Faixa Etária 'qt_ing_18_24', 'qt_ing_25_29', 'qt_ing_30_34'
-            ingressantes_faixa = pd.DataFrame({
-                'Faixa Etária': ['18-24 anos', '25-29 anos', '30-34 anos'],
-                'Quantidade': [
-                    df_estudantes['qt_ing_18_24'].sum(),
-                    df_estudantes['qt_ing_25_29'].sum(),
-                    df_estudantes['qt_ing_30_34'].sum()
-                ]
-            })
-            fig = px.pie(
-                ingressantes_faixa, 
-                names='Faixa Etária', 
-                values='Quantidade',
-                title="Distribuição de Ingressantes por Faixa Etária",
-                color_discrete_sequence=px.colors.sequential.algae
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                ingressantes_faixa = pd.DataFrame({
+                    'Faixa Etária': ['18-24 anos', '25-29 anos', '30-34 anos'],
+                    'Quantidade': [
+                        df_estudantes['qt_ing_18_24'].sum(),
+                        df_estudantes['qt_ing_25_29'].sum(),
+                        df_estudantes['qt_ing_30_34'].sum()
+                    ]
+                })
+                fig = px.pie(
+                    ingressantes_faixa, 
+                    names='Faixa Etária', 
+                    values='Quantidade',
+                    title="Distribuição de Ingressantes por Faixa Etária",
+                    color_discrete_sequence=px.colors.sequential.algae
+                )
+                return fig
+            mostrar_figura("ingressantes_faixa_etaria", chave_filtros, versao, grafico, use_container_width=True)
 
         
         st.divider()
@@ -336,52 +470,56 @@ if df is not None and not df.empty:
         with col1:
 
             # Quantidade de Ingressantes por Raça/Cor 'qt_ing_branca', 'qt_ing_preta', 'qt_ing_parda'
-            ingressantes_raca = pd.DataFrame({
-                'Raça/Cor': ['Branca', 'Preta', 'Parda'],
-                'Quantidade': [
-                    df_estudantes['qt_ing_branca'].sum(),
-                    df_estudantes['qt_ing_preta'].sum(),
-                    df_estudantes['qt_ing_parda'].sum()
-                ]
-            })
-            ingressantes_raca = ingressantes_raca.sort_values(by='Quantidade', ascending=False)
-            fig = px.bar(
-                ingressantes_raca, 
-                x='Quantidade', 
-                y='Raça/Cor',
-                color='Raça/Cor',
-                text='Quantidade',
-                orientation='h',
-                title="Distribuição de Ingressantes por Raça/Cor",
-                color_discrete_sequence=px.colors.sequential.algae
-            )
-            fig.update_traces(textposition='outside')
-            fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                ingressantes_raca = pd.DataFrame({
+                    'Raça/Cor': ['Branca', 'Preta', 'Parda'],
+                    'Quantidade': [
+                        df_estudantes['qt_ing_branca'].sum(),
+                        df_estudantes['qt_ing_preta'].sum(),
+                        df_estudantes['qt_ing_parda'].sum()
+                    ]
+                })
+                ingressantes_raca = ingressantes_raca.sort_values(by='Quantidade', ascending=False)
+                fig = px.bar(
+                    ingressantes_raca, 
+                    x='Quantidade', 
+                    y='Raça/Cor',
+                    color='Raça/Cor',
+                    text='Quantidade',
+                    orientation='h',
+                    title="Distribuição de Ingressantes por Raça/Cor",
+                    color_discrete_sequence=px.colors.sequential.algae
+                )
+                fig.update_traces(textposition='outside')
+                fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
+                return fig
+            mostrar_figura("ingressantes_raca", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Quantidade de Ingressantes por Tipo de Ingresso 'qt_ing_vestibular', 'qt_ing_enem'
-            ingressantes_tipo = pd.DataFrame({
-                'Tipo de Ingresso': ['Vestibular', 'ENEM'],
-                'Quantidade': [
-                    df_estudantes['qt_ing_vestibular'].sum(),
-                    df_estudantes['qt_ing_enem'].sum()
-                ]
-            })
-            fig = px.bar(
-                ingressantes_tipo, 
-                x='Quantidade',
-                y='Tipo de Ingresso',
-                color='Tipo de Ingresso',
-                text='Quantidade',
-                orientation='h',
-                title="Distribuição de Ingressantes por Tipo de Ingresso",
-                color_discrete_sequence=px.colors.sequential.algae
-            )
-            # hide legend
-            fig.update_traces(textposition='outside')
-            fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                ingressantes_tipo = pd.DataFrame({
+                    'Tipo de Ingresso': ['Vestibular', 'ENEM'],
+                    'Quantidade': [
+                        df_estudantes['qt_ing_vestibular'].sum(),
+                        df_estudantes['qt_ing_enem'].sum()
+                    ]
+                })
+                fig = px.bar(
+                    ingressantes_tipo, 
+                    x='Quantidade',
+                    y='Tipo de Ingresso',
+                    color='Tipo de Ingresso',
+                    text='Quantidade',
+                    orientation='h',
+                    title="Distribuição de Ingressantes por Tipo de Ingresso",
+                    color_discrete_sequence=px.colors.sequential.algae
+                )
+                # hide legend
+                fig.update_traces(textposition='outside')
+                fig.update_layout(showlegend=False)  # Esconde a caixa de legenda de cores
+                return fig
+            mostrar_figura("ingressantes_tipo", chave_filtros, versao, grafico, use_container_width=True)
 
 
         st.divider()
@@ -389,39 +527,41 @@ if df is not None and not df.empty:
         col1, col2 = st.columns(2, gap="large")
         with col1:
             # Distribuição de Ingressantes por tipo de Financiamento 'qt_ing_financ', 'qt_ing_fies', 'qt_ing_prounii', 'qt_ing_prounip'
-            total_ingressantes = df_estudantes['qt_ing'].sum()
-            total_ingressantes_financiados = (
-                df_estudantes['qt_ing_financ'].sum() +
-                df_estudantes['qt_ing_fies'].sum() +
-                df_estudantes['qt_ing_prounii'].sum() +
-                df_estudantes['qt_ing_prounip'].sum()
-            )
-            nao_financiados_ing = total_ingressantes - total_ingressantes_financiados
-
-            ingressantes_financ_data = pd.DataFrame({
-                'Tipo de Financiamento': [
-                    'Não Financiado',
-                    'Financiado (Outros)',
-                    'FIES',
-                    'ProUni Integral',
-                    'ProUni Parcial'
-                ],
-                'Quantidade': [
-                    nao_financiados_ing,
-                    df_estudantes['qt_ing_financ'].sum(),
-                    df_estudantes['qt_ing_fies'].sum(),
-                    df_estudantes['qt_ing_prounii'].sum(),
-                    df_estudantes['qt_ing_prounip'].sum(),
-                ]
-            })
             st.markdown("**Distribuição de Ingressantes por Tipo de Financiamento**")
-            fig = px.pie(
-                ingressantes_financ_data, 
-                names='Tipo de Financiamento', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.algae
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                total_ingressantes = df_estudantes['qt_ing'].sum()
+                total_ingressantes_financiados = (
+                    df_estudantes['qt_ing_financ'].sum() +
+                    df_estudantes['qt_ing_fies'].sum() +
+                    df_estudantes['qt_ing_prounii'].sum() +
+                    df_estudantes['qt_ing_prounip'].sum()
+                )
+                nao_financiados_ing = total_ingressantes - total_ingressantes_financiados
+
+                ingressantes_financ_data = pd.DataFrame({
+                    'Tipo de Financiamento': [
+                        'Não Financiado',
+                        'Financiado (Outros)',
+                        'FIES',
+                        'ProUni Integral',
+                        'ProUni Parcial'
+                    ],
+                    'Quantidade': [
+                        nao_financiados_ing,
+                        df_estudantes['qt_ing_financ'].sum(),
+                        df_estudantes['qt_ing_fies'].sum(),
+                        df_estudantes['qt_ing_prounii'].sum(),
+                        df_estudantes['qt_ing_prounip'].sum(),
+                    ]
+                })
+                fig = px.pie(
+                    ingressantes_financ_data, 
+                    names='Tipo de Financiamento', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.algae
+                )
+                return fig
+            mostrar_figura("ingressantes_financiamento", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Tabela com Cursos Únicos com mais Ingressantes via Financiamentos (FIES, ProUni)
@@ -489,43 +629,47 @@ if df is not None and not df.empty:
         col1, col2 = st.columns(2, gap="large")
         with col1:
             # Percentual de Doutores
-            perc_doutores = (total_doutores / total_docentes * 100) if total_docentes > 0 else 0
-            perc_mestres = (total_mestres / total_docentes * 100) if total_docentes > 0 else 0
-            perc_especialistas = (total_especialistas / total_docentes * 100) if total_docentes > 0 else 0
-
-            perc_data = pd.DataFrame({
-                'Nível de Formação': ['Doutores', 'Mestres', 'Especialistas'],
-                'Percentual': [perc_doutores, perc_mestres, perc_especialistas]
-            })
-
-            fig = px.pie(
-                perc_data, 
-                names='Nível de Formação', 
-                values='Percentual',
-                title="Distribuição Percentual dos Níveis de Formação dos Docentes",
-                color_discrete_sequence=px.colors.sequential.Burg
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                perc_doutores = (total_doutores / total_docentes * 100) if total_docentes > 0 else 0
+                perc_mestres = (total_mestres / total_docentes * 100) if total_docentes > 0 else 0
+                perc_especialistas = (total_especialistas / total_docentes * 100) if total_docentes > 0 else 0
+
+                perc_data = pd.DataFrame({
+                    'Nível de Formação': ['Doutores', 'Mestres', 'Especialistas'],
+                    'Percentual': [perc_doutores, perc_mestres, perc_especialistas]
+                })
+
+                fig = px.pie(
+                    perc_data, 
+                    names='Nível de Formação', 
+                    values='Percentual',
+                    title="Distribuição Percentual dos Níveis de Formação dos Docentes",
+                    color_discrete_sequence=px.colors.sequential.Burg
+                )
+                return fig
+            mostrar_figura("docentes_formacao", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Distribuição de Docentes por Sexo
-            total_docentes_fem = df_professores_unicos['qt_doc_ex_femi'].sum()
-            total_docentes_masc = df_professores_unicos['qt_doc_ex_masc'].sum()
-
-            genero_data = pd.DataFrame({
-                'Gênero': ['Feminino', 'Masculino'],
-                'Quantidade': [total_docentes_fem, total_docentes_masc]
-            })
-
             # Gráfico de Pizza
-            fig = px.pie(
-                genero_data, 
-                names='Gênero', 
-                values='Quantidade',
-                title="Distribuição de Docentes por Gênero",
-                color_discrete_sequence=px.colors.sequential.Burg
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                total_docentes_fem = df_professores_unicos['qt_doc_ex_femi'].sum()
+                total_docentes_masc = df_professores_unicos['qt_doc_ex_masc'].sum()
+
+                genero_data = pd.DataFrame({
+                    'Gênero': ['Feminino', 'Masculino'],
+                    'Quantidade': [total_docentes_fem, total_docentes_masc]
+                })
+
+                fig = px.pie(
+                    genero_data, 
+                    names='Gênero', 
+                    values='Quantidade',
+                    title="Distribuição de Docentes por Gênero",
+                    color_discrete_sequence=px.colors.sequential.Burg
+                )
+                return fig
+            mostrar_figura("docentes_genero", chave_filtros, versao, grafico, use_container_width=True)
 
 
     with tab3:
@@ -543,49 +687,53 @@ if df is not None and not df.empty:
         with col1:
             st.markdown("**Distribuição de IES por Categoria Administrativa**")
             # Totais por Categoria Administrativa
-            categoria_counts = df_instituicoes_unicos['tp_categoria_administrativa'].value_counts().rename(index={
-                '1': 'Pública Federal',
-                '2': 'Pública Estadual',
-                '3': 'Pública Municipal',
-                '4': 'Privada com fins lucrativos',
-                '5': 'Privada sem fins lucrativos'
-            })
-
-            categoria_data = pd.DataFrame({
-                'Categoria Administrativa': categoria_counts.index,
-                'Quantidade': categoria_counts.values
-            })
-
-            fig = px.pie(
-                categoria_data, 
-                names='Categoria Administrativa', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.Mint
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                categoria_counts = df_instituicoes_unicos['tp_categoria_administrativa'].value_counts().rename(index={
+                    '1': 'Pública Federal',
+                    '2': 'Pública Estadual',
+                    '3': 'Pública Municipal',
+                    '4': 'Privada com fins lucrativos',
+                    '5': 'Privada sem fins lucrativos'
+                })
+
+                categoria_data = pd.DataFrame({
+                    'Categoria Administrativa': categoria_counts.index,
+                    'Quantidade': categoria_counts.values
+                })
+
+                fig = px.pie(
+                    categoria_data, 
+                    names='Categoria Administrativa', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.Mint
+                )
+                return fig
+            mostrar_figura("ies_categoria", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             st.markdown("**Distribuição de IES por Tipo de Organização Acadêmica**")
             # Totais por Tipo de Organização Acadêmica
-            org_counts = df_instituicoes_unicos['tp_organizacao_academica'].value_counts().rename(index={
-                '1': 'Universidade',
-                '2': 'Centro Universitário',
-                '3': 'Faculdade',
-                '4': 'Instituto Superior',
-                '5': 'Centro de Ensino Superior',
-                '6': 'Escola Superior'  
-            })
-            org_data = pd.DataFrame({
-                'Tipo de Organização Acadêmica': org_counts.index,
-                'Quantidade': org_counts.values
-            })
-            fig = px.pie(
-                org_data, 
-                names='Tipo de Organização Acadêmica', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.Mint
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            def grafico():
+                org_counts = df_instituicoes_unicos['tp_organizacao_academica'].value_counts().rename(index={
+                    '1': 'Universidade',
+                    '2': 'Centro Universitário',
+                    '3': 'Faculdade',
+                    '4': 'Instituto Superior',
+                    '5': 'Centro de Ensino Superior',
+                    '6': 'Escola Superior'  
+                })
+                org_data = pd.DataFrame({
+                    'Tipo de Organização Acadêmica': org_counts.index,
+                    'Quantidade': org_counts.values
+                })
+                fig = px.pie(
+                    org_data, 
+                    names='Tipo de Organização Acadêmica', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.Mint
+                )
+                return fig
+            mostrar_figura("ies_organizacao", chave_filtros, versao, grafico, use_container_width=True)
 
         st.divider()
 
@@ -598,14 +746,6 @@ if df is not None and not df.empty:
             ["Matrículas", "Conclusões", "Docentes", "Doutores"]
         )
 
-        # Agregar dados por IES
-        df_ies = df_filtrado.groupby(['co_ies', 'no_ies', 'sigla_uf']).agg({
-            'qt_mat': 'sum',
-            'qt_conc': 'sum', 
-            'qt_doc_total': 'first',
-            'qt_doc_ex_dout': 'first'
-        }).reset_index()
-        
         coluna_criterio = {
             "Matrículas": "qt_mat",
             "Conclusões": "qt_conc", 
@@ -613,9 +753,16 @@ if df is not None and not df.empty:
             "Doutores": "qt_doc_ex_dout"
         }[criterio]
         
-        if coluna_criterio in df_ies.columns:
+        def grafico():
+            # Agregar dados por IES
+            df_ies = df_filtrado.groupby(['co_ies', 'no_ies', 'sigla_uf']).agg({
+                'qt_mat': 'sum',
+                'qt_conc': 'sum', 
+                'qt_doc_total': 'first',
+                'qt_doc_ex_dout': 'first'
+            }).reset_index()
             df_top10 = df_ies.nlargest(10, coluna_criterio)
-            
+
             fig = px.bar(
                 df_top10,
                 x=coluna_criterio,
@@ -629,7 +776,8 @@ if df is not None and not df.empty:
                 }
             )
             fig.update_layout(yaxis={'categoryorder':'total ascending'})
-            st.plotly_chart(fig, use_container_width=True)
+            return fig
+        mostrar_figura(f"ies_ranking_{criterio}", chave_filtros, versao, grafico, use_container_width=True)
 
 
         # Tabela com todas as IES
@@ -693,42 +841,46 @@ if df is not None and not df.empty:
         with col1:
             # Conexão a Internet
             st.markdown("**Conexão à Internet nas IES**")
-            conexao_counts = df_instituicoes_unicos['in_servico_internet'].value_counts().rename(index={
-                1: 'Sim',
-                2: 'Não'
-            })
-            conexao_data = pd.DataFrame({
-                'Conexão à Internet': conexao_counts.index,
-                'Quantidade': conexao_counts.values
-            })
-
-            fig = px.pie(
-                conexao_data, 
-                names='Conexão à Internet', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.Mint
-            )
-            st.plotly_chart(fig, use_container_width=True)      
+            def grafico():
+                conexao_counts = df_instituicoes_unicos['in_servico_internet'].value_counts().rename(index={
+                    1: 'Sim',
+                    2: 'Não'
+                })
+                conexao_data = pd.DataFrame({
+                    'Conexão à Internet': conexao_counts.index,
+                    'Quantidade': conexao_counts.values
+                })
+
+                fig = px.pie(
+                    conexao_data, 
+                    names='Conexão à Internet', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.Mint
+                )
+                return fig
+            mostrar_figura("ies_internet", chave_filtros, versao, grafico, use_container_width=True)
 
         with col2:
             # Acesso a Biblioteca
             st.markdown("**Acesso à Biblioteca nas IES**")
-            biblioteca_counts = df_instituicoes_unicos['in_repositorio_institucional'].value_counts().rename(index={
-                1: 'Sim',
-                2: 'Não'
-            })
-            biblioteca_data = pd.DataFrame({
-                'Acesso à Biblioteca': biblioteca_counts.index,
-                'Quantidade': biblioteca_counts.values
-            })
+            def grafico():
+                biblioteca_counts = df_instituicoes_unicos['in_repositorio_institucional'].value_counts().rename(index={
+                    1: 'Sim',
+                    2: 'Não'
+                })
+                biblioteca_data = pd.DataFrame({
+                    'Acesso à Biblioteca': biblioteca_counts.index,
+                    'Quantidade': biblioteca_counts.values
+                })
 
-            fig = px.pie(
-                biblioteca_data, 
-                names='Acesso à Biblioteca', 
-                values='Quantidade',
-                color_discrete_sequence=px.colors.sequential.Mint
-            )
-            st.plotly_chart(fig, use_container_width=True)                           
+                fig = px.pie(
+                    biblioteca_data, 
+                    names='Acesso à Biblioteca', 
+                    values='Quantidade',
+                    color_discrete_sequence=px.colors.sequential.Mint
+                )
+                return fig
+            mostrar_figura("ies_repositorio", chave_filtros, versao, grafico, use_container_width=True)
 
 
 
@@ -740,28 +892,27 @@ if df is not None and not df.empty:
 
         # Use os dados filtrados para aplicar os filtros selecionados
         df_cursos = df_filtrado if 'df_filtrado' in locals() else df
-        # Garantir que cada Curso seja considerado apenas uma vez por IES e Ano
-        df_cursos_unicos = df_cursos.drop_duplicates(subset=['co_ies', 'co_curso', 'nu_ano_censo'])
-        total_cursos = df_cursos_unicos['no_curso'].nunique()
-
-
         # Gráfico de Pizza com o total de vagas por modalidade de ensino tp_modalidade_ensino
-        modalidade_counts = df_cursos_unicos['tp_modalidade_ensino'].value_counts().rename(index={
-            1: 'Presencial',
-            2: 'EAD'
-        })
-        modalidade_data = pd.DataFrame({
-            'Modalidade de Ensino': modalidade_counts.index,
-            'Quantidade': modalidade_counts.values
-        })
-        fig = px.pie(
-            modalidade_data, 
-            names='Modalidade de Ensino', 
-            values='Quantidade',
-            title="Distribuição de Cursos por Modalidade de Ensino",
-            color_discrete_sequence=px.colors.sequential.Blugrn
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        def grafico():
+            # Garantir que cada Curso seja considerado apenas uma vez por IES e Ano
+            df_cursos_unicos = df_cursos.drop_duplicates(subset=['co_ies', 'co_curso', 'nu_ano_censo'])
+            modalidade_counts = df_cursos_unicos['tp_modalidade_ensino'].value_counts().rename(index={
+                1: 'Presencial',
+                2: 'EAD'
+            })
+            modalidade_data = pd.DataFrame({
+                'Modalidade de Ensino': modalidade_counts.index,
+                'Quantidade': modalidade_counts.values
+            })
+            fig = px.pie(
+                modalidade_data, 
+                names='Modalidade de Ensino', 
+                values='Quantidade',
+                title="Distribuição de Cursos por Modalidade de Ensino",
+                color_discrete_sequence=px.colors.sequential.Blugrn
+            )
+            return fig
+        mostrar_figura("cursos_modalidade", chave_filtros, versao, grafico, use_container_width=True)
 
 
         st.divider()
@@ -777,44 +928,43 @@ if df is not None and not df.empty:
             .sort_values('ingressantes', ascending=False)
         )
 
-        # Taxa de Ingresso por 
-        # Agregar por IES + Curso + Ano (soma de vagas e ingressantes)
-        df_cursos = (
-            df_metricas
-            .groupby(['co_ies','no_ies','no_curso','nu_ano_censo'], as_index=False)
-            .agg(
-                qt_vg_total=('qt_vg_total','sum'),
-                qt_ing=('qt_ing','sum')
-            )
+        # Tabela de cursos: agregado IES + Curso + Ano com índice pré-ordenado,
+        # reconstruído apenas quando os filtros mudam
+        st.markdown(f"**Tabela de Cursos Ofertados - Taxa de Ingresso**")
+        st.markdown("A tabela abaixo apresenta os cursos ofertados pelas IES, juntamente com o total de vagas, ingressantes e a taxa de ingresso (%) no ano de 2023, que representa a proporção de ingressantes em relação ao total de vagas oferecidas.")
+        indice_cursos = construir_indice_cursos(chave_filtros, versao, df_metricas)
+        mostrar_tabela_paginada(
+            indice_cursos,
+            chave="tabela_cursos",
+            rotulos={
+                'no_ies': 'Nome da IES',
+                'no_curso': 'Nome do Curso',
+                'qt_vg_total': 'Total de Vagas',
+                'qt_ing': 'Total de Ingressantes',
+                'taxa_ingresso': 'Taxa de Ingresso (%)'
+            },
+            coluna_padrao='no_ies'
         )
 
-        # Calcular taxa de ingresso após agregar
-        df_cursos['taxa_ingresso'] = np.where(
-            df_cursos['qt_vg_total'] > 0,
-            (df_cursos['qt_ing'] / df_cursos['qt_vg_total'] * 100).round(2),
-            np.nan
-        )
 
-        # Ordenar por Nome da IES, Nome do Curso e Taxa de Ingresso
-        df_cursos = df_cursos.sort_values(
-            by=['no_ies', 'taxa_ingresso'],
-            ascending=[True, False]   # ordena taxa de forma decrescente
-        )
+    with tab5:
 
-        # Mostrar tabela
-        st.markdown(f"**Tabela de Cursos Ofertados - Taxa de Ingresso**")
-        st.markdown("A tabela abaixo apresenta os cursos ofertados pelas IES, juntamente com o total de vagas, ingressantes e a taxa de ingresso (%) no ano de 2023, que representa a proporção de ingressantes em relação ao total de vagas oferecidas.")
-        df_cursos_renomeado = df_cursos.rename(columns={
-            'no_ies': 'Nome da IES',
-            'no_curso': 'Nome do Curso',
-            'qt_vg_total': 'Total de Vagas',
-            'qt_ing': 'Total de Ingressantes',
-            'taxa_ingresso': 'Taxa de Ingresso (%)'
-        })
-        st.dataframe(
-            df_cursos_renomeado[['Nome da IES', 'Nome do Curso', 'Total de Vagas', 'Total de Ingressantes', 'Taxa de Ingresso (%)']],
-            use_container_width=True
+        st.subheader("Distribuição Geográfica por Município")
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        medida_mapa = st.selectbox(
+            "📊 Medida",
+            list(MEDIDAS_MAPA),
+            format_func=MEDIDAS_MAPA.get,
+            key="medida_mapa"
         )
 
+        # Um ponto por município, agregado a partir dos totais pré-calculados
+        geometria, grupos_mapa = construir_base_mapa(versao, df)
+        def grafico():
+            totais = totais_municipio(grupos_mapa, uf_selecionada, ies_selecionada, curso_selecionado)
+            return figura_mapa(totais, geometria, medida_mapa)
+        mostrar_figura(f"mapa_{medida_mapa}", chave_filtros, versao, grafico, use_container_width=True)
+
 else:
     st.warning("⚠️ Nenhum dado disponível para exibição. Verifique status do DataIESB.")
\ No newline at end of file
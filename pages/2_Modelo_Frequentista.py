@@ -3,9 +3,23 @@ import pandas as pd
 import plotly.express as px
 import numpy as np
 from app import load_complete_ride_data, calcular_metricas_educacionais
-import statsmodels.api as sm
-import statsmodels.formula.api as smf
 import altair as alt
+from modules.modelo_frequentista import (
+    preparar_dados, obter_artefato, tabela_resultados, salvar_resultados_csv, FORMULA, COLUNAS_MODELO,
+    EFEITOS_FIXOS, obter_artefato_efeitos_fixos, artefato_cluster, ajustar_filtrado
+)
+from modules.matriz_desenho import matriz_modelo
+from modules.bootstrap import obter_bootstrap, intervalos_bootstrap, replicas_validas
+from modules.validacao_cruzada import obter_validacao, resumo_validacao
+from modules.diagnosticos import obter_diagnosticos, tabela_diagnosticos, cursos_influentes
+from modules.predicao import (
+    VARIAVEIS_CATEGORICAS, VARIAVEIS_CONTINUAS, COLUNAS_PERFIL, prever, efeitos_marginais, assinatura_ajuste
+)
+from modules.ajuste_subgrupos import PARTICOES, ajustar_subgrupos
+from modules.selecao_modelos import (
+    CANDIDATOS_SELECAO, preparar_candidatos, matriz_completa, termos_formula,
+    selecao_stepwise, selecao_todos_subconjuntos, tabela_selecao
+)
 
 
 # Carregar dados integrados
@@ -19,93 +33,127 @@ if df is not None and not df.empty:
     print("Dados integrados carregados com sucesso.")
 
 
-    # Execução do Modelo
+    # 1. Preparação dos dados
     @st.cache_data
+    def preparar_dados_modelo(df: pd.DataFrame) -> pd.DataFrame:
+        return preparar_dados(df)
 
-    # Função de preparação
-    def preparar_dados(df: pd.DataFrame) -> pd.DataFrame:
-        """Cria variáveis derivadas e prepara dados para modelagem NB."""
-        df = df.copy()
-        df.columns = [c.lower() for c in df.columns]
-
-        # Total de docentes
-        df["qt_doc_total_calc"] = (
-            df["qt_doc_ex_grad"].fillna(0)
-            + df["qt_doc_ex_esp"].fillna(0)
-            + df["qt_doc_ex_mest"].fillna(0)
-            + df["qt_doc_ex_dout"].fillna(0)
-        )
 
-        # Proporção de docentes avançados (mestres + doutores)
-        df["prop_doc_avancado"] = (
-            (df["qt_doc_ex_mest"].fillna(0) + df["qt_doc_ex_dout"].fillna(0))
-            / df["qt_doc_total_calc"].replace(0, np.nan)
-        )
+    # 2. Ajuste do modelo (artefato persistido por impressão digital dos dados + fórmula)
+    @st.cache_data
+    def carregar_modelo(df_model: pd.DataFrame, estimar_dispersao: bool = False) -> dict:
+        """Carrega o artefato do ajuste (reajusta só se dados/fórmula mudarem) e atualiza resultados_freq.csv."""
+        artefato = obter_artefato(df_model, estimar_dispersao=estimar_dispersao)
+        if not estimar_dispersao:
+            salvar_resultados_csv(artefato)
+        return artefato
+
+
+    # Reajuste na seleção (matriz completa por subconjunto de linhas, cache por filtro)
+    MINIMO_CURSOS_REAJUSTE = 30
+
+    @st.cache_data(max_entries=32, show_spinner="Reajustando o modelo na seleção...")
+    def reajustar_filtrado(chave_filtros: tuple, chave_artefato: str, _df_model: pd.DataFrame, _artefato: dict) -> dict:
+        uf, ies = chave_filtros
+        mascara = pd.Series(True, index=_df_model.index)
+        if uf:
+            mascara &= _df_model["sigla_uf"].isin(uf)
+        if ies:
+            mascara &= _df_model["no_ies"].isin(ies)
+        if mascara.sum() < MINIMO_CURSOS_REAJUSTE:
+            raise ValueError(f"a seleção tem {mascara.sum()} cursos (mínimo {MINIMO_CURSOS_REAJUSTE}).")
+        return ajustar_filtrado(_df_model, mascara.to_numpy(), _artefato)
+
+
+    # Erros-padrão robustos por cluster
+    OPCOES_ERRO_PADRAO = {
+        "Baseados no modelo": None,
+        "Robustos por IES (cluster)": "co_ies",
+        "Robustos por município (cluster)": "co_municipio_ies"
+    }
 
-        # Proporções de ingressantes
-        df["prop_ing_pp"] = (df["qt_ing_preta"] + df["qt_ing_parda"]) / df["qt_ing"].replace(0, np.nan)
-        df["prop_ing_financiados"] = (
-            df["qt_ing_fies"] + df["qt_ing_prounii"] + df["qt_ing_prounip"]
-        ) / df["qt_ing"].replace(0, np.nan)
+    @st.cache_data
+    def calcular_erros_cluster(df_model: pd.DataFrame, artefato: dict, agrupamento: str) -> dict:
+        return artefato_cluster(df_model, artefato, agrupamento)
 
-        # Tratar NaN e limitar
-        for col in ["prop_doc_avancado", "prop_ing_pp", "prop_ing_financiados"]:
-            df[col] = df[col].fillna(0).clip(0, 1)
 
-        # Remover linhas inválidas
-        df_model = df[(df["qt_ing"].notnull()) & (df["qt_ing"] >= 0) & (df["qt_mat"] > 0)].copy()
+    # Diagnósticos de influência (persistidos junto ao artefato do ajuste)
+    @st.cache_data(show_spinner="Calculando diagnósticos...")
+    def calcular_diagnosticos(df_model: pd.DataFrame, artefato: dict) -> dict:
+        matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+        diagnosticos = obter_diagnosticos(matriz, artefato)
+        return {"tabela": tabela_diagnosticos(diagnosticos, df_model, matriz), "k": diagnosticos["k"]}
 
-        # Criar offset
-        df_model["offset_log_qtmat"] = np.log(df_model["qt_mat"])
 
-        return df_model
+    # Previsão e efeitos marginais
+    def perfil_padrao(df_model: pd.DataFrame) -> pd.DataFrame:
+        """Perfil inicial: categoria mais frequente e mediana das contínuas."""
+        perfil = {v: df_model[v].mode().iloc[0] for v in VARIAVEIS_CATEGORICAS}
+        perfil.update({v: float(df_model[v].median()) for v in VARIAVEIS_CONTINUAS})
+        perfil["qt_conc"] = int(perfil["qt_conc"])
+        perfil["qt_mat"] = int(df_model["qt_mat"].median())
+        return pd.DataFrame([perfil])[COLUNAS_PERFIL]
 
+    @st.cache_data(max_entries=16, show_spinner="Calculando efeitos marginais...")
+    def calcular_efeitos_marginais(assinatura: str, _df_model: pd.DataFrame, _artefato: dict) -> pd.DataFrame:
+        matriz = matriz_modelo(_df_model, _artefato["formula"], COLUNAS_MODELO)
+        linhas = matriz["posicoes"][_artefato.get("linhas", slice(None))]
+        return efeitos_marginais(matriz["desenho"], _artefato, _df_model.iloc[linhas])
+
+
+    # Bootstrap dos coeficientes (réplicas persistidas por impressão digital)
+    OPCOES_BOOTSTRAP = {
+        "Por curso (casos)": None,
+        "Por IES (cluster)": "co_ies",
+        "Por município (cluster)": "co_municipio_ies"
+    }
+
+    @st.cache_data(show_spinner="Calculando réplicas bootstrap...")
+    def calcular_bootstrap(df_model: pd.DataFrame, artefato: dict, n_replicas: int, agrupamento):
+        matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+        grupos = None if agrupamento is None else df_model.iloc[matriz["posicoes"]][agrupamento].to_numpy()
+        replicas = obter_bootstrap(matriz, artefato, n_replicas, grupos, agrupamento)
+        validas = replicas_validas(replicas)
+        return intervalos_bootstrap(replicas["betas"], replicas["nomes"], validas=validas), int((~validas).sum())
+
+
+    # Validação cruzada do GLM (folds persistidos por impressão digital)
+    @st.cache_data(show_spinner="Ajustando folds da validação cruzada...")
+    def calcular_validacao(df_model: pd.DataFrame, artefato: dict) -> pd.DataFrame:
+        matriz = matriz_modelo(df_model, artefato["formula"], COLUNAS_MODELO)
+        return resumo_validacao(obter_validacao(matriz, artefato))
 
-    # 2. Função de modelagem
-    @st.cache_data
-    def ajustar_modelo(df_model: pd.DataFrame):
-        """Ajusta regressão Binomial Negativa com offset log(qt_mat)."""
-        formula = """
-        qt_ing ~ C(tp_rede)
-            + C(tp_organizacao_academica)
-            + C(tp_grau_academico)
-            + C(tp_modalidade_ensino)
-            + qt_conc
-            + prop_doc_avancado
-            + prop_ing_pp
-            + prop_ing_financiados
-        """
-
-        modelo = smf.glm(
-            formula=formula,
-            data=df_model,
-            family=sm.families.NegativeBinomial(),
-            offset=df_model["offset_log_qtmat"]
-        ).fit()
-
-        return modelo
+
+    # Seleção de variáveis (matriz completa compartilhada entre especificações)
+    @st.cache_data(show_spinner="Avaliando especificações...")
+    def calcular_selecao(df_model: pd.DataFrame, candidatos: tuple, criterio: str, metodo: str, alpha: float) -> pd.DataFrame:
+        matriz = matriz_completa(preparar_candidatos(df_model), candidatos)
+        termos_base = termos_formula(FORMULA)
+        if metodo == "Stepwise":
+            registros = selecao_stepwise(matriz, termos_base, candidatos, criterio, alpha)
+        else:
+            registros = selecao_todos_subconjuntos(matriz, termos_base, candidatos, 2, alpha)
+        return tabela_selecao(registros, termos_base, criterio)
+
+
+    # Modelo com efeitos fixos (absorvidos no IRLS, sem dummies)
+    @st.cache_data(show_spinner="Ajustando modelo com efeitos fixos...")
+    def carregar_efeitos_fixos(df_model: pd.DataFrame, efeitos: tuple, alpha: float) -> dict:
+        return obter_artefato_efeitos_fixos(df_model, efeitos, alpha=alpha)
+
+
+    # Ajuste por subgrupo (partições ajustadas em paralelo)
+    @st.cache_data(show_spinner="Ajustando subgrupos...")
+    def calcular_subgrupos(df_model: pd.DataFrame, particao: str, alpha: float) -> dict:
+        return ajustar_subgrupos(df_model, particao, alpha=alpha)
 
 
     # 3. Função de visualização
-    def mostrar_resultados_formatados(modelo):
+    def mostrar_resultados_formatados(artefato):
         """Mostra resultados do modelo NB em formato tabular e gráfico bonito."""
 
         # Extrair coeficientes, ICs e IRR
-        coef = modelo.params
-        pvals = modelo.pvalues
-        conf = modelo.conf_int()
-        irr = np.exp(coef)
-        irr_low = np.exp(conf[0])
-        irr_high = np.exp(conf[1])
-
-        resultados = pd.DataFrame({
-            "Variável": coef.index,
-            "Coeficiente (log)": coef.values.round(3),
-            "IRR (exp(coef))": irr.values.round(3),
-            "IC 95% (low)": irr_low.values.round(3),
-            "IC 95% (high)": irr_high.values.round(3),
-            "p-valor": pvals.values.round(4)
-        })
+        resultados = tabela_resultados(artefato)
 
         # Mostrar tabela formatada
         st.dataframe(resultados, use_container_width=True)
@@ -134,8 +182,39 @@ if df is not None and not df.empty:
 
 
 
-    df_model = preparar_dados(df)
-    modelo = ajustar_modelo(df_model)
+    # Opções de ajuste
+    st.sidebar.subheader("Opções do Modelo")
+    estimar_dispersao = st.sidebar.toggle(
+        "Estimar dispersão (α) por máxima verossimilhança",
+        help="Por padrão o GLM usa α = 1. Ativando, α é estimado pelo perfil da verossimilhança NB2."
+    )
+
+    tipo_erro_padrao = st.sidebar.selectbox(
+        "Erros-padrão",
+        list(OPCOES_ERRO_PADRAO),
+        key="tipo_erro_padrao",
+        help="Os erros robustos por cluster consideram que cursos da mesma IES (ou município) compartilham características não observadas."
+    )
+
+    df_model = preparar_dados_modelo(df)
+    artefato = carregar_modelo(df_model, estimar_dispersao)
+
+    # Reajuste na seleção (UF / IES)
+    st.sidebar.subheader("Reajustar na Seleção")
+    uf_modelo = st.sidebar.multiselect("UF", sorted(df_model["sigla_uf"].dropna().unique()), key="uf_modelo")
+    opcoes_ies = df_model[df_model["sigla_uf"].isin(uf_modelo)] if uf_modelo else df_model
+    ies_modelo = st.sidebar.multiselect("IES", sorted(opcoes_ies["no_ies"].dropna().unique()), key="ies_modelo")
+
+    artefato_ativo = artefato
+    chave_filtros_modelo = (tuple(uf_modelo), tuple(ies_modelo))
+    if any(chave_filtros_modelo):
+        try:
+            artefato_ativo = reajustar_filtrado(chave_filtros_modelo, artefato["chave"], df_model, artefato)
+        except ValueError as erro:
+            st.sidebar.warning(f"Não foi possível reajustar na seleção: {erro}")
+
+    agrupamento_ep = OPCOES_ERRO_PADRAO[tipo_erro_padrao]
+    artefato_ep = artefato_ativo if agrupamento_ep is None else calcular_erros_cluster(df_model, artefato_ativo, agrupamento_ep)
 
 
     st.subheader("Modelo Frequentista - Regressão Binomial Negativa")
@@ -274,24 +353,34 @@ if df is not None and not df.empty:
         st.markdown("<br>", unsafe_allow_html=True)
         
         # Extrair coeficientes, ICs e IRR
-        coef = modelo.params
-        pvals = modelo.pvalues
-        conf = modelo.conf_int()
-        irr = np.exp(coef)
-        irr_low = np.exp(conf[0])
-        irr_high = np.exp(conf[1])
-
-        resultados = pd.DataFrame({
-            "Variável": coef.index,
-            "Coeficiente (log)": coef.values.round(3),
-            "IRR (exp(coef))": irr.values.round(3),
-            "IC 95% (low)": irr_low.values.round(3),
-            "IC 95% (high)": irr_high.values.round(3),
-            "p-valor": pvals.values.round(4)
-        })
+        resultados = tabela_resultados(artefato_ep)
+
+        if artefato_ativo is not artefato:
+            st.info(
+                f"Modelo reajustado na seleção da barra lateral: {artefato_ativo['estatisticas']['nobs']:,} cursos."
+                .replace(",", ".")
+                + (f" Removidas na seleção (sem variação ou colineares): {', '.join(artefato_ativo['removidas'])}." if artefato_ativo["removidas"] else "")
+            )
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            perfil = artefato_ativo.get("perfil_alpha") or {}
+            if not artefato_ativo["alpha_estimado"]:
+                ajuda_alpha = "Fixado em 1 (padrão do GLM)"
+            elif perfil.get("interior", True):
+                ajuda_alpha = "Estimado"
+            else:
+                ajuda_alpha = "Estimado, mas o máximo ficou na fronteira da grade: não é um MLE interior"
+            st.metric("Dispersão (α)", f"{artefato_ativo['alpha']:.3f}", help=ajuda_alpha)
+        with col2:
+            st.metric("AIC", f"{artefato_ativo['estatisticas']['aic']:,.0f}".replace(",", "."))
+        with col3:
+            st.metric("Log-verossimilhança", f"{artefato_ativo['estatisticas']['llf']:,.0f}".replace(",", "."))
 
         # Mostrar tabela formatada
         st.markdown("<h5>Resultados Brutos da Regressão</h5>", unsafe_allow_html=True)
+        if agrupamento_ep is not None:
+            st.caption(f"Erros-padrão, IC e p-valores robustos por cluster ({artefato_ep['n_clusters']} grupos).")
         st.dataframe(resultados, use_container_width=True)
 
         # Explicação dos resultados
@@ -351,6 +440,159 @@ if df is not None and not df.empty:
 
         st.divider()
 
+        st.markdown("<h5>Diagnóstico: Cursos Influentes e Resíduos</h5>", unsafe_allow_html=True)
+        st.markdown("Cursos que mais influenciam os coeficientes (distância de Cook), com alta alavancagem (perfil incomum de covariáveis) ou resíduo padronizado acima de 3 em módulo (ingresso muito diferente do esperado).")
+
+        diagnosticos = calcular_diagnosticos(df_model, artefato)
+        influentes = cursos_influentes(diagnosticos["tabela"], diagnosticos["k"])
+        st.dataframe(influentes.round(4), use_container_width=True, hide_index=True)
+
+        tabela_diag = diagnosticos["tabela"].assign(
+            Sinalizado=np.where(diagnosticos["tabela"].index.isin(influentes.index), "Influente", "Demais")
+        )
+        fig_residuos = px.scatter(
+            tabela_diag,
+            x="Ajustado",
+            y="Resíduo padronizado",
+            color="Sinalizado",
+            hover_data=["no_ies", "no_curso", "qt_ing", "Distância de Cook"],
+            log_x=True,
+            render_mode="webgl",
+            opacity=0.6,
+            labels={"Ajustado": "Ingressantes ajustados (escala log)"}
+        )
+        fig_residuos.add_hline(y=3, line_dash="dash", line_color="red")
+        fig_residuos.add_hline(y=-3, line_dash="dash", line_color="red")
+        st.plotly_chart(fig_residuos, use_container_width=True)
+
+        st.markdown("<h5>Previsão e Efeitos Marginais</h5>", unsafe_allow_html=True)
+        st.markdown("Número esperado de ingressantes para perfis de curso definidos na tabela abaixo (adicione linhas para comparar perfis), com intervalo de confiança pelo método delta. Os efeitos marginais médios traduzem os coeficientes em ingressantes: a variação média esperada quando a variável aumenta uma unidade (contínuas) ou quando se troca a categoria de referência (categóricas).")
+
+        niveis = artefato_ativo["desenho"]["niveis"]
+        perfis = st.data_editor(
+            perfil_padrao(df_model),
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                **{v: st.column_config.SelectboxColumn(v, options=niveis[v], required=True) for v in VARIAVEIS_CATEGORICAS},
+                **{v: st.column_config.NumberColumn(v, min_value=0.0, max_value=1.0, step=0.01, required=True) for v in VARIAVEIS_CONTINUAS if v.startswith("prop_")},
+                "qt_conc": st.column_config.NumberColumn("qt_conc", min_value=0, step=1, required=True),
+                "qt_mat": st.column_config.NumberColumn("qt_mat", min_value=1, step=1, required=True),
+            },
+            key="perfis_predicao"
+        ).dropna()
+        desenho = matriz_modelo(df_model, artefato_ativo["formula"], COLUNAS_MODELO)["desenho"]
+        if not perfis.empty:
+            previsoes = prever(desenho, artefato_ep, perfis)
+            st.dataframe(previsoes.round(2), use_container_width=True, hide_index=True)
+
+        if st.toggle("Calcular efeitos marginais médios", key="calcular_efeitos_marginais"):
+            st.dataframe(
+                calcular_efeitos_marginais(assinatura_ajuste(artefato_ep), df_model, artefato_ep).round(3),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        st.markdown("<h5>Intervalos de Confiança por Bootstrap</h5>", unsafe_allow_html=True)
+        st.markdown("Os intervalos acima são de Wald (baseados no modelo). O bootstrap reajusta o modelo em amostras reamostradas dos dados, por curso ou por grupos inteiros (IES ou município), sem depender da forma assintótica.")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            reamostragem = st.selectbox(
+                "Reamostragem",
+                list(OPCOES_BOOTSTRAP),
+                key="reamostragem_bootstrap"
+            )
+        with col2:
+            n_replicas = st.selectbox("Réplicas", [500, 1000, 2000], index=2, key="replicas_bootstrap")
+
+        if st.toggle("Calcular intervalos por bootstrap", key="calcular_bootstrap"):
+            ic_bootstrap, n_descartadas = calcular_bootstrap(df_model, artefato, n_replicas, OPCOES_BOOTSTRAP[reamostragem])
+            st.dataframe(
+                tabela_resultados(artefato)[["Variável", "IRR (exp(coef))", "IC 95% (low)", "IC 95% (high)"]].merge(ic_bootstrap, on="Variável"),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption(
+                f"{n_replicas - n_descartadas} de {n_replicas} réplicas usadas; {n_descartadas} descartadas "
+                "(IRLS sem convergência ou desenho singular, ex.: um nível ausente da reamostragem)."
+            )
+
+        st.markdown("<h5>Validação Cruzada (5 folds)</h5>", unsafe_allow_html=True)
+        st.markdown("Desempenho fora da amostra: o modelo é reajustado em 4/5 dos cursos e avaliado no 1/5 restante, em cada um dos 5 folds. Desvio (Poisson) e MAE menores e log score maior indicam melhores previsões.")
+
+        if st.toggle("Executar validação cruzada", key="executar_validacao"):
+            st.dataframe(calcular_validacao(df_model, artefato), use_container_width=True)
+
+        st.markdown("<h5>Seleção de Variáveis (AIC/BIC)</h5>", unsafe_allow_html=True)
+        st.markdown("Compara especificações que acrescentam ao modelo base outras variáveis disponíveis na base (infraestrutura da IES, área CINE, gratuidade, faixas etárias e cotas). Menores valores de AIC/BIC indicam melhor equilíbrio entre ajuste e complexidade.")
+
+        candidatos = st.multiselect(
+            "Variáveis candidatas",
+            list(CANDIDATOS_SELECAO),
+            default=list(CANDIDATOS_SELECAO),
+            format_func=CANDIDATOS_SELECAO.get,
+            key="candidatos_selecao"
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            metodo_selecao = st.radio("Método", ["Stepwise", "Todos os subconjuntos (até 2)"], horizontal=True, key="metodo_selecao")
+        with col2:
+            criterio = st.radio("Critério", ["AIC", "BIC"], horizontal=True, key="criterio_selecao")
+
+        if candidatos and st.toggle("Executar seleção", key="executar_selecao"):
+            st.dataframe(
+                calcular_selecao(df_model, tuple(candidatos), criterio.lower(), metodo_selecao, artefato["alpha"]),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        st.markdown("<h5>Efeitos Fixos por IES e Município</h5>", unsafe_allow_html=True)
+        st.markdown("Controla diferenças não observadas entre instituições e municípios: cada IES/município recebe seu próprio nível de base, e os coeficientes passam a comparar cursos dentro do mesmo grupo. Variáveis que não variam dentro dos grupos (ex.: rede e organização acadêmica, com efeito fixo de IES) deixam de ser identificáveis.")
+
+        efeitos = st.multiselect(
+            "Efeitos fixos",
+            list(EFEITOS_FIXOS),
+            format_func=EFEITOS_FIXOS.get,
+            key="efeitos_fixos"
+        )
+        if efeitos:
+            artefato_ef = carregar_efeitos_fixos(df_model, tuple(efeitos), artefato["alpha"])
+            estatisticas = artefato_ef["estatisticas"]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Grupos absorvidos", " + ".join(f"{n} {EFEITOS_FIXOS[e]}" for e, n in estatisticas["n_niveis"].items()))
+            col2.metric("AIC", f"{estatisticas['aic']:,.0f}".replace(",", "."))
+            col3.metric("Cursos descartados (grupos sem ingressantes)", estatisticas["linhas_descartadas"])
+            st.dataframe(tabela_resultados(artefato_ef), use_container_width=True, hide_index=True)
+            if artefato_ef["absorvidas"]:
+                st.caption("Absorvidas pelos efeitos fixos: " + ", ".join(artefato_ef["absorvidas"]))
+
+        st.markdown("<h5>Modelo por Subgrupo</h5>", unsafe_allow_html=True)
+        st.markdown("A mesma especificação ajustada separadamente em cada subgrupo, para comparar as Razões de Taxa (IRR) lado a lado. Variáveis constantes dentro do subgrupo ficam em branco.")
+
+        particao = st.selectbox(
+            "Ajustar separadamente por",
+            [None, *PARTICOES],
+            format_func=lambda p: "—" if p is None else PARTICOES[p],
+            key="particao_subgrupos"
+        )
+        if particao is not None:
+            lote = calcular_subgrupos(df_model, particao, artefato["alpha"])
+            coeficientes = lote["coeficientes"]
+            if not coeficientes.empty:
+                st.dataframe(
+                    coeficientes.pivot(index="variavel", columns="grupo", values="irr")
+                    .reindex(coeficientes["variavel"].unique()).round(3),
+                    use_container_width=True
+                )
+            falhas = lote["status"][lote["status"]["Status"] != "ok"]
+            if not falhas.empty:
+                st.warning(f"{len(falhas)} subgrupo(s) não ajustado(s):")
+                st.dataframe(falhas, use_container_width=True, hide_index=True)
+
+        st.divider()
+
         st.markdown("#### **Análise dos Resultados**")
         st.markdown("<br>", unsafe_allow_html=True)
 
@@ -3,6 +3,9 @@ import pandas as pd
 import arviz as az
 import plotly.express as px
 import numpy as np
+from pathlib import Path
+from modules.Modelo_Bayes import carregar_trace_publicado, efeitos_grupo
+from modules.inferencia_aproximada import METODOS_INFERENCIA
 
 # ==========================
 # Carregar resultados salvos
@@ -10,7 +13,7 @@ import numpy as np
 @st.cache_data
 def carregar_resultados():
     try:
-        trace = az.from_netcdf("modules/modelo_bayesiano_trace.nc")
+        trace = carregar_trace_publicado()
         resultados = pd.read_csv("modules/resultados_bayes.csv", index_col=0)
         return trace, resultados, None
     except Exception as e:
@@ -26,8 +29,9 @@ if error:
 # Renomear a dimensão
 trace.posterior = trace.posterior.rename_dims({"beta_dim_0": "coef"})
 
-# Atribuir os nomes legíveis às coordenadas
-colnames = resultados.index[:12].tolist()  # supondo que os 12 primeiros sejam betas
+# Atribuir os nomes legíveis às coordenadas (os betas vêm primeiro na tabela,
+# antes de intercepto, alpha e, no modelo hierárquico, os sigmas)
+colnames = resultados.index[:trace.posterior.sizes["coef"]].tolist()
 trace.posterior = trace.posterior.assign_coords({"coef": colnames})
 
 
@@ -64,6 +68,21 @@ with tab1:
     O sampler MCMC (NUTS) foi rodado em **4 cadeias** com **2000 iterações** cada, após 1000 de aquecimento, totalizando **8000 amostras válidas**.
     """)
 
+    metodo = trace.posterior.attrs.get("metodo", "nuts")
+    if metodo != "nuts":
+        st.warning(
+            f"⚠️ O trace publicado foi gerado por aproximação (**{METODOS_INFERENCIA.get(metodo, metodo)}**), "
+            "não pelo NUTS: médias e intervalos são aproximados e o R-hat não se aplica (cadeia única)."
+        )
+
+    if Path("modules/relatorio_inferencia.csv").exists():
+        st.markdown("##### Precisão das aproximações frente ao NUTS")
+        st.dataframe(pd.read_csv("modules/relatorio_inferencia.csv", index_col=0), use_container_width=True)
+        st.caption(
+            "Erro padronizado = (média aproximada − média NUTS) / dp NUTS; razão de dp < 1 indica "
+            "incerteza subestimada. Gerado por `python -m modules.Modelo_Bayes --relatorio`."
+        )
+
 # ==========================
 # TAB 2 - Variáveis do Modelo
 # ==========================
@@ -203,6 +222,45 @@ with tab3:
     st.pyplot(fig)
 
 
+    # Modelo hierárquico: interceptos aleatórios de IES (encolhidos pelo sigma)
+    if "efeito_ies" in trace.posterior:
+        st.divider()
+        st.markdown("#### Efeitos das IES (modelo hierárquico)")
+        st.markdown("""
+        Cada IES tem um intercepto aleatório em torno do efeito médio, estimado com **parcial pooling**:
+        IES com poucos cursos ou dados ruidosos têm o efeito **encolhido em direção a zero** pelo desvio-padrão
+        entre IES (σ). Razão de taxas > 1 indica taxa de ingresso acima da esperada pelas covariáveis.
+        """)
+
+        efeitos = efeitos_grupo(trace, "ies")
+        col1, col2 = st.columns(2)
+        col1.metric("σ entre IES", f"{float(trace.posterior['sigma_ies'].mean()):.3f}")
+        col2.metric("σ entre municípios", f"{float(trace.posterior['sigma_municipio'].mean()):.3f}")
+
+        n_mostrar = st.slider("IES exibidas em cada extremo", 5, 30, 15, key="n_efeitos_ies")
+        extremos = pd.concat([efeitos.head(n_mostrar), efeitos.tail(n_mostrar)]).drop_duplicates("Grupo")
+        fig_ies = px.scatter(
+            extremos,
+            x="Média",
+            y="Grupo",
+            error_x=extremos["HDI 97%"] - extremos["Média"],
+            error_x_minus=extremos["Média"] - extremos["HDI 3%"],
+            color_discrete_sequence=["blue"],
+            title="Interceptos aleatórios das IES (média posterior e HDI 94%)"
+        )
+        fig_ies.update_layout(
+            xaxis_title="Efeito da IES (escala log)",
+            yaxis_title="",
+            height=max(400, 22 * len(extremos)),
+            yaxis={"categoryorder": "array", "categoryarray": extremos["Grupo"].tolist()[::-1]},
+            shapes=[{"type": "line", "x0": 0, "x1": 0, "y0": -1, "y1": len(extremos),
+                     "line": {"color": "red", "dash": "dash"}}]
+        )
+        st.plotly_chart(fig_ies, use_container_width=True)
+
+        with st.expander("Tabela completa dos efeitos das IES"):
+            st.dataframe(efeitos.round(4), use_container_width=True, hide_index=True)
+
     st.divider()
 
     st.markdown("#### Interpretação dos Resultados")
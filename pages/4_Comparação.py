@@ -4,11 +4,13 @@ import plotly.graph_objects as go
 import arviz as az
 import matplotlib.pyplot as plt
 import numpy as np
+from modules.Modelo_Bayes import carregar_trace_publicado
+from pathlib import Path
 
 # ========================
 # 0. Carregar trace salvo
 # ========================
-idata = az.from_netcdf("modules/modelo_bayesiano_trace.nc")
+idata = carregar_trace_publicado()
 
 # Lista de nomes dos betas na ordem correta
 colnames = [
@@ -257,6 +259,21 @@ with st.expander("Interpretação do Forest Plot Comparativo", icon=":material/i
 
 
 
+# ========================
+# Validação Cruzada
+# ========================
+st.divider()
+
+st.markdown("##### Desempenho Preditivo (Validação Cruzada 5 folds)")
+
+caminho_cv = Path("modules/resultados_cv.csv")
+if caminho_cv.exists():
+    st.markdown("Os dois modelos foram reajustados sobre a **mesma divisão em 5 folds** e avaliados nos cursos deixados de fora. Desvio (Poisson) e MAE menores e log score maior indicam melhores previsões.")
+    st.dataframe(pd.read_csv(caminho_cv, index_col=0), use_container_width=True)
+else:
+    st.info("Resultados da validação cruzada ainda não gerados. Execute `python -m modules.validacao_cruzada`.")
+
+
 # ========================
 # 9. Conclusão Geral
 # ========================